@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 import contextlib
 import os
+import signal
 import subprocess
 import sys
 import tempfile
@@ -13,13 +14,17 @@ import click
 import distro
 from progress.spinner import Spinner
 from hotsos.core import plugintools
-from hotsos.core.root_manager import DataRootManager
+from hotsos.core.root_manager import DataRootManager, find_data_roots
 from hotsos.core.config import HotSOSConfig
 from hotsos.core.log import log, LoggingManager
+from hotsos.core.profiling import PROFILER
 from hotsos.client import (
     HotSOSClient,
+    HotSOSFleetClient,
+    OutputBuilder,
     SUPPORTED_SUMMARY_FORMATS
 )
+from hotsos.server import HotSOSServer
 
 SNAP_ERROR_MSG = """ERROR: hotsos is installed as a snap which only supports
 running against a sosreport due to access restrictions.
@@ -111,7 +116,7 @@ def get_repo_info():
 def set_plugin_options(f):
     """ Create a cli option for each plugin. """
 
-    for plugin in plugintools.PLUGINS:
+    for plugin in plugintools.get_plugins_sorted():
         click.option(f'--{plugin}', default=False, is_flag=True,
                      help=f'Run the {plugin} plugin.')(f)
 
@@ -193,7 +198,7 @@ def progress_spinner(show_spinner, path):
 class CLIArgs:  # pylint: disable=too-many-instance-attributes
     """Command line arguments."""
 
-    data_root: click.Path
+    data_root: tuple
     version: bool
     defs_path: str
     templates_path: str
@@ -209,6 +214,13 @@ class CLIArgs:  # pylint: disable=too-many-instance-attributes
     event_tally_granularity: str
     max_logrotate_depth: int
     max_parallel_tasks: int
+    plugin_workers: int
+    fleet_workers: int
+    cache_dir: str
+    cache_max_size: int
+    no_cache: bool
+    profile: bool
+    profile_trace: str
     list_plugins: bool
     machine_readable: bool
     output_path: str
@@ -217,6 +229,8 @@ class CLIArgs:  # pylint: disable=too-many-instance-attributes
     scenario: str
     event: str
     tmp_dir: str
+    serve: str
+    serve_workers: int
 
     @classmethod
     def filter_kwargs(cls, **kwargs):
@@ -235,6 +249,17 @@ class CLIArgs:  # pylint: disable=too-many-instance-attributes
         return (cleaned_kwargs, remainder)
 
 
+def get_minimal_mode(arguments):
+    """ Return the minimal output mode requested if any. """
+    if arguments.short:
+        return 'short'
+
+    if arguments.very_short:
+        return 'very-short'
+
+    return None
+
+
 def run_client(arguments, plugins_to_run, data_root_name, logmanager):
     """ Run the hotsos client inside a progress spinner. """
     with progress_spinner(
@@ -251,9 +276,63 @@ def run_client(arguments, plugins_to_run, data_root_name, logmanager):
             logmanager.delete_temp_file = False
             raise
 
+        if arguments.profile_trace:
+            PROFILER.save_trace(arguments.profile_trace)
+
         return client.summary
 
 
+def run_fleet(arguments, plugins_to_run, data_roots, logmanager):
+    """
+    Analyse multiple data roots inside a progress spinner and save the output
+    of each along with an index which is printed in the requested format.
+    """
+    with progress_spinner(not arguments.quiet and not arguments.debug,
+                          f'{len(data_roots)} data roots'):
+        client = HotSOSFleetClient(data_roots, plugins_to_run,
+                                   workers=arguments.fleet_workers,
+                                   sos_unpack_dir=arguments.sos_unpack_dir)
+        try:
+            client.run()
+        except Exception as exc:
+            log.exception("An exception occurred while analysing data "
+                          "roots")
+            print('\nException analysing data roots:', exc)
+            print('See temp log file for possible details:',
+                  logmanager.temp_log_path)
+            logmanager.delete_temp_file = False
+            raise
+
+    output = OutputBuilder(client.index)
+    out = output.to(fmt=arguments.output_format,
+                    html_escape=arguments.html_escape)
+    path = client.save(html_escape=arguments.html_escape,
+                       output_path=arguments.output_path)
+    if out:
+        sys.stdout.write(f"{out}\n")
+
+    sys.stdout.write(f"INFO: output saved to {path}\n")
+
+
+def run_server(arguments):
+    """
+    Run a warm server that accepts analysis requests over a Unix socket until
+    interrupted or terminated.
+    """
+    def terminate(*_args):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, terminate)
+    with HotSOSServer(arguments.serve,
+                      workers=arguments.serve_workers) as server:
+        sys.stdout.write(f"INFO: listening on {arguments.serve}\n")
+        sys.stdout.flush()
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
 def init_config(arguments):
     cfg = {'repo_info': get_repo_info(),
            'force_mode': arguments.force,
@@ -265,7 +344,12 @@ def init_config(arguments):
            'event_tally_granularity': arguments.event_tally_granularity,
            'max_logrotate_depth': arguments.max_logrotate_depth,
            'max_parallel_tasks': arguments.max_parallel_tasks,
+           'plugin_workers': arguments.plugin_workers,
+           'cache_dir': ('' if arguments.no_cache else
+                         arguments.cache_dir or ''),
+           'cache_max_size': arguments.cache_max_size,
            'machine_readable': arguments.machine_readable,
+           'profile': arguments.profile or bool(arguments.profile_trace),
            'debug_mode': arguments.debug,
            'scenario_filter': arguments.scenario,
            'event_filter': arguments.event}
@@ -318,6 +402,51 @@ def main():
                         'files in parallel. By default the number of cores '
                         'used is limited to a max of 8. You can '
                         'override that value with this option.'))
+    @click.option('--plugin-workers', default=1,
+                  help=('Plugins are run sequentially by default. Setting '
+                        'this to a value greater than 1 will run up to that '
+                        'many plugins concurrently. Output is unchanged.'))
+    @click.option('--fleet-workers', default=os.cpu_count() or 1,
+                  show_default=True,
+                  help=('When more than one data root is provided they are '
+                        'analysed concurrently using up to this many worker '
+                        'processes.'))
+    @click.option('--serve', default=None,
+                  help=('Run as a server listening on this Unix socket path '
+                        'instead of analysing a data root. Plugins and defs '
+                        'are loaded once and each request (a line of json '
+                        'containing data_root and optionally plugins, '
+                        'scenario, event, format, minimal and html_escape) '
+                        'is analysed in a worker process. See '
+                        'hotsos.server.'))
+    @click.option('--serve-workers', default=os.cpu_count() or 1,
+                  show_default=True,
+                  help=('Maximum number of requests analysed concurrently '
+                        'with --serve.'))
+    @click.option('--cache-dir', default=None, envvar='HOTSOS_CACHE_DIR',
+                  help=('Optional directory used to cache command outputs '
+                        'and plugin results so that subsequent runs against '
+                        'the same (unchanged) data root are faster. Not used '
+                        'when running against the local host. Can also be '
+                        'set with HOTSOS_CACHE_DIR. Use --sos-unpack-dir '
+                        'to cache results for sosreport archives.'))
+    @click.option('--cache-max-size', default=1024,
+                  help=('Maximum size in MB of --cache-dir. Least recently '
+                        'used entries are evicted once this is exceeded.'))
+    @click.option('--no-cache', default=False, is_flag=True,
+                  help='Disable --cache-dir.')
+    @click.option('--profile', default=False, is_flag=True,
+                  help=('Record the time and resources (cpu, peak rss, '
+                        'subprocesses and bytes read) used by each plugin, '
+                        'search preloader, part, scenario and event and add '
+                        'them to the summary under "profile". Best used '
+                        'with --machine-readable.'))
+    @click.option('--profile-trace', default=None,
+                  help=('Implies --profile and also saves the profile to '
+                        'this path in Chrome trace event format (see '
+                        'chrome://tracing or https://ui.perfetto.dev). Not '
+                        'supported when analysing more than one data '
+                        'root.'))
     @click.option('--max-logrotate-depth', default=7,
                   help=('Searching all available logrotate history for a '
                         'given log file can be costly so we cap the history '
@@ -379,7 +508,7 @@ def main():
                         'tmpdir for the system, typically this would be '
                         '/tmp or /var/tmp'))
     @set_plugin_options
-    @click.argument('data_root', required=False, type=click.Path(exists=True))
+    @click.argument('data_root', nargs=-1, type=click.Path(exists=True))
     def cli(**kwargs):
         """
         Run this tool on a host or against a sosreport to perform
@@ -398,10 +527,15 @@ def main():
         (--save) a directory called "hotsos-output" is created beneath which
         output is saved in all available formats e.g. yaml, json, short
 
+        When more than one DATA_ROOT is provided (or DATA_ROOT is a directory
+        of sosreports) they are all analysed in one go (see --fleet-workers)
+        and the output of each is saved along with an index of the issues and
+        bugs found in each which is also printed.
+
         \b
         DATA_ROOT
-            Path to an sosreport. If none provided, will run against local
-            host.
+            Path to an sosreport or a directory of sosreports. If none
+            provided, will run against local host.
         """  # noqa
 
         # Filter the kwargs to separate what should go into the CLIArgs
@@ -428,27 +562,42 @@ def main():
             sys.stderr.write(f'ERROR: {exc}\n')
             sys.exit(1)
 
+        if arguments.debug and arguments.quiet:
+            sys.stderr.write('ERROR: cannot use both --debug and --quiet\n')
+            return
+
         init_config(arguments)
 
+        if arguments.serve:
+            with LoggingManager():
+                log.name = 'hotsos.server'
+                run_server(arguments)
+
+            return
+
+        data_roots = find_data_roots(arguments.data_root)
         with LoggingManager() as logmanager:
+            if len(data_roots) > 1 and not arguments.list_plugins:
+                log.name = 'hotsos.cli'
+                run_fleet(arguments, list(plugins_to_run), data_roots,
+                          logmanager)
+                return
+
             with DataRootManager(
-                arguments.data_root, sos_unpack_dir=arguments.sos_unpack_dir
+                data_roots[0] if data_roots else None,
+                sos_unpack_dir=arguments.sos_unpack_dir
             ) as drm:
                 HotSOSConfig.data_root = drm.data_root
                 if is_snap() and drm.data_root == '/':
                     print(SNAP_ERROR_MSG)
                     sys.exit(1)
 
-                if arguments.debug and arguments.quiet:
-                    sys.stderr.write('ERROR: cannot use both --debug and '
-                                     '--quiet\n')
-                    return
-
                 # Set a name so that logs have this until real plugins are run.
                 log.name = 'hotsos.cli'
 
                 if arguments.list_plugins:
-                    sys.stdout.write('\n'.join(plugintools.PLUGINS.keys()))
+                    sys.stdout.write('\n'.join(
+                        plugintools.get_plugins_sorted()))
                     sys.stdout.write('\n')
                     return
 
@@ -462,15 +611,8 @@ def main():
                     )
                     sys.stdout.write(f"INFO: output saved to {path}\n")
                 else:
-                    if arguments.short:
-                        minimal_mode = 'short'
-                    elif arguments.very_short:
-                        minimal_mode = 'very-short'
-                    else:
-                        minimal_mode = None
-
                     output = summary.get_builder()
-                    output.minimal(minimal_mode)
+                    output.minimal(get_minimal_mode(arguments))
                     out = output.to(
                         fmt=arguments.output_format,
                         html_escape=arguments.html_escape
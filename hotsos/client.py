@@ -1,20 +1,37 @@
 #!/usr/bin/python3
+import concurrent.futures
 import gzip
 import html
 import json
 import logging
+import multiprocessing
 import os
 import shutil
 import tempfile
 from typing import Literal
 
 # load all plugins
-import hotsos.plugin_extensions  # noqa: F401, pylint: disable=W0611
+from hotsos.core.cache import (
+    PLUGIN_KEY_CONFIG_OPTS,
+    get_persistent_cache,
+    reset_persistent_cache,
+)
 from hotsos.core.config import HotSOSConfig
 from hotsos.core.host_helpers.cli import CLIHelper
+from hotsos.core.host_helpers.cli.common import (
+    CmdBase,
+    FILE_CMD_OUTPUT_CACHE,
+)
+from hotsos.core.host_helpers.packaging import PACKAGE_INDEX_CACHE
+from hotsos.core.host_helpers.systemd import SYSTEMD_UNIT_INDEX_CACHE
 from hotsos.core.issues import IssuesManager
 from hotsos.core.log import log
 from hotsos.core import plugintools
+from hotsos.core.profiling import GLOBAL_PROFILE_KEY, PROFILER
+from hotsos.core.root_manager import DataRootManager
+from hotsos.core.utils import PathFinderBase
+from hotsos.core.ycheck.common import GlobalSearcher
+from hotsos.core.ycheck.engine.common import get_ydefs_cache
 from hotsos.core.exceptions import UnsupportedFormatError
 
 
@@ -45,6 +62,40 @@ FILTER_SCHEMA = [IssuesManager.SUMMARY_OUT_ISSUES_ROOT,
                  IssuesManager.SUMMARY_OUT_BUGS_ROOT]
 
 
+# State inherited by plugin worker processes (see HotSOSClient.run()).
+PLUGIN_WORKER_CONTEXT = {}
+
+
+def _run_plugin_worker(plugin):
+    """
+    Run a plugin in a worker process and return a tuple of its output and any
+    profile records created while running it.
+    """
+    runner, plugin_tmp_dir = PLUGIN_WORKER_CONTEXT['runners'][plugin]
+    HotSOSConfig.plugin_tmp_dir = plugin_tmp_dir
+    HotSOSConfig.plugin_name = plugin
+    log.name = f'hotsos.plugin.{plugin}'
+    log.debug("running plugin %s (pid=%s)", plugin, os.getpid())
+    # Records inherited from the parent are not returned.
+    PROFILER.reset()
+    return (runner.run(PLUGIN_WORKER_CONTEXT['global_searcher']),
+            PROFILER.records)
+
+
+def reset_run_state():
+    """
+    Reset state that is saved at module or class level while analysing a data
+    root so that it does not leak into the next data root analysed by the same
+    process e.g. a fleet or serve worker.
+    """
+    FILE_CMD_OUTPUT_CACHE.clear()
+    PACKAGE_INDEX_CACHE.clear()
+    SYSTEMD_UNIT_INDEX_CACHE.clear()
+    CmdBase.reset_affinity()
+    PathFinderBase.reset_affinity()
+    reset_persistent_cache()
+
+
 SUPPORTED_SUMMARY_FORMATS = ['yaml', 'json', 'markdown', 'html']
 SUPPORTED_MINIMAL_MODES = ['full', 'short', 'very-short']
 
@@ -197,7 +248,11 @@ class OutputManager():
 
         os.remove(path)
 
-    def save(self, name, html_escape=False, output_path=None):
+    @staticmethod
+    def default_output_root():
+        return f"hotsos-output-{CLIHelper().date(format='+%s')}"
+
+    def save(self, name, html_escape=False, output_path=None, save_log=True):
         """
         Save all formats and styles to disk using either the provided path or
         an autogenerated one.
@@ -206,11 +261,12 @@ class OutputManager():
 
         @param name: name used to identify the data_root. This is typically
                      the basename of the path or local hostname.
+        @param save_log: if True the log file is saved along with the output.
         """
         if output_path:
             output_root = output_path
         else:
-            output_root = f"hotsos-output-{CLIHelper().date(format='+%s')}"
+            output_root = self.default_output_root()
 
         for minimal_mode in SUPPORTED_MINIMAL_MODES:
             _minimal_mode = minimal_mode.replace('-', '_')
@@ -252,14 +308,25 @@ class OutputManager():
 
                     os.symlink(path.partition(output_root)[2].lstrip('/'), dst)
 
+        if save_log:
+            self.save_log(os.path.join(output_root, name))
+
+        return output_root
+
+    @classmethod
+    def save_log(cls, path):
+        """
+        Move the log file (if any) to path and compress it. No logging is
+        possible after this point.
+
+        @param path: directory to save the log to.
+        """
         if log.handlers and isinstance(log.handlers[0], logging.FileHandler):
             log.handlers[0].close()
             # no logging after this point
-            logfile_dst = os.path.join(output_root, name, 'hotsos.log')
+            logfile_dst = os.path.join(path, 'hotsos.log')
             shutil.move(log.handlers[0].baseFilename, logfile_dst)
-            self.compress(logfile_dst)
-
-        return output_root
+            cls.compress(logfile_dst)
 
     def update(self, plugin, content):
         self._summary[plugin] = content
@@ -275,7 +342,7 @@ class HotSOSClient():
         all will be run.
         """
         self._summary = OutputManager()
-        self.plugins = plugins or plugintools.PLUGINS.keys()
+        self.plugins = plugins or plugintools.get_plugins_sorted()
 
     @staticmethod
     def setup_global_env():
@@ -305,25 +372,315 @@ class HotSOSClient():
     def summary(self):
         return self._summary
 
+    @staticmethod
+    def _plugin_cache_key(plugin):
+        """ Key used to cache plugin output in the persistent cache. """
+        return (plugin,) + tuple((opt, getattr(HotSOSConfig, opt))
+                                 for opt in PLUGIN_KEY_CONFIG_OPTS)
+
+    def _preload_searches(self, global_searcher, outputs):
+        """
+        Load the searches of all selected plugins into a single global searcher
+        so that every file is only searched once for the entire run.
+
+        Returns a dict of runnable plugins with their runner and tmp dir.
+
+        @param global_searcher: GlobalSearcher object
+        @param outputs: dict to which the output of plugins that do not need
+                        to be run (not runnable or cached) is added.
+        """
+        cache = get_persistent_cache()
+        runners = {}
+        for plugin in plugintools.get_plugins_sorted():
+            if plugin not in self.plugins:
+                continue
+
+            if cache is not None:
+                content = cache.get('plugin', self._plugin_cache_key(plugin))
+                if content is not None:
+                    log.debug("using cached output for plugin %s", plugin)
+                    outputs[plugin] = content
+                    continue
+
+            self.setup_plugin_env(plugin)
+            log.name = f'hotsos.plugin.{plugin}'
+            log.debug("loading searches for plugin %s", plugin)
+            HotSOSConfig.plugin_name = plugin
+            runner = plugintools.PluginRunner(plugin)
+            if runner.preload(global_searcher):
+                runners[plugin] = (runner, HotSOSConfig.plugin_tmp_dir)
+            else:
+                outputs[plugin] = {}
+                if cache is not None:
+                    cache.set('plugin', self._plugin_cache_key(plugin), {})
+
+        return runners
+
+    @staticmethod
+    def _run_plugins_sequential(global_searcher, runners):
+        """
+        Run plugins one after the other in the current process.
+
+        @param global_searcher: GlobalSearcher object
+        @param runners: dict of plugin runners and tmp dirs
+        """
+        for plugin, (runner, plugin_tmp_dir) in runners.items():
+            HotSOSConfig.plugin_tmp_dir = plugin_tmp_dir
+            log.name = f'hotsos.plugin.{plugin}'
+            log.debug("running plugin %s", plugin)
+            HotSOSConfig.plugin_name = plugin
+            yield plugin, runner.run(global_searcher)
+
+    @staticmethod
+    def _run_plugins_parallel(global_searcher, runners):
+        """
+        Run plugins concurrently in a pool of worker processes. Workers are
+        forked so that they inherit the global searcher results and config.
+        Output is returned in the same order as the plugins were provided.
+        Output of a plugin that fails to run, e.g. because its worker died, is
+        None so that the others are not affected.
+
+        @param global_searcher: GlobalSearcher object
+        @param runners: dict of plugin runners and tmp dirs
+        """
+        num_workers = min(HotSOSConfig.plugin_workers, len(runners))
+        log.debug("running %s plugin(s) using %s workers", len(runners),
+                  num_workers)
+        PLUGIN_WORKER_CONTEXT.update({'global_searcher': global_searcher,
+                                      'runners': runners})
+        try:
+            with concurrent.futures.ProcessPoolExecutor(
+                    max_workers=num_workers,
+                    mp_context=multiprocessing.get_context('fork')) as exe:
+                jobs = {plugin: exe.submit(_run_plugin_worker, plugin)
+                        for plugin in runners}
+                for plugin, job in jobs.items():
+                    try:
+                        content, records = job.result()
+                    # We really do want to catch all here so that one plugin
+                    # failing does not lose the output of the others.
+                    except Exception as exc:  # pylint: disable=W0718
+                        log.exception("plugin '%s' raised exception: %s",
+                                      plugin, exc)
+                        yield plugin, None
+                        continue
+
+                    PROFILER.records.extend(records)
+                    yield plugin, content
+        finally:
+            PLUGIN_WORKER_CONTEXT.clear()
+
     def run(self):
         """
         Run the selected plugins. This will run the automatic (defs) checks as
         well as any extensions.
         """
         log.name = 'hotsos.client'
+        PROFILER.reset()
         try:
             self.setup_global_env()
+            outputs = {}
+            with GlobalSearcher() as global_searcher:
+                runners = self._preload_searches(global_searcher, outputs)
+                log.name = 'hotsos.client'
+                log.debug("running searches for %s plugin(s)", len(runners))
+                with PROFILER.profile('search', 'GlobalSearcher',
+                                      plugin=GLOBAL_PROFILE_KEY):
+                    global_searcher.run()
+                if HotSOSConfig.plugin_workers > 1 and len(runners) > 1:
+                    results = self._run_plugins_parallel(global_searcher,
+                                                         runners)
+                else:
+                    results = self._run_plugins_sequential(global_searcher,
+                                                           runners)
+
+                cache = get_persistent_cache()
+                for plugin, content in results:
+                    if content is None:
+                        # Report all parts as failed and don't cache so that
+                        # the plugin is run again next time.
+                        parts = runners[plugin][0].parts
+                        outputs[plugin] = {plugin: {'failed-parts': [
+                            p['runner'].__name__ for p in parts]}}
+                        continue
+
+                    outputs[plugin] = content
+                    if cache is not None:
+                        cache.set('plugin', self._plugin_cache_key(plugin),
+                                  content)
+
             for plugin in plugintools.get_plugins_sorted():
-                if plugin not in self.plugins:
-                    continue
+                if outputs.get(plugin):
+                    self.summary.update(plugin, outputs[plugin].get(plugin))
 
-                self.setup_plugin_env(plugin)
-                log.name = f'hotsos.plugin.{plugin}'
-                log.debug("running plugin %s", plugin)
-                HotSOSConfig.plugin_name = plugin
-                content = plugintools.PluginRunner(plugin).run()
-                if content:
-                    self.summary.update(plugin, content.get(plugin))
+            if HotSOSConfig.profile:
+                self.summary.update('profile', PROFILER.summary())
+
+            if cache is not None:
+                cache.evict()
         finally:
             log.name = 'hotsos.client'
+            reset_run_state()
             self.teardown_global_env()
+
+
+# State inherited by fleet worker processes (see HotSOSFleetClient.run()).
+FLEET_WORKER_CONTEXT = {}
+
+
+def _run_fleet_worker(path):
+    """
+    Analyse a single data root and return a tuple of (name, summary, error).
+    Each data root gets its own temporary directory which is used for
+    unpacking sosreports (unless an unpack dir is provided) and all state
+    saved during the run.
+    """
+    name = os.path.basename(path.rstrip('/'))
+    data_root = HotSOSConfig.data_root
+    tmpdir = tempfile.mkdtemp(prefix='hotsos-fleet-')
+    saved_tmpdir = tempfile.tempdir
+    tempfile.tempdir = tmpdir
+    try:
+        sos_unpack_dir = FLEET_WORKER_CONTEXT['sos_unpack_dir']
+        with DataRootManager(path, sos_unpack_dir=sos_unpack_dir) as drm:
+            HotSOSConfig.data_root = drm.data_root
+            name = drm.basename
+            log.debug("analysing %s (pid=%s)", drm.name, os.getpid())
+            client = HotSOSClient(FLEET_WORKER_CONTEXT['plugins'])
+            client.run()
+            return name, client.summary.get_builder().content, None
+    # We really do want to catch all here so that one bad data root does not
+    # stop the others from being analysed.
+    except Exception as exc:  # pylint: disable=W0718
+        log.exception("error analysing %s", path)
+        return name, None, str(exc)
+    finally:
+        HotSOSConfig.data_root = data_root
+        tempfile.tempdir = saved_tmpdir
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+class HotSOSFleetClient():
+    """
+    Analyse many data roots (e.g. sosreports) in one go.
+
+    Data roots are analysed concurrently in a pool of worker processes that
+    are forked from this one so that state that does not depend on the data
+    root (loaded plugins, parsed defs, compiled searches etc) is only created
+    once rather than once per data root. Each data root gets its own summary
+    along with an index of all data roots analysed.
+    """
+    INDEX_NAME = 'hotsos-index'
+
+    def __init__(self, data_roots, plugins=None, workers=1,
+                 sos_unpack_dir=None):
+        """
+        @param data_roots: list of data root paths.
+        @param plugins: list of plugin names to run. If no plugins are provided
+                        all will be run.
+        @param workers: maximum number of data roots to analyse concurrently.
+        @param sos_unpack_dir: optional path used to unpack sosreports.
+        """
+        self.data_roots = data_roots
+        self.plugins = plugins
+        self.workers = workers
+        self.sos_unpack_dir = sos_unpack_dir
+        # dict of results keyed by unique data root name
+        self.results = {}
+
+    def _run_sequential(self):
+        for path in self.data_roots:
+            yield path, _run_fleet_worker(path)
+
+    def _run_parallel(self):
+        num_workers = min(self.workers, len(self.data_roots))
+        log.debug("analysing %s data roots using %s workers",
+                  len(self.data_roots), num_workers)
+        with concurrent.futures.ProcessPoolExecutor(
+                max_workers=num_workers,
+                mp_context=multiprocessing.get_context('fork')) as exe:
+            jobs = [(path, exe.submit(_run_fleet_worker, path))
+                    for path in self.data_roots]
+            for path, job in jobs:
+                yield path, job.result()
+
+    def run(self):
+        """
+        Analyse all data roots. Results are stored in the same order as the
+        data roots were provided.
+        """
+        log.name = 'hotsos.fleet'
+        # Warm up shared state before forking so that workers inherit it.
+        for plugin in self.plugins or plugintools.get_plugins_sorted():
+            plugintools.load_plugin(plugin)
+
+        get_ydefs_cache(HotSOSConfig.plugin_yaml_defs).load_all()
+        FLEET_WORKER_CONTEXT.update({'plugins': self.plugins,
+                                     'sos_unpack_dir': self.sos_unpack_dir})
+        try:
+            if self.workers > 1 and len(self.data_roots) > 1:
+                results = self._run_parallel()
+            else:
+                results = self._run_sequential()
+
+            for path, (name, summary, error) in results:
+                unique_name = name
+                count = 1
+                while unique_name in self.results:
+                    count += 1
+                    unique_name = f"{name}-{count}"
+
+                self.results[unique_name] = {'data-root': path,
+                                             'summary': summary,
+                                             'error': error}
+        finally:
+            log.name = 'hotsos.fleet'
+            FLEET_WORKER_CONTEXT.clear()
+
+    @property
+    def index(self):
+        """
+        Aggregate index of all data roots analysed containing the issues and
+        bugs found in each (see very-short output mode) or the error
+        encountered while analysing it.
+        """
+        index = {}
+        for name, result in self.results.items():
+            entry = {'data-root': result['data-root']}
+            if result['error'] is not None:
+                entry['error'] = result['error']
+            else:
+                output = OutputBuilder(result['summary'])
+                entry.update(output.minimal('very-short').content)
+
+            index[name] = entry
+
+        return index
+
+    def save(self, html_escape=False, output_path=None):
+        """
+        Save the summary of each data root along with the index in all
+        formats using either the provided path or an autogenerated one.
+
+        Returns path of saved data.
+        """
+        output_root = output_path or OutputManager.default_output_root()
+        for name, result in self.results.items():
+            if result['summary'] is None:
+                continue
+
+            OutputManager(result['summary']).save(name,
+                                                  html_escape=html_escape,
+                                                  output_path=output_root,
+                                                  save_log=False)
+
+        os.makedirs(output_root, exist_ok=True)
+        for fmt in SUPPORTED_SUMMARY_FORMATS:
+            path = os.path.join(output_root, f"{self.INDEX_NAME}.{fmt}")
+            output = OutputBuilder(self.index)
+            with open(path, 'w', encoding='utf-8') as fd:
+                fd.write(output.to(fmt=fmt, html_escape=html_escape))
+                fd.write("\n")
+
+        OutputManager.save_log(output_root)
+        return output_root
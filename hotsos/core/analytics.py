@@ -1,7 +1,15 @@
+import bisect
+import heapq
+import re
 import statistics
 from datetime import datetime
 from dataclasses import dataclass
 
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+# Fast path for TIMESTAMP_FORMAT. Anything else is left to strptime.
+TIMESTAMP_EXPR = re.compile(r'([0-9]{4})-([0-9]{2})-([0-9]{2}) '
+                            r'([0-9]{2}):([0-9]{2}):([0-9]{2})\.([0-9]{1,6})')
+
 
 class EventCollection():
     """Used to collect events found in logfiles. Events are defined as having
@@ -14,6 +22,15 @@ class EventCollection():
     """
     def __init__(self):
         self._events = {}
+        # Starts of each event id sorted by timestamp. Invalidated when a
+        # start is added.
+        self._sorted_starts = {}
+        self._complete = None
+        self._incomplete = None
+
+    def _invalidate_views(self):
+        self._complete = None
+        self._incomplete = None
 
     @staticmethod
     def most_recent(items):
@@ -22,51 +39,67 @@ class EventCollection():
         This means that when we calculate stats on events found we will include
         only the most recent instance of an event with a given id.
         """
-        return sorted(items, key=lambda e: e["end"], reverse=True)[0]
+        # NOTE: max() returns the first of equal items which is the same as
+        #       the first of sorted(reverse=True).
+        return max(items, key=lambda e: e["end"])
 
     @property
     def complete_events(self):
         """ Complete events are ones for which a duration has been
         calculated which implies their start and has been identified. """
+        if self._complete is not None:
+            return self._complete
+
         complete = {}
         for event_id, info in self._events.items():
-            for item in info.get("heads", []):
-                if "duration" in item:
-                    if event_id not in complete:
-                        complete[event_id] = []
-
-                    complete[event_id].append(item)
-
-            if event_id in complete:
-                complete[event_id] = self.most_recent(complete[event_id])
+            items = [item for item in info.get("heads", [])
+                     if "duration" in item]
+            if items:
+                complete[event_id] = self.most_recent(items)
 
+        self._complete = complete
         return complete
 
     @property
     def incomplete_events(self):
+        if self._incomplete is not None:
+            return self._incomplete
+
         incomplete = {}
         for event_id, info in self._events.items():
-            for item in info.get("heads", []):
-                if "duration" not in item:
-                    if event_id not in incomplete:
-                        incomplete[event_id] = []
-
-                    incomplete[event_id].append(item)
+            items = [item for item in info.get("heads", [])
+                     if "duration" not in item]
+            if items:
+                incomplete[event_id] = items
 
+        self._incomplete = incomplete
         return incomplete
 
+    def _get_sorted_starts(self, event_id):
+        """
+        Returns a tuple of start timestamps and start items for the given
+        event id sorted by timestamp. Starts with the same timestamp retain
+        the order in which they were added.
+        """
+        if event_id not in self._sorted_starts:
+            heads = sorted(self._events[event_id].get("heads", []),
+                           key=lambda e: e["start"])
+            self._sorted_starts[event_id] = ([e["start"] for e in heads],
+                                             heads)
+
+        return self._sorted_starts[event_id]
+
     def find_most_recent_start(self, event_id, end_ts):
         """
-        For a given event end marker, find the most recent start marker.
+        For a given event end marker, find the most recent start marker. If
+        more than one start has that timestamp, the first one added is used.
         """
-        last = {}
-        for item in self._events[event_id].get("heads", []):
-            start_ts = item["start"]
-            if start_ts <= end_ts:
-                if not last or start_ts > last["start"]:
-                    last = item
+        timestamps, heads = self._get_sorted_starts(event_id)
+        idx = bisect.bisect_right(timestamps, end_ts)
+        if idx == 0:
+            return {}
 
-        return last
+        return heads[bisect.bisect_left(timestamps, timestamps[idx - 1])]
 
     def add_event_end(self, event_id, end_ts):
         """
@@ -87,6 +120,8 @@ class EventCollection():
         else:
             self._events[event_id]["tails"].append(end_ts)
 
+        self._invalidate_views()
+
     def add_event_start(self, event_id, start_ts, metadata=None,
                         metadata_key=None):
         """
@@ -120,6 +155,9 @@ class EventCollection():
         else:
             self._events[event_id]["heads"].append(event_info)
 
+        self._sorted_starts.pop(event_id, None)
+        self._invalidate_views()
+
     def calculate_event_deltas(self):
         """
         Once we have collected all complete events i.e. ones that have a start
@@ -131,6 +169,9 @@ class EventCollection():
         most recent start.
         """
         for event, info in self._events.items():
+            if not info.get("heads"):
+                continue
+
             _prev_start = None
             for end_ts in info.get("tails", []):
                 start_item = self.find_most_recent_start(event, end_ts)
@@ -151,6 +192,8 @@ class EventCollection():
                 start_item["duration"] = duration
                 start_item["end"] = end_ts
 
+        self._invalidate_views()
+
 
 @dataclass(frozen=True)
 class SearchResultIndices():
@@ -198,6 +241,42 @@ class LogEventStats():
 
         self.log_seq_idxs = log_seq_idxs
 
+    @staticmethod
+    def parse_timestamps(timestamps):
+        """
+        Parse timestamps in TIMESTAMP_FORMAT. Since many events share
+        timestamps, each distinct timestamp is only parsed once.
+
+        @param timestamps: list of timestamp strings.
+        @return: list of datetime.datetime objects.
+        """
+        parsed = {}
+        for ts in timestamps:
+            if ts in parsed:
+                continue
+
+            ret = TIMESTAMP_EXPR.fullmatch(ts)
+            if ret:
+                fields = ret.groups()
+                parsed[ts] = datetime(*map(int, fields[:6]),
+                                      int(fields[6].ljust(6, '0')))
+            else:
+                parsed[ts] = datetime.strptime(ts, TIMESTAMP_FORMAT)
+
+        return [parsed[ts] for ts in timestamps]
+
+    def _get_results(self, tag):
+        """
+        Returns a tuple of results with the given tag and their parsed
+        timestamps.
+        """
+        seq_idxs = self.log_seq_idxs
+        results = list(self.results.find_by_tag(tag))
+        timestamps = self.parse_timestamps(
+                         [f"{r.get(seq_idxs.day)} {r.get(seq_idxs.secs)}"
+                          for r in results])
+        return results, timestamps
+
     def run(self):
         """ Collect event start markers and end markers then attempt to link
         them to form complete events thus allowing us to calculate their
@@ -205,22 +284,16 @@ class LogEventStats():
         """
         seq_idxs = self.log_seq_idxs
 
-        end_tag = f"{self.results_tag_prefix}-end"
-        for result in self.results.find_by_tag(end_tag):
-            day = result.get(seq_idxs.day)
-            secs = result.get(seq_idxs.secs)
-            end = f"{day} {secs}"
-            end = datetime.strptime(end, "%Y-%m-%d %H:%M:%S.%f")
+        results, timestamps = self._get_results(
+                                  f"{self.results_tag_prefix}-end")
+        for result, end in zip(results, timestamps):
             self.data.add_event_end(result.get(seq_idxs.event_id), end)
 
-        start_tag = f"{self.results_tag_prefix}-start"
-        for result in self.results.find_by_tag(start_tag):
-            day = result.get(seq_idxs.day)
-            secs = result.get(seq_idxs.secs)
-            start = f"{day} {secs}"
-            start = datetime.strptime(start, "%Y-%m-%d %H:%M:%S.%f")
+        results, timestamps = self._get_results(
+                                  f"{self.results_tag_prefix}-start")
+        meta_key = seq_idxs.metadata_key
+        for result, start in zip(results, timestamps):
             metadata = result.get(seq_idxs.metadata)
-            meta_key = seq_idxs.metadata_key
             event_id = result.get(seq_idxs.event_id)
             self.data.add_event_start(event_id, start, metadata=metadata,
                                       metadata_key=meta_key)
@@ -236,18 +309,16 @@ class LogEventStats():
         fetch events with shortest duration.
         @return: dictionary of results.
         """
-        count = 0
-        top_n = {}
         top_n_sorted = {}
+        # NOTE: these are equivalent to sorted(...)[:maximum] including the
+        #       order of events with equal durations.
+        if reverse:
+            select = heapq.nlargest
+        else:
+            select = heapq.nsmallest
 
-        for event_id, item in sorted(self.data.complete_events.items(),
-                                     key=lambda e: e[1]["duration"],
-                                     reverse=reverse):
-            if count >= maximum:
-                break
-
-            count += 1
-            top_n[event_id] = item
+        top_n = dict(select(maximum, self.data.complete_events.items(),
+                            key=lambda e: e[1]["duration"]))
 
         for event_id, item in sorted(top_n.items(),
                                      key=lambda x: x[1]["start"],
@@ -0,0 +1,239 @@
+import hashlib
+import os
+import pickle
+import shutil
+import tempfile
+from functools import cached_property, lru_cache
+
+from hotsos.core.config import HotSOSConfig
+from hotsos.core.log import log
+
+# Config that can change the output of a run for a given data root.
+FINGERPRINT_CONFIG_OPTS = ['hotsos_version',
+                           'repo_info',
+                           'force_mode',
+                           'use_all_logs',
+                           'max_logrotate_depth',
+                           'event_tally_granularity',
+                           'plugin_yaml_defs']
+
+# Config that can change the output of a plugin for a given fingerprint and
+# so must be part of the key of its cached output. Output cached without
+# profiling has no profile records for the plugin.
+PLUGIN_KEY_CONFIG_OPTS = ['scenario_filter',
+                          'event_filter',
+                          'machine_readable',
+                          'profile']
+
+# Derived files that must not affect the fingerprint.
+FINGERPRINT_IGNORE = ['__pycache__', '.ydefs.pickle']
+
+
+def tree_fingerprint(root, hasher):
+    """
+    Update hasher with the path, size, mtime and inode of every entry under
+    root. Symlinks are not followed and python bytecode caches and compiled
+    ydefs are ignored since they are derived from files we already include.
+
+    @param root: path to directory.
+    @param hasher: hashlib object.
+    """
+    try:
+        entries = sorted(os.scandir(root), key=lambda e: e.name)
+    except OSError as exc:
+        log.debug("unable to fingerprint %s: %s", root, exc)
+        return
+
+    for entry in entries:
+        if entry.name in FINGERPRINT_IGNORE:
+            continue
+
+        try:
+            st = entry.stat(follow_symlinks=False)
+        except OSError:
+            continue
+
+        hasher.update(f"{entry.path}:{st.st_size}:{st.st_mtime_ns}:"
+                      f"{st.st_ino}\n".encode())
+        if entry.is_dir(follow_symlinks=False):
+            tree_fingerprint(entry.path, hasher)
+
+
+class PersistentCache():
+    """
+    Opt-in on-disk cache used to avoid repeating work when hotsos is run more
+    than once against the same data root e.g. with different filters or
+    output formats.
+
+    Entries are stored beneath a fingerprint of the data root (path, size,
+    mtime and inode of every file), the hotsos code and defs and any config
+    that affects output so that a change to any of them invalidates the
+    cache. Once the total size of the cache exceeds max_size, least recently
+    used entries are evicted.
+
+    The fingerprint is computed once so an instance must only be used for the
+    duration of a single run (see reset_persistent_cache()).
+    """
+    def __init__(self, cache_dir, max_size, data_root, config):
+        """
+        @param cache_dir: path to cache directory. Created if it does not
+                          exist.
+        @param max_size: maximum size of the cache in bytes.
+        @param data_root: path to data root.
+        @param config: tuple of (name, value) config that affects output.
+        """
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.data_root = data_root
+        self.config = config
+        # In-memory entries that callers want shared for the lifetime of this
+        # object rather than loaded from disk each time.
+        self.memo = {}
+
+    @cached_property
+    def fingerprint(self):
+        hasher = hashlib.sha256()
+        hasher.update(os.path.realpath(self.data_root).encode())
+        for opt, value in self.config:
+            hasher.update(f"{opt}={value}\n".encode())
+
+        tree_fingerprint(os.path.dirname(os.path.dirname(__file__)), hasher)
+        if HotSOSConfig.plugin_yaml_defs:
+            tree_fingerprint(HotSOSConfig.plugin_yaml_defs, hasher)
+
+        tree_fingerprint(self.data_root, hasher)
+        log.debug("persistent cache fingerprint for %s is %s", self.data_root,
+                  hasher.hexdigest())
+        return hasher.hexdigest()
+
+    def _path(self, kind, key):
+        digest = hashlib.sha256(repr(key).encode()).hexdigest()
+        return os.path.join(self.cache_dir, self.fingerprint, kind,
+                            f"{digest}.pickle")
+
+    def get(self, kind, key):
+        """
+        Get value from cache.
+
+        @param kind: name of the type of entry e.g. cli.
+        @param key: entry key. Must have a stable repr().
+        @return: cached value or None if not found.
+        """
+        path = self._path(kind, key)
+        try:
+            with open(path, 'rb') as fd:
+                value = pickle.load(fd)
+        except FileNotFoundError:
+            return None
+        # We don't care why it failed, just treat it as a miss.
+        except Exception as exc:  # pylint: disable=W0718
+            log.info("unable to load cache entry %s: %s", path, exc)
+            return None
+
+        # Track usage for lru eviction.
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        log.debug("persistent cache hit (kind=%s, key=%s)", kind, key)
+        return value
+
+    def set(self, kind, key, value):
+        """
+        Save value to cache. Writes are atomic so that concurrent processes
+        never see partial entries.
+
+        @param kind: name of the type of entry e.g. cli.
+        @param key: entry key. Must have a stable repr().
+        @param value: picklable value.
+        """
+        path = self._path(kind, key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        except OSError as exc:
+            log.info("unable to cache %s entry '%s': %s", kind, key, exc)
+            return
+
+        try:
+            with os.fdopen(fd, 'wb') as tmp:
+                pickle.dump(value, tmp)
+
+            os.replace(tmp_path, path)
+        except (pickle.PicklingError, TypeError, AttributeError,
+                OSError) as exc:
+            log.info("unable to cache %s entry '%s': %s", kind, key, exc)
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def evict(self):
+        """
+        Remove least recently used entries until the total size of the cache
+        is below max_size.
+        """
+        entries = []
+        total = 0
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+
+                total += st.st_size
+                entries.append((st.st_mtime_ns, st.st_size, path))
+
+        if total <= self.max_size:
+            return
+
+        log.debug("persistent cache size %s exceeds max %s - evicting",
+                  total, self.max_size)
+        for _, size, path in sorted(entries):
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+
+            total -= size
+            if total <= self.max_size:
+                break
+
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if not any(files for _, _, files in os.walk(path)):
+                shutil.rmtree(path, ignore_errors=True)
+
+
+@lru_cache
+def _get_cache(cache_dir, max_size, data_root, config):
+    return PersistentCache(cache_dir, max_size, data_root, config)
+
+
+def reset_persistent_cache():
+    """
+    Forget PersistentCache objects so that the next run gets a new one with a
+    fingerprint reflecting the current state of its data root. Must be called
+    at the end of every run since processes can be re-used for more than one
+    run e.g. fleet and server workers.
+    """
+    _get_cache.cache_clear()
+
+
+def get_persistent_cache():
+    """
+    Returns the PersistentCache for the current run or None if caching is
+    disabled. Caching is never used when running against the local host since
+    its state is expected to change between runs.
+    """
+    if not HotSOSConfig.cache_dir or HotSOSConfig.data_root in (None, '/'):
+        return None
+
+    config = tuple((opt, str(getattr(HotSOSConfig, opt)))
+                   for opt in FINGERPRINT_CONFIG_OPTS)
+    return _get_cache(HotSOSConfig.cache_dir,
+                      HotSOSConfig.cache_max_size * 1024 ** 2,
+                      HotSOSConfig.data_root, config)
@@ -123,6 +123,28 @@ class HotSOSConfigOpts(ConfigOptGroupBase):
                                         "you want to run a single scenario. "
                                         "Useful for testing/debugging"),
                            default_value='', value_type=str))
+        self.add(ConfigOpt(name='plugin_workers',
+                           description=("Maximum number of plugins that can "
+                                        "be run concurrently. By default "
+                                        "plugins are run sequentially."),
+                           default_value=1, value_type=int))
+        self.add(ConfigOpt(name='cache_dir',
+                           description=("Optional path to a directory used "
+                                        "to persist results across runs "
+                                        "against the same data root. Caching "
+                                        "is disabled if not set."),
+                           default_value='', value_type=str))
+        self.add(ConfigOpt(name='cache_max_size',
+                           description=("Maximum size in MB of cache_dir. "
+                                        "Least recently used entries are "
+                                        "evicted once this is exceeded."),
+                           default_value=1024, value_type=int))
+        self.add(ConfigOpt(name='profile',
+                           description=("Record the time and resources used "
+                                        "by each plugin, preloader, part, "
+                                        "scenario and event and add them to "
+                                        "the summary."),
+                           default_value=False, value_type=bool))
         self.add(ConfigOpt(name='debug_log_levels',
                            description=("Debug mode log levels for "
                                         "submodules/dependencies"),
@@ -4,22 +4,41 @@ import json
 import os
 import pathlib
 import pickle
+import re
+import sqlite3
+import subprocess
 import tempfile
 from dataclasses import dataclass, field
-from functools import cached_property
+from functools import cached_property, lru_cache
+from types import MappingProxyType
 
+from hotsos.core.cache import get_persistent_cache
 from hotsos.core.config import HotSOSConfig
 from hotsos.core.host_helpers.exceptions import (
     CLIExecError,
     SourceNotFound,
 )
 from hotsos.core.host_helpers.cli.common import (
+    _tz_offset,
     BinCmd,
     BinFileCmd,
     CmdOutput,
+    DateFileCmd,
+    FileCmd,
+    FileCmdBase,
+    isolate_call_state,
+    ReadOnlyLines,
+    reset_command,
+    run_post_exec_hooks,
+    run_pre_exec_hooks,
 )
 from hotsos.core.host_helpers.cli.catalog import CommandCatalog
 from hotsos.core.host_helpers.common import HostHelpersBase
+from hotsos.core.host_helpers.journal import (
+    JOURNAL_INDEX_FIELDS,
+    JournalFormatError,
+    JournalIndex,
+)
 from hotsos.core.host_helpers.exceptions import CommandNotFound
 from hotsos.core.log import log
 
@@ -104,6 +123,148 @@ class JournalctlBinFileCmd(BinFileCmd, JournalctlBase):
             self.path = f"{self.path} --since {self.since_date}"
 
 
+class JournalctlIndexFileCmd(FileCmd, JournalctlBase):
+    """ Implements file-based journalctl command using a JournalIndex.
+
+    The journal is indexed once per run and queries by unit, --since date,
+    kernel (-k) and field matches are answered from the index. Queries using
+    any other options are left to the next source.
+    """
+    UNIT_SUFFIXES = ('.automount', '.device', '.mount', '.path', '.scope',
+                     '.service', '.slice', '.socket', '.swap', '.target',
+                     '.timer')
+
+    @staticmethod
+    def _parse_opts(opts):
+        """
+        Parse journalctl options into query arguments.
+
+        @return: tuple of (output format, kernel, matches) or None if any
+                 option is not supported.
+        """
+        fmt = 'short-iso'
+        kernel = False
+        matches = {}
+        for opt in (opts or '').split():
+            if opt in ['-k', '--dmesg']:
+                kernel = True
+            elif opt.startswith('--output='):
+                fmt = opt.partition('=')[2]
+            elif opt.startswith('-o'):
+                fmt = opt[2:]
+            elif opt.partition('=')[0] in JOURNAL_INDEX_FIELDS:
+                name, _, value = opt.partition('=')
+                matches.setdefault(name, []).append(value)
+            else:
+                return None
+
+        if fmt not in ['short-iso', 'json']:
+            return None
+
+        return fmt, kernel, matches
+
+    @staticmethod
+    def _tz():
+        """ Timezone of the host the journal was collected from. """
+        try:
+            name = DateFileCmd('sos_commands/date/date',
+                               singleline=True)(format="+%Z").value
+        except SourceNotFound:
+            return datetime.timezone.utc
+
+        return _tz_offset(name) or datetime.timezone.utc
+
+    @staticmethod
+    def _format_short_iso(realtime, fields, tz):
+        """
+        Format an entry the same way as journalctl -oshort-iso.
+
+        @return: list of lines.
+        """
+        ts = datetime.datetime.fromtimestamp(realtime // 10 ** 6, tz)
+        prefix = ts.strftime('%Y-%m-%dT%H:%M:%S%z')
+        if '_HOSTNAME' in fields:
+            prefix += f" {fields['_HOSTNAME']}"
+
+        ident = fields.get('SYSLOG_IDENTIFIER', fields.get('_COMM',
+                                                           'unknown'))
+        prefix += f" {ident}"
+        pid = fields.get('_PID', fields.get('SYSLOG_PID'))
+        if pid:
+            prefix += f"[{pid}]"
+
+        prefix += ': '
+        # like journalctl, tabs are expanded so that continuation lines are
+        # aligned.
+        message = fields.get('MESSAGE', '').replace('\t', ' ' * 8)
+        lines = message.rstrip('\n').split('\n')
+        indent = ' ' * len(prefix)
+        return ([f"{prefix}{lines[0]}\n"] +
+                [f"{indent}{line}\n" for line in lines[1:]])
+
+    def _since(self, date, tz):
+        """ Return --since date as microseconds since the epoch. """
+        date = date or self.since_date
+        if not date:
+            return None
+
+        since = datetime.datetime.fromisoformat(date)
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=tz)
+
+        return int(since.timestamp()) * 10 ** 6 + since.microsecond
+
+    def _format(self, entries, fmt, tz):
+        """ Generator yielding output lines for entries. """
+        prev_boot = None
+        for realtime, boot_id, fields in entries:
+            if fmt == 'json':
+                fields = {'__REALTIME_TIMESTAMP': str(realtime),
+                          '_BOOT_ID': boot_id, **fields}
+                yield json.dumps(fields) + '\n'
+                continue
+
+            if prev_boot is not None and boot_id != prev_boot:
+                yield f"-- Boot {boot_id} --\n"
+
+            prev_boot = boot_id
+            yield from self._format_short_iso(realtime, fields, tz)
+
+    # NOTE: errors are not converted to CLIExecError here since we want any
+    # failure to use the index to fall through to the next source.
+    @isolate_call_state
+    @reset_command
+    @run_post_exec_hooks
+    @run_pre_exec_hooks
+    def __call__(self, *args, opts=None, unit=None, date=None, **kwargs):
+        if not os.path.exists(self.path):
+            raise SourceNotFound(self.path)
+
+        query = self._parse_opts(opts)
+        if query is None or (unit and '*' in unit):
+            log.debug("journal index does not support opts='%s' unit=%s",
+                      opts, unit)
+            raise SourceNotFound(self.path)
+
+        fmt, kernel, matches = query
+        if unit and not unit.endswith(self.UNIT_SUFFIXES):
+            unit = f"{unit}.service"
+
+        tz = self._tz()
+        try:
+            entries = JournalIndex(self.path).query(
+                unit=unit, since=self._since(date, tz), kernel=kernel,
+                matches=matches)
+            output = list(self._format(entries, fmt, tz))
+        except (OSError, ValueError, sqlite3.Error,
+                subprocess.CalledProcessError, JournalFormatError) as exc:
+            log.info("unable to query journal index for %s: %s", self.path,
+                     exc)
+            raise SourceNotFound(self.path) from exc
+
+        return CmdOutput(output)
+
+
 class CLICacheWrapper():
     """ Wrapper for cli cache. """
     def __init__(self, cache_load_f, cache_save_f):
@@ -238,9 +399,39 @@ class SourceRunner():
                   self.cmdkey, len(sources), stype)
         yield from sources
 
+    def _fsource_cached(self, *args, **kwargs):
+        """
+        Execute filesystem sources using the persistent cache if enabled.
+        Outputs saved to file are not cached since their path is temporary.
+
+        Read-only output is also kept in memory for the rest of the run so
+        that every caller gets the same object, as it would from
+        FileCmdOutputCache, and indexes built from it can be shared (see
+        OutputIndexCache).
+        """
+        cache = get_persistent_cache()
+        if cache is None or self.output_file:
+            return self.fsource(*args, **kwargs)
+
+        key = (self.cmdkey, args, sorted(kwargs.items()))
+        memo_key = ('cli', repr(key))
+        if memo_key in cache.memo:
+            return cache.memo[memo_key]
+
+        ret = cache.get('cli', key)
+        if ret is None:
+            ret = self.fsource(*args, **kwargs)
+            if ret is not None:
+                cache.set('cli', key, ret)
+
+        if isinstance(getattr(ret, 'value', None), ReadOnlyLines):
+            cache.memo[memo_key] = ret
+
+        return ret
+
     def _execute(self, *args, **kwargs):
         """ Execute all sources, trying filesystem first then binary. """
-        ret = self.fsource(*args, **kwargs)
+        ret = self._fsource_cached(*args, **kwargs)
         if ret is not None:
             return ret
 
@@ -276,6 +467,43 @@ class SourceRunner():
         return out.value
 
 
+@lru_cache(maxsize=8)
+def get_command_catalog(data_root):
+    """
+    Returns the catalog of all supported commands. The catalog is built once
+    per process for a given data root and is read-only so that it can be
+    shared by all CLIHelper instances. Command objects are not modified when
+    executed (see isolate_call_state) so they too can be shared.
+
+    @param data_root: data root used to resolve file-based command paths.
+    """
+    log.debug("building command catalog for data_root=%s", data_root)
+    catalog = CommandCatalog()
+    catalog.update({'journalctl':
+                    [JournalctlBinCmd('journalctl -oshort-iso'),
+                     JournalctlIndexFileCmd('var/log/journal'),
+                     JournalctlBinFileCmd('var/log/journal')]})
+    return MappingProxyType({name: tuple(sources)
+                             for name, sources in catalog.items()})
+
+
+def get_command_file_paths():
+    """
+    Returns the set of paths, relative to the data root, used by all
+    file-based commands in the catalog. Any format fields in a path are
+    replaced with a "*" wildcard so that they can be used as glob patterns.
+    """
+    paths = set()
+    for sources in get_command_catalog(HotSOSConfig.data_root).values():
+        for source in sources:
+            # paths resolved when the catalog is built are absolute
+            if (isinstance(source, FileCmdBase) and source.relpath and
+                    not os.path.isabs(source.relpath)):
+                paths.add(re.sub(r'{[^}]*}', '*', source.relpath))
+
+    return paths
+
+
 class CLIHelperBase(HostHelpersBase):
     """ Base class for clihelper implementations. """
     def __init__(self):
@@ -301,13 +529,9 @@ class CLIHelperBase(HostHelpersBase):
     def cache_save(self, key, value):
         return self.cache.set(key, value)
 
-    @cached_property
+    @property
     def command_catalog(self):
-        catalog = CommandCatalog()
-        catalog.update({'journalctl':
-                        [JournalctlBinCmd('journalctl -oshort-iso'),
-                         JournalctlBinFileCmd('var/log/journal')]})
-        return catalog
+        return get_command_catalog(HotSOSConfig.data_root)
 
     @abc.abstractmethod
     def __getattr__(self, cmdname):
@@ -1,9 +1,8 @@
+import json
 import os
-import tempfile
 from collections import UserList
 
 from hotsos.core.host_helpers.cli.common import BinCmd, FileCmd
-from hotsos.core.host_helpers.exceptions import SourceNotFound
 
 
 CEPH_ALIASES = ['microceph.']
@@ -37,42 +36,50 @@ class CephJSONFileCmd(FileCmd):
     """
     Some ceph commands that use --format json have some extra text added to the
     end of the file (typically from stderr) which causes it to be invalid json
-    so we have to strip that final line before decoding the contents.
+    so we have to exclude that final line when decoding the contents.
     """
+    BLOCK_SIZE = 4096
+
     def __init__(self, *args, last_line_filter=None,
                  **kwargs):
         super().__init__(*args, json_decode=True, **kwargs)
-        if last_line_filter:
-            self.register_hook('pre-exec', self.format_json_contents)
-            self.register_hook('post-exec', self.cleanup)
-            self.orig_path = None
-            self.last_line_filter = last_line_filter
-
-    def format_json_contents(self, *_args, **_kwargs):
-        if not os.path.exists(self.path):
-            raise SourceNotFound(self.path)
-
-        with open(self.path, encoding='utf-8') as f:
-            lines = f.readlines()
-
-        if lines and lines[-1].startswith(self.last_line_filter):
-            lines = lines[:-1]
-            with tempfile.NamedTemporaryFile(mode='w+t', delete=False) as tmp:
-                tmp.write(''.join(lines))
-                tmp.close()
-                self.orig_path = self.path
-                self.path = tmp.name
-
-    def cleanup(self, output, **_kwargs):
+        self.last_line_filter = last_line_filter
+
+    def _last_line_offset(self, fd):
         """
-        @param output: CmdOutput object
+        Return the offset at which the last line of the file starts. The file
+        is read backwards from the end so that only the last line is read.
         """
-        if self.orig_path:
-            os.unlink(self.path)
-            self.path = self.orig_path
-            self.orig_path = None
-
-        return output
+        end = fd.seek(0, os.SEEK_END)
+        if end:
+            fd.seek(end - 1)
+            if fd.read(1) == b'\n':
+                end -= 1
+
+        while end > 0:
+            start = max(0, end - self.BLOCK_SIZE)
+            fd.seek(start)
+            idx = fd.read(end - start).rfind(b'\n')
+            if idx >= 0:
+                return start + idx + 1
+
+            end = start
+
+        return 0
+
+    def load_json(self):
+        if not self.last_line_filter:
+            return super().load_json()
+
+        last_line_filter = self.last_line_filter.encode('utf-8')
+        with open(self.path, 'rb') as fd:
+            offset = self._last_line_offset(fd)
+            fd.seek(offset)
+            if fd.read(len(last_line_filter)) != last_line_filter:
+                offset = None
+
+            fd.seek(0)
+            return json.loads(fd.read(offset))
 
 
 class CephHealthDetailCommands(UserList):
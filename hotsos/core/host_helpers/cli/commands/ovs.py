@@ -2,7 +2,12 @@ import abc
 from collections import UserList
 
 from hotsos.core.log import log
-from hotsos.core.host_helpers.cli.common import BinCmd, FileCmd, CmdOutput
+from hotsos.core.host_helpers.cli.common import (
+    BinCmd,
+    FileCmd,
+    CmdOutput,
+    isolate_call_state,
+)
 from hotsos.core.host_helpers.exceptions import (
     CLIExecError,
     SourceNotFound,
@@ -71,6 +76,7 @@ class OVSVSCtlListBrCmds(OVSVSCtlCmdsBase):
 class OVSAppCtlBinCmd(BinCmd):
     """ Implements ovs-appctl binary command. """
 
+    @isolate_call_state
     def __call__(self, *args, **kwargs):
         # Set defaults for optional args
         for key in ['flags', 'args']:
@@ -91,6 +97,7 @@ class OVSAppCtlFileCmd(FileCmd):
                 '{command}{flags}{args}')
         super().__init__(path, *args, **kwargs)
 
+    @isolate_call_state
     def __call__(self, *args, **kwargs):
         for key in ['flags', 'args']:
             if key in kwargs:
@@ -153,6 +160,7 @@ class OVSOFCtlBinCmd(BinCmd):
         """ Disable affinity for this command. """
         return ()
 
+    @isolate_call_state
     def __call__(self, *args, **kwargs):
         """
         First try without specifying protocol version. If error is raised
@@ -205,6 +213,7 @@ class OVSOFCtlFileCmd(FileCmd):
         """ Disable affinity for this command. """
         return ()
 
+    @isolate_call_state
     def __call__(self, *args, **kwargs):
         """
         We do this in reverse order to bin command since it won't actually
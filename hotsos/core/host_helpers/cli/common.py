@@ -1,10 +1,13 @@
 import abc
+import copy
 import json
 import os
 import re
 import subprocess
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
 from dataclasses import dataclass, field, fields
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 
 import yaml
 from hotsos.core.config import HotSOSConfig
@@ -15,6 +18,107 @@ from hotsos.core.host_helpers.exceptions import (
 )
 from hotsos.core.log import log
 
+# Timezone abbreviations and their offset from UTC in minutes. This covers
+# what the date command recognises plus some that it does not e.g. HKT.
+TZ_ABBREVIATIONS = {
+    'UTC': 0, 'UT': 0, 'GMT': 0, 'Z': 0, 'WET': 0, 'WEST': 60, 'BST': 60,
+    'WAT': 60, 'CET': 60, 'MET': 60, 'MEZ': 60, 'CEST': 120, 'MEST': 120,
+    'MESZ': 120, 'EET': 120, 'CAT': 120, 'SAST': 120, 'EEST': 180,
+    'EAT': 180, 'MSK': 180, 'MSD': 240, 'IST': 330, 'SGT': 480, 'HKT': 480,
+    'AWST': 480, 'KST': 540, 'JST': 540, 'ACST': 570, 'AEST': 600,
+    'GST': 600, 'AEDT': 660, 'NZST': 720, 'NZDT': 780, 'NST': -210,
+    'NDT': -150, 'ART': -180, 'BRT': -180, 'BRST': -120, 'AST': -240,
+    'ADT': -180, 'CLT': -240, 'CLST': -180, 'EST': -300, 'EDT': -240,
+    'CST': -360, 'CDT': -300, 'MST': -420, 'MDT': -360, 'PST': -480,
+    'PDT': -420, 'AKST': -540, 'AKDT': -480, 'HST': -600, 'HAST': -600,
+    'HADT': -540,
+}
+
+
+def _tz_offset(tz):
+    """
+    Convert a timezone abbreviation or numeric offset as found in the output
+    of the date command to a timezone object.
+
+    @param tz: timezone string e.g. UTC, HKT, -03, +0530 or empty.
+    @return: timezone object or None if tz is not recognised.
+    """
+    if not tz:
+        return timezone.utc
+
+    if tz in TZ_ABBREVIATIONS:
+        return timezone(timedelta(minutes=TZ_ABBREVIATIONS[tz]))
+
+    ret = re.match(r'^([+-]?)([0-9]{2})([0-9]{2})?$', tz)
+    if ret is None:
+        return None
+
+    minutes = int(ret[2]) * 60 + int(ret[3] or 0)
+    if ret[1] == '-':
+        minutes = -minutes
+
+    return timezone(timedelta(minutes=minutes))
+
+
+def _strftime_utc(dt, fmt):
+    """
+    Format a UTC datetime the way date --utc would. Conversions whose python
+    implementation depends on the local timezone or platform are handled
+    here.
+
+    @param dt: datetime object in UTC
+    @param fmt: strftime format string.
+    """
+    special = {'s': lambda: str(int(dt.timestamp())),
+               'Z': lambda: 'UTC',
+               'z': lambda: '+0000',
+               'e': lambda: f"{dt.day:2d}",
+               '%': lambda: '%'}
+
+    def _convert(ret):
+        if ret[1] in special:
+            return special[ret[1]]()
+
+        return dt.strftime(ret[0])
+
+    return re.sub(r'%(.)', _convert, fmt)
+
+
+@lru_cache
+def native_date(date, tz, year, fmt):
+    """
+    Convert date to UTC and format it without having to run the date command.
+    Results are memoised since the same date is typically requested many
+    times per run.
+
+    @param date: date and time string e.g. Thu Mar 25 10:55:05
+    @param tz: timezone string e.g. UTC, HKT, -03 or empty.
+    @param year: year string.
+    @param fmt: date command format e.g. +%s, --iso-8601 or None to get the
+                default format.
+    @return: formatted date string or None if the date, timezone or
+             format are not supported.
+    """
+    tzinfo = _tz_offset(tz)
+    if tzinfo is None:
+        return None
+
+    try:
+        dt = datetime.strptime(f"{' '.join(date.split())} {year}",
+                               '%a %b %d %H:%M:%S %Y')
+    except ValueError:
+        return None
+
+    dt = dt.replace(tzinfo=tzinfo).astimezone(timezone.utc)
+    if not fmt:
+        fmt = '+%a %b %e %H:%M:%S %Z %Y'
+    elif fmt == '--iso-8601':
+        fmt = '+%Y-%m-%d'
+    elif not fmt.startswith('+'):
+        return None
+
+    return _strftime_utc(dt, fmt[1:])
+
 
 @dataclass(frozen=True)
 class CmdOutput():
@@ -36,7 +140,7 @@ def run_pre_exec_hooks(f):
         hook = self.hooks.get("pre-exec")
         if hook:
             # no return expected
-            hook(*args, **kwargs)
+            getattr(self, hook)(*args, **kwargs)
 
         return f(self, *args, **kwargs)
 
@@ -51,13 +155,32 @@ def run_post_exec_hooks(f):
         out = f(self, *args, **kwargs)
         hook = self.hooks.get("post-exec")
         if hook:
-            out = hook(out, *args, **kwargs)
+            out = getattr(self, hook)(out, *args, **kwargs)
 
         return out
 
     return run_post_exec_hooks_inner
 
 
+def isolate_call_state(f):
+    """
+    Command objects are shared by all users of the command catalog so they
+    must not be modified when executed. This runs the command against a
+    per-call copy which hooks etc are then free to modify. Calls made from
+    within an already isolated call e.g. super().__call__() are run against
+    the same copy.
+    """
+    def isolate_call_state_inner(self, *args, **kwargs):
+        if self.is_call_copy:
+            return f(self, *args, **kwargs)
+
+        call = copy.copy(self)
+        call.is_call_copy = True
+        return f(call, *args, **kwargs)
+
+    return isolate_call_state_inner
+
+
 def reset_command(f):
     """
     This should be run by all commands as their last action after all/any hooks
@@ -127,6 +250,8 @@ class CmdBase:
     Provides a way to save original state and restore to that state.
     """
     CMD_AFFINITY = None
+    # Set on the per-call copies created by isolate_call_state.
+    is_call_copy = False
 
     def __post_init__(self):
         self.affinity = CmdAffinity(self._affinity_info)
@@ -148,6 +273,14 @@ class CmdBase:
                  command identifier e.g. path or cli command.
         """
 
+    @classmethod
+    def reset_affinity(cls):
+        """ Clear affinity saved by this class and all its subclasses. Must be
+        called between data roots analysed by the same process. """
+        cls.CMD_AFFINITY = None
+        for subcls in cls.__subclasses__():
+            subcls.reset_affinity()
+
     def get_original_attr_value(self, name):
         return getattr(self, 'original_' + name)
 
@@ -170,8 +303,11 @@ class CmdBase:
             * pre-exec - run before __call__ method.
             * post-exec - run after __call__ method and take its output as
                           input.
+
+        Hooks are stored by name so that they are run against the per-call
+        copy of the command rather than the shared instance.
         """
-        self.hooks[name] = f
+        self.hooks[name] = f.__name__
 
 
 @dataclass
@@ -191,6 +327,8 @@ class FileCmdBase(CmdBase):
         return self.__class__, self.path
 
     def __post_init__(self):
+        # path relative to data root (may contain format fields)
+        self.relpath = self.path
         self.path = os.path.join(HotSOSConfig.data_root, self.path)
         super().__post_init__()
 
@@ -221,6 +359,7 @@ class BinCmd(BinCmdBase):
         """
         return CmdOutput(json.loads(output))
 
+    @isolate_call_state
     @catch_exceptions(*CLI_COMMON_EXCEPTIONS)
     @reset_command
     @run_post_exec_hooks
@@ -263,6 +402,128 @@ class BinCmd(BinCmdBase):
         return CmdOutput(output.splitlines(keepends=True))
 
 
+class ReadOnlyLines(list):
+    """
+    List of command output lines that can be shared between callers and
+    therefore cannot be modified in place. Operations that return a new list
+    e.g. slicing or concatenation are still supported.
+    """
+    def _readonly(self, *_args, **_kwargs):
+        raise TypeError(f"{self.__class__.__name__} cannot be modified")
+
+    append = extend = insert = remove = pop = clear = _readonly
+    sort = reverse = __setitem__ = __delitem__ = _readonly
+    __iadd__ = __imul__ = _readonly
+
+    def __reduce__(self):
+        return self.__class__, (list(self),)
+
+
+class FileCmdOutputCache():
+    """
+    In-memory cache of the decoded lines of files read by file-based commands.
+    The same file is typically read many times per run so we keep the
+    decoded lines as a read-only list that can be shared by all callers.
+
+    Entries are keyed on the resolved path, its size and modification time
+    plus any decode options so that a change to any of them results in a
+    miss. Once the total size of cached files exceeds max_size, least
+    recently used entries are evicted.
+    """
+    def __init__(self, max_size):
+        """
+        @param max_size: maximum total size in bytes of cached files.
+        """
+        self.max_size = max_size
+        self.size = 0
+        self._entries = OrderedDict()
+
+    @staticmethod
+    def _key(path, decode_error_handling):
+        path = os.path.realpath(path)
+        st = os.stat(path)
+        return (path, st.st_size, st.st_mtime_ns, decode_error_handling)
+
+    def get(self, path, decode_error_handling):
+        """
+        @param path: path to file.
+        @param decode_error_handling: decode errors option.
+        @return: ReadOnlyLines or None if not cached.
+        """
+        key = self._key(path, decode_error_handling)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        self._entries.move_to_end(key)
+        return entry
+
+    def set(self, path, decode_error_handling, lines):
+        """
+        @param path: path to file.
+        @param decode_error_handling: decode errors option.
+        @param lines: ReadOnlyLines of decoded lines.
+        """
+        key = self._key(path, decode_error_handling)
+        size = key[1]
+        if size > self.max_size:
+            return
+
+        if key in self._entries:
+            self.size -= size
+
+        self._entries[key] = lines
+        self.size += size
+        while self.size > self.max_size:
+            evicted, _ = self._entries.popitem(last=False)
+            self.size -= evicted[1]
+
+    def clear(self):
+        self._entries.clear()
+        self.size = 0
+
+
+FILE_CMD_OUTPUT_CACHE = FileCmdOutputCache(256 * 1024 ** 2)
+
+
+class OutputIndexCache():
+    """
+    Cache of indexes (e.g. of installed packages) keyed on the command output
+    they were built from. File-based command output is cached and shared as
+    ReadOnlyLines for the duration of a run (see FileCmdOutputCache) so an
+    index built from it can be shared too. Other output (e.g. from a binary
+    command) may be modified by its owner so is never cached.
+    """
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = {}
+
+    def get(self, index_cls, lines):
+        """
+        Return an index_cls index for lines.
+
+        @param index_cls: index class that takes lines as its only argument.
+        @param lines: list of lines of command output.
+        """
+        if not isinstance(lines, ReadOnlyLines):
+            return index_cls(lines)
+
+        # NOTE: we keep a reference to lines so its id cannot be reused.
+        key = (index_cls, id(lines))
+        if key in self._entries:
+            return self._entries[key][1]
+
+        index = index_cls(lines)
+        if len(self._entries) >= self.max_entries:
+            del self._entries[next(iter(self._entries))]
+
+        self._entries[key] = (lines, index)
+        return index
+
+    def clear(self):
+        self._entries = {}
+
+
 class FileCmd(FileCmdBase):
     """ Implements file-based command execution.
 
@@ -271,6 +532,7 @@ class FileCmd(FileCmdBase):
     """
     TYPE = "FILE"
 
+    @isolate_call_state
     @catch_exceptions(*CLI_COMMON_EXCEPTIONS)
     @reset_command
     @run_post_exec_hooks
@@ -286,52 +548,68 @@ class FileCmd(FileCmdBase):
             raise SourceNotFound(self.path)
 
         if skip_load_contents:
-            CmdOutput(None, self.path)
+            return CmdOutput(None, self.path)
 
         # NOTE: any post-exec hooks must be aware that their input will be
         # defined by the following.
         if self.json_decode:
-            with open(self.path, encoding='utf-8') as fd:
-                output = json.load(fd)
+            output = self.load_json()
         elif self.yaml_decode:
             with open(self.path, encoding='utf-8') as fd:
                 output = yaml.safe_.load(fd)
+        elif self.singleline:
+            output = self._read_lines()
+            return CmdOutput(output[0].strip(), self.path)
         else:
-            output = []
-            ln = 0
-            with open(self.path, 'rb') as fd:
-                for line in fd:
-                    ln += 1
-                    try:
-                        decode_kwargs = {}
-                        if self.decode_error_handling:
-                            decode_kwargs['errors'] = \
-                                                     self.decode_error_handling
-
-                        _out = line.decode(**decode_kwargs)
-                        output.append(_out)
-                    except UnicodeDecodeError:
-                        # maintain line count but store empty line.
-                        # we could in the future consider other decode options
-                        # as a fallback.
-                        output.append('')
-                        log.exception("failed to decode line %s "
-                                      "(decode_error_handling=%s)", ln,
-                                      self.decode_error_handling)
-
-                    if self.singleline:
-                        break
-
-            if self.singleline:
-                return CmdOutput(output[0].strip(), self.path)
+            output = FILE_CMD_OUTPUT_CACHE.get(self.path,
+                                               self.decode_error_handling)
+            if output is None:
+                output = ReadOnlyLines(self._read_lines())
+                FILE_CMD_OUTPUT_CACHE.set(self.path,
+                                          self.decode_error_handling, output)
 
         return CmdOutput(output, self.path)
 
+    def load_json(self):
+        """ Decode the contents of the file as json. """
+        with open(self.path, encoding='utf-8') as fd:
+            return json.load(fd)
+
+    def _read_lines(self):
+        """ Read and decode lines from file. If singleline is set only the
+        first line is read. """
+        output = []
+        ln = 0
+        with open(self.path, 'rb') as fd:
+            for line in fd:
+                ln += 1
+                try:
+                    decode_kwargs = {}
+                    if self.decode_error_handling:
+                        decode_kwargs['errors'] = self.decode_error_handling
+
+                    _out = line.decode(**decode_kwargs)
+                    output.append(_out)
+                except UnicodeDecodeError:
+                    # maintain line count but store empty line.
+                    # we could in the future consider other decode options
+                    # as a fallback.
+                    output.append('')
+                    log.exception("failed to decode line %s "
+                                  "(decode_error_handling=%s)", ln,
+                                  self.decode_error_handling)
+
+                if self.singleline:
+                    break
+
+        return output
+
 
 class BinFileCmd(FileCmd):
     """ This is used when we are executing an actual binary/command against a
     file. """
 
+    @isolate_call_state
     @catch_exceptions(*CLI_COMMON_EXCEPTIONS)
     @reset_command
     @run_post_exec_hooks
@@ -378,6 +656,9 @@ class DateFileCmd(FileCmd):
 
         @param output: CmdOutput object
         """
+        if output.value is None:
+            return output
+
         no_format = kwargs.get('no_format', False)
         fmt = kwargs.get('format')
         if not no_format and fmt is None:
@@ -393,6 +674,13 @@ class DateFileCmd(FileCmd):
                       output.value)
             return CmdOutput('', self.path)
 
+        date = native_date(ret[1], ret[2], ret[3], fmt)
+        if date is not None:
+            # collapse whitespace in the same way as for the date command.
+            return CmdOutput(re.sub(r"\s+", ' ', date).strip(), self.path)
+
+        log.debug("unable to natively parse date '%s' with format '%s' - "
+                  "falling back to date command", output.value, fmt)
         tz = ret[2]
         # NOTE: date command doesn't recognise HKT for some reason so we
         # convert to a format that is recognised.
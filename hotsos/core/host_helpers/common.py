@@ -25,17 +25,20 @@ class NullCache():
 
 class HostHelpersBase(abc.ABC):
     """ Base class for all hosthelpers. """
-    def __init__(self, *args, **kwargs):
+
+    @cached_property
+    def cache(self):
+        """
+        The cache is only created when first used since helpers are
+        typically created far more often than their cache is accessed.
+        """
         if not self.cache_root or not os.path.exists(self.cache_root):
             log.debug("cache root invalid or does not exist so disabling %s "
                       "cache", self.__class__.__name__)
-            self.cache = NullCache()
-        else:
-            self.cache = MPCache(self.cache_name,
-                                 f'host_helpers_{self.cache_type}',
-                                 self.cache_root)
+            return NullCache()
 
-        super().__init__(*args, **kwargs)
+        return MPCache(self.cache_name, f'host_helpers_{self.cache_type}',
+                       self.cache_root)
 
     @property
     def cache_root(self):
@@ -183,11 +186,19 @@ class ServiceManagerBase(abc.ABC):
                 'ps': self._process_info}
 
 
+# Paths under sos_commands that are read directly rather than with the
+# command catalog. They must be declared for selective sosreport extraction
+# (see root_manager) so readers must use these rather than their own copy of
+# the path.
+PS_AXO_FLAGS_PATH = ("sos_commands/process/ps_axo_flags_state_"
+                     "uid_pid_ppid_pgid_sid_cls_pri_addr_sz_wchan*_lstart_"
+                     "tty_time_cmd")
+KERNLOG_JOURNAL_PATH = 'sos_commands/logs/journalctl_--no-pager'
+SMARTCTL_DIRS = ['sos_commands/ata', 'sos_commands/nvme']
+
+
 def get_ps_axo_flags_available():
-    path = os.path.join(HotSOSConfig.data_root,
-                        "sos_commands/process/ps_axo_flags_state_"
-                        "uid_pid_ppid_pgid_sid_cls_pri_addr_sz_wchan*_lstart_"
-                        "tty_time_cmd")
+    path = os.path.join(HotSOSConfig.data_root, PS_AXO_FLAGS_PATH)
     _paths = []
     for path in glob.glob(path):
         _paths.append(path)
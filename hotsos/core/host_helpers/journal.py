@@ -0,0 +1,359 @@
+import glob
+import hashlib
+import json
+import lzma
+import mmap
+import os
+import sqlite3
+import struct
+import subprocess
+
+import fasteners
+from hotsos.core.config import HotSOSConfig
+from hotsos.core.log import log
+
+# Journal file format constants. See
+# https://systemd.io/JOURNAL_FILE_FORMAT/
+JOURNAL_SIGNATURE = b'LPKSHHRH'
+HEADER_INCOMPATIBLE_COMPRESSED_XZ = 1 << 0
+HEADER_INCOMPATIBLE_COMPRESSED_LZ4 = 1 << 1
+HEADER_INCOMPATIBLE_KEYED_HASH = 1 << 2
+HEADER_INCOMPATIBLE_COMPRESSED_ZSTD = 1 << 3
+HEADER_INCOMPATIBLE_COMPACT = 1 << 4
+HEADER_INCOMPATIBLE_SUPPORTED = (HEADER_INCOMPATIBLE_COMPRESSED_XZ |
+                                 HEADER_INCOMPATIBLE_COMPRESSED_LZ4 |
+                                 HEADER_INCOMPATIBLE_KEYED_HASH |
+                                 HEADER_INCOMPATIBLE_COMPRESSED_ZSTD |
+                                 HEADER_INCOMPATIBLE_COMPACT)
+OBJECT_COMPRESSED_XZ = 1 << 0
+OBJECT_COMPRESSED_LZ4 = 1 << 1
+OBJECT_COMPRESSED_ZSTD = 1 << 2
+OBJECT_DATA = 1
+OBJECT_ENTRY = 3
+OBJECT_HEADER = struct.Struct('<BB6xQ')
+ENTRY_HEADER = struct.Struct('<QQQ16sQ')
+# Offsets of fields within a journal file header and data object.
+HEADER_INCOMPATIBLE_FLAGS_OFFSET = 12
+HEADER_HEADER_SIZE_OFFSET = 88
+HEADER_TAIL_OBJECT_OFFSET = 136
+DATA_PAYLOAD_OFFSET = 64
+DATA_PAYLOAD_OFFSET_COMPACT = 72
+
+# Fields retained in the index. Entries are matched on the fields that have
+# their own column.
+JOURNAL_INDEX_FIELDS = ['MESSAGE', 'MESSAGE_ID', 'PRIORITY',
+                        'SYSLOG_IDENTIFIER', 'SYSLOG_PID',
+                        'OBJECT_SYSTEMD_UNIT', 'UNIT', '_COMM', '_HOSTNAME',
+                        '_PID', '_SYSTEMD_UNIT', '_TRANSPORT']
+JOURNAL_INDEX_COLUMNS = {'_TRANSPORT': 'transport',
+                         '_SYSTEMD_UNIT': 'unit',
+                         '_PID': 'pid',
+                         'MESSAGE_ID': 'message_id'}
+
+
+class JournalFormatError(Exception):
+    """ Raised when a journal file cannot be read. """
+
+
+def _decompress_lz4(data):
+    try:
+        import lz4.block  # pylint: disable=import-outside-toplevel
+    except ImportError as exc:
+        raise JournalFormatError("lz4 compressed journal data found but lz4 "
+                                 "module is not available") from exc
+
+    size = struct.unpack_from('<Q', data)[0]
+    return lz4.block.decompress(data[8:], uncompressed_size=size)
+
+
+def _decompress_zstd(data):
+    try:
+        import zstandard  # pylint: disable=import-outside-toplevel
+    except ImportError as exc:
+        raise JournalFormatError("zstd compressed journal data found but "
+                                 "zstandard module is not available") from exc
+
+    return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+
+
+class JournalFileReader():
+    """
+    Pure python reader for systemd journal files. This allows a journal to be
+    read without a journalctl binary that is compatible with the version of
+    systemd-journald that created it.
+    """
+    DECOMPRESSORS = {OBJECT_COMPRESSED_XZ: lzma.decompress,
+                     OBJECT_COMPRESSED_LZ4: _decompress_lz4,
+                     OBJECT_COMPRESSED_ZSTD: _decompress_zstd}
+    # Maximum number of decoded data objects to keep. Data objects are shared
+    # by entries e.g. _HOSTNAME so this avoids decoding them more than once.
+    DATA_CACHE_SIZE = 65536
+
+    def __init__(self, path):
+        self.path = path
+        self._data_cache = {}
+        # set from the file header
+        self._item = None
+        self._payload_offset = None
+
+    def _read_data(self, buf, offset):
+        """
+        Return (field, value) for the data object at offset.
+        """
+        if offset in self._data_cache:
+            return self._data_cache[offset]
+
+        otype, flags, size = OBJECT_HEADER.unpack_from(buf, offset)
+        if otype != OBJECT_DATA:
+            raise JournalFormatError(f"{self.path}: expected data object at "
+                                     f"offset {offset}")
+
+        payload = buf[offset + self._payload_offset:offset + size]
+        if flags:
+            decompress = self.DECOMPRESSORS.get(flags)
+            if decompress is None:
+                raise JournalFormatError(f"{self.path}: unknown compression "
+                                         f"flags {flags}")
+
+            payload = decompress(payload)
+
+        field, _, value = payload.partition(b'=')
+        data = (field.decode('utf-8', errors='replace'),
+                value.decode('utf-8', errors='replace'))
+        if len(self._data_cache) >= self.DATA_CACHE_SIZE:
+            self._data_cache = {}
+
+        self._data_cache[offset] = data
+        return data
+
+    def _read_entry(self, buf, offset, size):
+        """
+        Return (realtime, boot_id, fields) for the entry object at offset.
+        """
+        _, realtime, _, boot_id, _ = ENTRY_HEADER.unpack_from(
+            buf, offset + OBJECT_HEADER.size)
+        fields = {}
+        start = offset + OBJECT_HEADER.size + ENTRY_HEADER.size
+        for (data_offset, *_) in self._item.iter_unpack(
+                buf[start:offset + size]):
+            field, value = self._read_data(buf, data_offset)
+            fields.setdefault(field, value)
+
+        return realtime, boot_id.hex(), fields
+
+    def _entries(self, buf):
+        if buf[:8] != JOURNAL_SIGNATURE:
+            raise JournalFormatError(f"{self.path}: not a journal file")
+
+        incompat = struct.unpack_from('<I', buf,
+                                      HEADER_INCOMPATIBLE_FLAGS_OFFSET)[0]
+        if incompat & ~HEADER_INCOMPATIBLE_SUPPORTED:
+            raise JournalFormatError(f"{self.path}: unsupported incompatible "
+                                     f"flags {incompat}")
+
+        if incompat & HEADER_INCOMPATIBLE_COMPACT:
+            self._item = struct.Struct('<I')
+            self._payload_offset = DATA_PAYLOAD_OFFSET_COMPACT
+        else:
+            self._item = struct.Struct('<QQ')
+            self._payload_offset = DATA_PAYLOAD_OFFSET
+
+        offset = struct.unpack_from('<Q', buf, HEADER_HEADER_SIZE_OFFSET)[0]
+        tail = struct.unpack_from('<Q', buf, HEADER_TAIL_OBJECT_OFFSET)[0]
+        while offset and offset <= tail and offset < len(buf):
+            otype, _, size = OBJECT_HEADER.unpack_from(buf, offset)
+            if size < OBJECT_HEADER.size or offset + size > len(buf):
+                raise JournalFormatError(f"{self.path}: invalid object at "
+                                         f"offset {offset}")
+
+            if otype == OBJECT_ENTRY:
+                yield self._read_entry(buf, offset, size)
+
+            # objects are 64 bit aligned
+            offset += (size + 7) & ~7
+
+    def entries(self):
+        """
+        Generator yielding (realtime, boot_id, fields) for each entry in the
+        file where realtime is in microseconds since the epoch and fields is
+        a dictionary.
+
+        @raises JournalFormatError: if the file cannot be read.
+        """
+        with open(self.path, 'rb') as fd:
+            if not os.fstat(fd.fileno()).st_size:
+                return
+
+            with mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                try:
+                    yield from self._entries(buf)
+                except (struct.error, lzma.LZMAError) as exc:
+                    raise JournalFormatError(f"{self.path}: {exc}") from exc
+                finally:
+                    self._data_cache = {}
+
+
+class JournalIndex():
+    """
+    Indexed copy of a systemd journal directory. The journal is read once and
+    the entries stored in an sqlite database under the global tmp directory
+    so that all plugins (and plugin worker processes) can query it by unit,
+    boot and timestamp without decoding the whole journal again.
+
+    Journal files are read with JournalFileReader and if that fails we fall
+    back to exporting the journal using journalctl.
+    """
+    def __init__(self, path):
+        self.path = path
+        tmp_dir = HotSOSConfig.global_tmp_dir or HotSOSConfig.plugin_tmp_dir
+        if not tmp_dir:
+            raise JournalFormatError("no tmp directory available for "
+                                     "journal index")
+
+        key = hashlib.sha1(os.path.abspath(path).encode()).hexdigest()
+        self.db_path = os.path.join(tmp_dir, f'journal-{key}.sqlite')
+
+    def _native_entries(self):
+        paths = glob.glob(os.path.join(self.path, '**', '*.journal'),
+                          recursive=True)
+        if not paths:
+            raise JournalFormatError(f"no journal files found in {self.path}")
+
+        for path in sorted(paths):
+            yield from JournalFileReader(path).entries()
+
+    def _journalctl_entries(self):
+        cmd = ['journalctl', '-D', self.path, '-ojson', '--no-pager']
+        with subprocess.Popen(cmd, stdout=subprocess.PIPE,
+                              stderr=subprocess.DEVNULL) as proc:
+            for line in proc.stdout:
+                entry = json.loads(line)
+                fields = {}
+                for field in JOURNAL_INDEX_FIELDS:
+                    value = entry.get(field)
+                    if isinstance(value, list):
+                        value = value[0]
+
+                    if isinstance(value, str):
+                        fields[field] = value
+
+                yield (int(entry['__REALTIME_TIMESTAMP']), entry['_BOOT_ID'],
+                       fields)
+
+        if proc.returncode:
+            raise subprocess.CalledProcessError(proc.returncode, cmd)
+
+    @staticmethod
+    def _rows(entries):
+        for realtime, boot_id, fields in entries:
+            fields = {k: fields[k] for k in JOURNAL_INDEX_FIELDS
+                      if k in fields}
+            if fields.get('_PID') == '1' and 'UNIT' in fields:
+                object_unit = fields['UNIT']
+            else:
+                object_unit = fields.get('OBJECT_SYSTEMD_UNIT')
+
+            yield (realtime, boot_id, object_unit,
+                   *(fields.get(f) for f in JOURNAL_INDEX_COLUMNS),
+                   json.dumps(fields))
+
+    def _load(self, conn, entries):
+        columns = ', '.join(f'{c} TEXT' for c in
+                            JOURNAL_INDEX_COLUMNS.values())
+        conn.execute("DROP TABLE IF EXISTS entries")
+        conn.execute("CREATE TABLE entries (realtime INTEGER, boot_id TEXT, "
+                     f"object_unit TEXT, {columns}, fields TEXT)")
+        placeholders = ', '.join('?' * (len(JOURNAL_INDEX_COLUMNS) + 4))
+        conn.executemany(f"INSERT INTO entries VALUES ({placeholders})",
+                         self._rows(entries))
+
+    def _build(self, db_path):
+        log.debug("building journal index for %s", self.path)
+        with sqlite3.connect(db_path) as conn:
+            try:
+                self._load(conn, self._native_entries())
+            except (OSError, ValueError, JournalFormatError) as exc:
+                log.info("unable to read journal files natively (%s) - "
+                         "falling back to journalctl", exc)
+                self._load(conn, self._journalctl_entries())
+
+            for columns in ['unit, realtime', 'object_unit, realtime',
+                            'transport, boot_id, realtime', 'realtime',
+                            'message_id']:
+                name = 'idx_' + columns.replace(', ', '_')
+                conn.execute(f"CREATE INDEX {name} ON entries ({columns})")
+
+        conn.close()
+
+    def connect(self):
+        """
+        Return a connection to the index, building it first if it does not
+        already exist.
+        """
+        with fasteners.InterProcessLock(f'{self.db_path}.lock'):
+            if not os.path.exists(self.db_path):
+                tmp_path = f'{self.db_path}.tmp'
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
+                self._build(tmp_path)
+                os.replace(tmp_path, self.db_path)
+
+        return sqlite3.connect(self.db_path)
+
+    @staticmethod
+    def _where(conn, unit, since, kernel, matches):
+        """ Return sql WHERE clauses and parameters for a query. """
+        where = []
+        params = []
+        if unit:
+            where.append('(unit = ? OR object_unit = ?)')
+            params.extend([unit, unit])
+
+        if since is not None:
+            where.append('realtime >= ?')
+            params.append(since)
+
+        if kernel:
+            boot = conn.execute("SELECT boot_id FROM entries ORDER BY "
+                                "realtime DESC LIMIT 1").fetchone()
+            where.append("transport = 'kernel' AND boot_id = ?")
+            params.append(boot[0] if boot else None)
+
+        for field, values in (matches or {}).items():
+            column = JOURNAL_INDEX_COLUMNS.get(field)
+            if column is None:
+                column = f"json_extract(fields, '$.{field}')"
+
+            where.append(f"{column} IN ({', '.join('?' * len(values))})")
+            params.extend(values)
+
+        return where, params
+
+    def query(self, unit=None, since=None, kernel=False, matches=None):
+        """
+        Generator yielding (realtime, boot_id, fields) for each entry that
+        matches all of the given criteria, ordered by time.
+
+        @param unit: systemd unit name. Matches messages from the unit as well
+                     as messages from systemd about the unit.
+        @param since: only include entries with a realtime timestamp (in
+                      microseconds) at or after this.
+        @param kernel: only include kernel messages from the most recent boot
+                       (same as journalctl -k).
+        @param matches: dictionary of field name and list of values. Values
+                        for the same field are ORed and fields are ANDed. Only
+                        fields in JOURNAL_INDEX_FIELDS can be matched.
+        """
+        conn = self.connect()
+        try:
+            where, params = self._where(conn, unit, since, kernel, matches)
+            sql = "SELECT realtime, boot_id, fields FROM entries"
+            if where:
+                sql = f"{sql} WHERE {' AND '.join(where)}"
+
+            for realtime, boot_id, fields in conn.execute(
+                    f"{sql} ORDER BY realtime, rowid", params):
+                yield realtime, boot_id, json.loads(fields)
+        finally:
+            conn.close()
@@ -40,10 +40,6 @@ class NetworkPort(HostHelpersBase):
     mtu: str
     namespace: str = None
 
-    def __post_init__(self):
-        # Required for initializing the self.cache
-        super().__init__()
-
     @property
     def cache_root(self):
         """
@@ -1,10 +1,11 @@
 import abc
 import re
-import subprocess
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
+from functools import lru_cache
 
 from hotsos.core.factory import FactoryBase
 from hotsos.core.host_helpers.cli import CLIHelper
+from hotsos.core.host_helpers.cli.common import OutputIndexCache
 from hotsos.core.log import log
 from hotsos.core.utils import sorted_dict
 
@@ -17,25 +18,172 @@ class DPKGBadVersionSyntax(Exception):
     """ Exception raised when an invalid version is provided in a check. """
 
 
+def _dpkg_char_order(s, idx):
+    """
+    Sort weight of a version character as used by dpkg. Digits and the end
+    of the string have weight 0.
+    """
+    if idx >= len(s) or s[idx].isdigit():
+        return 0
+
+    c = s[idx]
+    if c.isalpha():
+        return ord(c)
+
+    if c == '~':
+        return -1
+
+    return ord(c) + 256
+
+
+def _dpkg_verrevcmp(a, b):
+    """
+    Compare two upstream version or revision strings using the same algorithm
+    as dpkg i.e. alternating non-digit and digit segments where non-digits
+    are compared lexically (with ~ sorting before anything, even the end of
+    the string) and digits are compared numerically.
+
+    Returns negative, zero or positive integer if a is respectively less than,
+    equal to or greater than b.
+    """
+    i = j = 0
+    len_a = len(a)
+    len_b = len(b)
+    while i < len_a or j < len_b:
+        while ((i < len_a and not a[i].isdigit()) or
+               (j < len_b and not b[j].isdigit())):
+            ac = _dpkg_char_order(a, i)
+            bc = _dpkg_char_order(b, j)
+            if ac != bc:
+                return ac - bc
+
+            i += 1
+            j += 1
+
+        start_i = i
+        while i < len_a and a[i].isdigit():
+            i += 1
+
+        start_j = j
+        while j < len_b and b[j].isdigit():
+            j += 1
+
+        num_a = int(a[start_i:i] or 0)
+        num_b = int(b[start_j:j] or 0)
+        if num_a != num_b:
+            return num_a - num_b
+
+    return 0
+
+
+def _dpkg_parse_epoch(epoch):
+    """ Validate and convert a version epoch. Raises ValueError if invalid. """
+    if not epoch:
+        raise ValueError("epoch in version is empty")
+
+    if not re.fullmatch(r'[+-]?\d+', epoch):
+        raise ValueError("epoch in version is not number")
+
+    epoch = int(epoch)
+    if epoch < 0:
+        raise ValueError("epoch in version is negative")
+
+    if epoch > 2 ** 31 - 1:
+        raise ValueError("epoch in version is too big")
+
+    return epoch
+
+
+def _dpkg_split_version(string):
+    """
+    Split version into epoch, upstream and revision, raising ValueError with
+    the same message as dpkg if it is not valid.
+    """
+    string = string.strip(' \t')
+    if re.search(r'[ \t]', string):
+        raise ValueError("version string has embedded spaces")
+
+    epoch = 0
+    if ':' in string:
+        epoch, _, string = string.partition(':')
+        epoch = _dpkg_parse_epoch(epoch)
+        if not string:
+            raise ValueError("nothing after colon in version number")
+
+    upstream, hyphen, revision = string.rpartition('-')
+    if not hyphen:
+        upstream, revision = string, ''
+    elif not revision:
+        raise ValueError("revision number is empty")
+
+    if not upstream:
+        raise ValueError("version number is empty")
+
+    if not upstream[0].isdigit():
+        raise ValueError("version number does not start with digit")
+
+    if re.search(r'[^0-9a-zA-Z.+~:-]', upstream):
+        raise ValueError("invalid character in version number")
+
+    if re.search(r'[^0-9a-zA-Z.+~]', revision):
+        raise ValueError("invalid character in revision number")
+
+    return epoch, upstream, revision
+
+
+@lru_cache(maxsize=4096)
+def dpkg_parse_version(version):
+    """
+    Parse a Debian package version string into its (epoch, upstream version,
+    revision) parts, validating it the same way as dpkg. An empty version is
+    returned as None and sorts before any other version.
+
+    Results are memoised since the same versions are parsed many times. The
+    cache is bounded since it is shared by all data roots analysed by a
+    long running process.
+
+    @param version: version string
+    @return: tuple of (epoch, upstream, revision) or None
+    """
+    if version in ('', '<unknown>'):
+        return None
+
+    try:
+        return _dpkg_split_version(version)
+    except ValueError as exc:
+        raise DPKGBadVersionSyntax(f"version '{version}' has bad syntax: "
+                                   f"{exc}") from exc
+
+
+def dpkg_compare_versions(a, b):
+    """
+    Compare two Debian package versions. This is a pure python
+    implementation of dpkg --compare-versions.
+
+    @param a: version string
+    @param b: version string
+    @return: negative, zero or positive integer if a is respectively less
+             than, equal to or greater than b.
+    """
+    va = dpkg_parse_version(a)
+    vb = dpkg_parse_version(b)
+    if va is None or vb is None:
+        return (va is not None) - (vb is not None)
+
+    if va[0] != vb[0]:
+        return va[0] - vb[0]
+
+    return (_dpkg_verrevcmp(va[1], vb[1]) or
+            _dpkg_verrevcmp(va[2], vb[2]))
+
+
 class DPKGVersion():
     """ Helper for querying and comparing dpkg packaging versions. """
     def __init__(self, a):
         self.a = str(a)
 
-    def _compare_impl(self, op, b):
-        try:
-            output = subprocess.check_output(['dpkg', '--compare-versions',
-                                              self.a, op, b],
-                                             stderr=subprocess.STDOUT)
-            if re.search(b"dpkg: warning: version.*has bad syntax:.*", output):
-                raise DPKGBadVersionSyntax(output)
-        except subprocess.CalledProcessError as se:
-            if se.returncode == 1:
-                return False
-
-            raise se
-
-        return True
+    def _compare(self, b):
+        return dpkg_compare_versions(self.a, str(b))
 
     def __repr__(self):
         return str(self)
@@ -44,19 +192,19 @@ class DPKGVersion():
         return self.a
 
     def __eq__(self, b):
-        return self._compare_impl('eq', str(b))
+        return self._compare(b) == 0
 
     def __lt__(self, b):
-        return not self._compare_impl('ge', str(b))
+        return self._compare(b) < 0
 
     def __gt__(self, b):
-        return not self._compare_impl('le', str(b))
+        return self._compare(b) > 0
 
     def __le__(self, b):
-        return self._compare_impl('le', str(b))
+        return self._compare(b) <= 0
 
     def __ge__(self, b):
-        return self._compare_impl('ge', str(b))
+        return self._compare(b) >= 0
 
     @staticmethod
     def add_version_criteria_bounds(version_criteria):
@@ -223,6 +371,140 @@ class DPKGVersion():
         return result
 
 
+@lru_cache(maxsize=1024)
+def _compile_name_alternation(exprs, suffix):
+    """
+    Compile a list of package name expressions into a single expression. Each
+    expression is wrapped in a non-capturing group so that any alternation
+    it contains remains scoped to it.
+    """
+    return re.compile('|'.join(f'(?:{expr}{suffix})' for expr in exprs))
+
+
+class PackageIndexBase(abc.ABC):
+    """
+    Index of the packages listed in the output of a packaging command e.g.
+    dpkg -l. The output is parsed once and the index shared by all helpers
+    (see get_package_index()) so that looking up packages does not require
+    re-scanning the output every time.
+
+    Entries are kept in the order they appear in the output.
+    """
+    def __init__(self, lines):
+        """
+        @param lines: list of lines of command output.
+        """
+        self.entries = []
+        self.names = {}
+        for line in lines:
+            entry = self._parse_line(line)
+            if entry is None:
+                continue
+
+            self.entries.append(entry)
+            # first entry wins
+            self.names.setdefault(entry.name, entry)
+
+        self._matches = {}
+
+    @staticmethod
+    @abc.abstractmethod
+    def _parse_line(line):
+        """ Return an index entry from line or None if it has no package. """
+
+    def find(self, exprs, suffix=''):
+        """
+        Return list of entries whose name fully matches any of the provided
+        expressions.
+
+        @param exprs: list of python.re expressions used to match package
+                      names.
+        @param suffix: optional python.re expression appended to each
+                       expression.
+        """
+        key = (tuple(exprs), suffix)
+        if key in self._matches:
+            return self._matches[key]
+
+        if not exprs:
+            matches = []
+        else:
+            cexpr = _compile_name_alternation(*key)
+            matches = [entry for entry in self.entries
+                       if cexpr.fullmatch(entry.name)]
+
+        self._matches[key] = matches
+        return matches
+
+    def find_first(self, expr, suffix=''):
+        """
+        Return the first entry whose name fully matches expr or None if none
+        match.
+        """
+        matches = self.find([expr], suffix=suffix)
+        if matches:
+            return matches[0]
+
+        return None
+
+
+@dataclass(frozen=True)
+class DPKGIndexEntry:
+    """ Installed package as listed by dpkg -l. """
+    name: str
+    state: str
+    version: str
+    arch: str
+
+
+class DPKGPackageIndex(PackageIndexBase):
+    """ Index of installed packages listed in dpkg -l output. """
+    # Matches any installed package status. See
+    # https://man7.org/linux/man-pages/man1/dpkg-query.1.html for package
+    # states. Here we check package status not desired action.
+    LINE_EXPR = re.compile(r"^(.i)\s+(\S+)\s+(\S+)\s+(.+)")
+
+    @staticmethod
+    def _parse_line(line):
+        ret = DPKGPackageIndex.LINE_EXPR.match(line)
+        if not ret:
+            return None
+
+        arch = ret[4].split()
+        return DPKGIndexEntry(ret[2], ret[1], ret[3], arch[0] if arch else '')
+
+
+@dataclass(frozen=True)
+class SnapIndexEntry:
+    """ Snap as listed by snap list --all. """
+    name: str
+    version: str
+    revision: str
+    channel: str
+    publisher: str
+    notes: str
+
+    def to_dict(self):
+        return asdict(self)
+
+
+class SnapPackageIndex(PackageIndexBase):
+    """ Index of snaps listed in snap list --all output. """
+    LINE_EXPR = re.compile(r'^(\S+)\s+(\S+)\s+(\d+)\s+(\S+)\s+(\S+)\s+'
+                           r'(\S+)')
+
+    @staticmethod
+    def _parse_line(line):
+        ret = SnapPackageIndex.LINE_EXPR.match(line)
+        if not ret:
+            return None
+
+        return SnapIndexEntry(*ret.groups())
+
+
+PACKAGE_INDEX_CACHE = OutputIndexCache(16)
+
+
 class PackageHelperBase(abc.ABC):
     """ Base class for packaging helpers. """
     def get_version(self, pkg):
@@ -362,6 +644,9 @@ class DockerImageHelper(PackageHelperBase):
 
 class APTPackageHelper(PackageHelperBase):
     """ Helpers for analysing apt packages. """
+    # Package expressions match any package name that starts with them.
+    NAME_SUFFIX_EXPR = r'[0-9a-z\-]*'
+
     def __init__(self, core_pkgs, other_pkgs=None):
         """
         @param core_pkgs: list of python.re expressions used to match
@@ -375,10 +660,19 @@ class APTPackageHelper(PackageHelperBase):
         self._core_packages = {}
         self._other_packages = {}
         self._all_packages = {}
-        # Match any installed package status
-        self._match_expr_template = r"^.i\s+({}[0-9a-z\-]*)\s+(\S+)\s+.+"
         self.cli = CLIHelper()
 
+    @property
+    def index(self):
+        """
+        Index of installed packages. Returns None if there are no packages.
+        """
+        dpkg_l = self.cli.dpkg_l()
+        if not dpkg_l:
+            return None
+
+        return PACKAGE_INDEX_CACHE.get(DPKGPackageIndex, dpkg_l)
+
     def is_installed(self, pkg, allow_full_search=False):
         """
         Check if package is installed and return True/False. By default only
@@ -395,62 +689,45 @@ class APTPackageHelper(PackageHelperBase):
         if not allow_full_search:
             return False
 
-        dpkg_l = self.cli.dpkg_l()
-        if not dpkg_l:
+        index = self.index
+        if index is None:
             return False
 
-        cexpr = re.compile(rf"^.i\s+{pkg}\s+.+")
-        for line in dpkg_l:
-            # See https://man7.org/linux/man-pages/man1/dpkg-query.1.html for
-            # package states.
-            # Here we check package status not desired action.
-            if cexpr.search(line):
-                return True
+        if pkg in index.names:
+            return True
 
-        return False
+        return index.find_first(pkg) is not None
 
     def get_version(self, pkg):
         """ Return version of package. """
         if pkg in self._all:
             return self._all[pkg]
 
-        dpkg_l = self.cli.dpkg_l()
-        if dpkg_l:
-            for line in dpkg_l:
-                name, version = self._match_package(pkg, line)
-                if name:
-                    return version
+        index = self.index
+        if index is not None:
+            entry = index.find_first(pkg, suffix=self.NAME_SUFFIX_EXPR)
+            if entry is not None:
+                return entry.version
 
         return None
 
-    def _match_package(self, pkg, entry):
-        """ Returns tuple of (package name, version) """
-        expr = self._match_expr_template.format(pkg)
-        ret = re.compile(expr).match(entry)
-        if ret:
-            return ret[1], ret[2]
-
-        return None, None
-
     @property
     def _all(self):
         """ Returns dict of all packages matched. """
         if self._all_packages:
             return self._all_packages
 
-        dpkg_l = self.cli.dpkg_l()
-        if not dpkg_l:
+        index = self.index
+        if index is None:
             return self._all_packages
-        all_exprs = self.core_pkg_exprs + self.other_pkg_exprs
-        for line in dpkg_l:
-            for pkg in all_exprs:
-                name, version = self._match_package(pkg, line)
-                if name is None:
-                    continue
-                if pkg in self.core_pkg_exprs:
-                    self._core_packages[name] = version
-                else:
-                    self._other_packages[name] = version
+
+        # Expressions in both lists are considered core.
+        other_exprs = [e for e in self.other_pkg_exprs
+                       if e not in self.core_pkg_exprs]
+        for exprs, packages in [(self.core_pkg_exprs, self._core_packages),
+                                (other_exprs, self._other_packages)]:
+            for entry in index.find(exprs, suffix=self.NAME_SUFFIX_EXPR):
+                packages[entry.name] = entry.version
 
         # ensure sorted
         self._core_packages = sorted_dict(self._core_packages)
@@ -527,28 +804,19 @@ class SnapPackageHelper(PackageHelperBase):
         """
         self.exprs = {'core': core_snaps, 'other': other_snaps or []}
         self.snaps = {'core': {}, 'other': {}, 'all': {}}
-        self._match_expr_template = (r'^({})\s+([\S]+)\s+([\d]+)\s+(\S+)\s+'
-                                     r'(\S+)\s+(\S+)\s*')
         self.ignore_disabled = ignore_disabled
         self.snap_list_all = CLIHelper().snap_list_all()
 
-    def is_installed(self, pkg):
-        return pkg in self.all
+    @property
+    def index(self):
+        """ Index of snaps. Returns None if there are no snaps. """
+        if not self.snap_list_all:
+            return None
 
-    @staticmethod
-    def _get_snap_info_from_line(line, cexpr):
-        """ Returns snap name and info if found in line. """
-        ret = re.match(cexpr, line)
-        if ret:
-            return {'name': ret.group(1),
-                    'version': ret.group(2),
-                    'revision': ret.group(3),
-                    'channel': ret.group(4),
-                    'publisher': ret.group(5),
-                    'notes': ret.group(6),
-                    }
+        return PACKAGE_INDEX_CACHE.get(SnapPackageIndex, self.snap_list_all)
 
-        return None
+    def is_installed(self, pkg):
+        return pkg in self.all
 
     def get_revision(self, snap):
         """ Return revision of package.
@@ -589,56 +857,45 @@ class SnapPackageHelper(PackageHelperBase):
                                more snaps.
         @return: a list of snaps and their info.
         """
-        if not self.snap_list_all:
+        index = self.index
+        if index is None:
             return None
 
-        info = []
-        cexpr = re.compile(self._match_expr_template.format(snap_name_expr))
-        for line in self.snap_list_all:
-            snap_info = self._get_snap_info_from_line(line, cexpr)
-            if snap_info:
-                info.append(snap_info)
+        return [entry.to_dict() for entry in index.find([snap_name_expr])]
 
-        return info
+    @staticmethod
+    def _add_latest(snaps, entry):
+        """ Add snap to dict of snaps if it is the latest version seen. """
+        name = entry.name
+        if name in snaps and entry.version <= snaps[name]['version']:
+            return
+
+        snaps[name] = {'version': entry.version, 'channel': entry.channel}
 
     @property
     def _all(self):
         if self.snaps['all']:
             return self.snaps['all']
 
-        if not self.snap_list_all:
+        index = self.index
+        if index is None:
             return {}
 
         _core = {}
         _other = {}
-        all_exprs = self.exprs['core'] + self.exprs['other']
-        for snap in all_exprs:
-            for snap_info in self._get_snap_info(snap):
-                if self.ignore_disabled and 'disabled' in snap_info['notes']:
+        # Expressions in both lists are considered core.
+        other_exprs = [e for e in self.exprs['other']
+                       if e not in self.exprs['core']]
+        for exprs, snaps in [(self.exprs['core'], _core),
+                             (other_exprs, _other)]:
+            for entry in index.find(exprs):
+                if self.ignore_disabled and 'disabled' in entry.notes:
                     log.debug("ignoring disabled snap name='%s' rev=%s",
-                              snap_info['name'], snap_info['revision'])
+                              entry.name, entry.revision)
                     continue
 
-                name = snap_info['name']
-                version = snap_info['version']
-                channel = snap_info['channel']
                 # only show latest version installed
-                if snap in self.exprs['core']:
-                    if name in _core:
-                        if version > _core[name]['version']:
-                            _core[name]['version'] = version
-                            _core[name]['channel'] = channel
-                    else:
-                        _core[name] = {'version': version,
-                                       'channel': channel}
-                else:
-                    if name in _other:
-                        if version > _other[name]['version']:
-                            _other[name]['version'] = version
-                            _other[name]['channel'] = channel
-                    else:
-                        _other[name] = {'version': version,
-                                        'channel': channel}
+                self._add_latest(snaps, entry)
 
         # ensure sorted
         self.snaps['core'] = sorted_dict(_core)
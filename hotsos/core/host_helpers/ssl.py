@@ -1,8 +1,6 @@
 import os
 from datetime import datetime, timezone
 
-from cryptography.hazmat.backends import default_backend
-from cryptography import x509
 from hotsos.core.config import HotSOSConfig
 from hotsos.core.factory import FactoryBase
 from hotsos.core.host_helpers.cli import CLIHelper
@@ -26,6 +24,11 @@ class SSLCertificate():
         """
         Return datetime() of when the certificate expires
         """
+        # Imported here since it is slow to import and rarely needed.
+        # pylint: disable-next=import-outside-toplevel
+        from cryptography.hazmat.backends import default_backend
+        # pylint: disable-next=import-outside-toplevel
+        from cryptography import x509
 
         cert = x509.load_pem_x509_certificate(self.certificate,
                                               default_backend())
@@ -1,117 +1,278 @@
 import glob
+import json
 import os
 import re
+from dataclasses import dataclass
 from datetime import datetime, timezone
-from functools import cached_property
-
-import dateutil
-import pytz
-from dateutil import parser as dateutil_parser
-# NOTE: we import direct from searchkit rather than hotsos.core.search to
-#       avoid circular dependency issues.
-from searchkit import (
-    FileSearcher,
-    SearchDef,
-    SequenceSearchDef,
-)
+from functools import cached_property, lru_cache
+
 from hotsos.core.config import HotSOSConfig
 from hotsos.core.factory import FactoryBase
-from hotsos.core.host_helpers import CLIHelper, CLIHelperFile
+from hotsos.core.host_helpers import CLIHelper
 from hotsos.core.host_helpers.common import ServiceManagerBase
 from hotsos.core.log import log
 
 
-class SystemdService():
-    """ Representation of systemd service. """
-    def __init__(self, name, state, has_instances=False):
-        self.name = name
-        self.state = state
-        self.has_instances = has_instances
+@lru_cache
+def _tzinfos():
+    """ Generates timezone name to zone mappings for common timezones.
 
-    @cached_property
-    def _tzinfos(self):
-        """ Generates timezone name to zone mappings for common timezones.
+    See https://dateutil.readthedocs.io/en/stable/parser.html#functions for
+    how it is consumed. dateutil needs timezone abbreviated to timezone
+    full name mappings in order to be able to parse timestamps with tz
+    abbreviations.
 
-        See https://dateutil.readthedocs.io/en/stable/parser.html#functions for
-        how it is consumed. dateutil needs timezone abbreviated to timezone
-        full name mappings in order to be able to parse timestamps with tz
-        abbreviations.
+    @return: dictionary of name: timezone mappings.
+    """
+    # Imported here since they are slow to import and rarely needed.
+    import pytz  # pylint: disable=import-outside-toplevel
+    from dateutil import tz  # pylint: disable=import-outside-toplevel
+
+    def fetch():
+        for zone in pytz.common_timezones:
+            try:
+                tzdate = pytz.timezone(zone).localize(datetime.utcnow(),
+                                                      is_dst=None)
+            except pytz.NonExistentTimeError:
+                pass
+            else:
+                tzinfo = tz.gettz(zone)
+                if tzinfo:
+                    yield tzdate.tzname(), tzinfo
+
+    return dict(fetch())
+
+
+@dataclass
+class SystemdUnitStatus():
+    """ Status of a unit as reported by systemctl status. """
+
+    name: str
+    active_state: str = None
+    sub_state: str = None
+    # Time the unit entered its current state e.g. when it was started if it
+    # is active.
+    since: str = None
+    main_pid: int = None
+    memory: str = None
+
+
+class SystemdUnitIndex():
+    """
+    Index of the status of all units built from a single pass over the output
+    of systemctl status --all. Unit start times from the journal and service
+    memory usage from cgroups are also collected (once, on first use) for all
+    units so that looking them up for a given unit is a dictionary lookup.
 
-        @return: dictionary of name: timezone mappings.
+    Units are keyed on their full name e.g. rsyslog.service.
+    """
+    # The following expressions need to take account of control characters
+    # that might exist in the output e.g. line can start with '*' or U+25CF
+    UNIT_EXPR = re.compile(r'^\s*\S\s+([\w:@\\.-]+\.[a-z]+)'
+                           r'(?:\s+-\s.*)?\s*$')
+    # Active: active (running) since Wed 2022-02-09 22:38:17 UTC; 17h ago
+    ACTIVE_EXPR = re.compile(r'^\s+Active: (\S+)(?: \((\S+)\))?'
+                             r'(?:\s+since \S{3} (\d{4}-\d{2}-\d{2} '
+                             r'\d{2}:\d{2}:\d{2} [\w\+:-]+);)?')
+    MAIN_PID_EXPR = re.compile(r'^\s+Main PID: (\d+)')
+    MEMORY_EXPR = re.compile(r'^\s+Memory: (\S+)')
+    # Journal MESSAGE_IDs of "Starting" and "Started" unit messages. See
+    # https://www.freedesktop.org/wiki/Software/systemd/catalog/
+    JOURNAL_START_MESSAGE_IDS = ['7d4958e842da4a758f6c1cdc7b36dcc5',
+                                 '39f53479d3a045ac8e11786248231fbf']
+    # cache|rss|swap as found in cgroup v1 memory.stat
+    CGROUPV1_MEM_EXPR = re.compile(r'(cache|rss|swap) (\d+)')
+
+    def __init__(self, lines):
         """
-        def fetch():
-            for zone in pytz.common_timezones:
-                try:
-                    tzdate = pytz.timezone(zone).localize(datetime.utcnow(),
-                                                          is_dst=None)
-                except pytz.NonExistentTimeError:
-                    pass
+        @param lines: list of lines of systemctl status --all output.
+        """
+        self.units = {}
+        self.duplicates = set()
+        unit = None
+        for line in lines:
+            ret = self.UNIT_EXPR.match(line)
+            if ret:
+                name = ret.group(1)
+                if name in self.units:
+                    # first one wins
+                    self.duplicates.add(name)
+                    unit = None
                 else:
-                    tzinfo = dateutil.tz.gettz(zone)
-                    if tzinfo:
-                        yield tzdate.tzname(), tzinfo
+                    unit = self.units[name] = SystemdUnitStatus(name)
+
+                continue
 
-        return dict(fetch())
+            if unit is None:
+                continue
+
+            ret = self.ACTIVE_EXPR.match(line)
+            if ret:
+                unit.active_state, unit.sub_state, unit.since = ret.groups()
+                continue
+
+            ret = self.MAIN_PID_EXPR.match(line)
+            if ret:
+                unit.main_pid = int(ret.group(1))
+                continue
+
+            ret = self.MEMORY_EXPR.match(line)
+            if ret:
+                unit.memory = ret.group(1)
+
+    @cached_property
+    def journal_start_times(self):
+        """
+        Most recent start time of each unit found in the journal, fetched with
+        a single journalctl query for all units.
+
+        @return: dict of unit name and datetime.datetime.
+        """
+        opts = ' '.join(['-ojson', '_PID=1'] +
+                        [f'MESSAGE_ID={msgid}'
+                         for msgid in self.JOURNAL_START_MESSAGE_IDS])
+        start_times = {}
+        for line in CLIHelper().journalctl(opts=opts):
+            try:
+                entry = json.loads(line)
+                unit = entry['UNIT']
+                usecs = int(entry['__REALTIME_TIMESTAMP'])
+            except (ValueError, KeyError, TypeError):
+                continue
+
+            # journal is in chronological order so last one wins
+            start_times[unit] = datetime.fromtimestamp(usecs / 1000000,
+                                                       tz=timezone.utc)
+
+        return start_times
+
+    @cached_property
+    def _cgroup_memory(self):
+        """
+        Memory usage in bytes of each service found in cgroups. Where both
+        cgroup v1 and v2 info exists for a service, v1 is used. A value of
+        None means that the service has a cgroup v1 memory.stat but no usage
+        info was found in it.
+
+        See https://www.kernel.org/doc/Documentation/cgroup-v1/memory.txt
+        See https://www.kernel.org/doc/Documentation/cgroup-v2.txt
+        """
+        root = os.path.join(HotSOSConfig.data_root, 'sys/fs/cgroup')
+        usage = {}
+        for path in glob.glob(os.path.join(root, 'memory/system.slice',
+                                           '*.service', 'memory.stat')):
+            total_usage = {}
+            with open(path, encoding='utf-8', errors='backslashreplace') as fd:
+                for line in fd:
+                    ret = self.CGROUPV1_MEM_EXPR.search(line)
+                    if ret:
+                        total_usage[ret.group(1)] = int(ret.group(2))
+
+            unit = os.path.basename(os.path.dirname(path))
+            usage[unit] = sum(total_usage.values()) if total_usage else None
+
+        # NOTE: memory.current (v2) is assumed not to be an approximation like
+        #       memory.usage_in_bytes in v1
+        for path in glob.glob(os.path.join(root, 'system.slice', '*.service',
+                                           'memory.current')):
+            unit = os.path.basename(os.path.dirname(path))
+            if unit in usage:
+                continue
+
+            with open(path, encoding='utf-8') as fd:
+                usage[unit] = int(fd.read())
+
+        return usage
+
+    def start_time(self, unit, state=None):
+        """ Get most recent start time of a unit.
+
+        We first look in systemd journal and if not found (perhaps because
+        the unit was not restarted for a long time) we look in the unit
+        status.
+
+        @param unit: full unit name e.g. rsyslog.service
+        @param state: optional unit file state used for logging.
+        @returns: datetime.datetime object or None if time not found.
+        """
+        start_time = self.journal_start_times.get(unit)
+        if start_time is not None:
+            return start_time
+
+        log.debug("start time not found in journal, trying unit status")
+        status = self.units.get(unit)
+        if status is None or status.active_state != 'active' or \
+                status.since is None:
+            log.warning("no active status found for %s (state=%s)", unit,
+                        state)
+            return None
+
+        if unit in self.duplicates:
+            log.warning("more than one status found for %s", unit)
+
+        # pylint: disable-next=import-outside-toplevel
+        from dateutil import parser as dateutil_parser
+        return dateutil_parser.parse(status.since, tzinfos=_tzinfos())
+
+    def memory_current_kb(self, unit):
+        """ Returns current memory usage in kbytes of a service unit.
+
+        @param unit: full unit name e.g. rsyslog.service
+        """
+        root = os.path.join(HotSOSConfig.data_root, 'sys/fs/cgroup')
+        if unit not in self._cgroup_memory:
+            log.warning("service memory info not found at %s",
+                        os.path.join(root, 'system.slice', unit,
+                                     'memory.current'))
+            return 0
+
+        total = self._cgroup_memory[unit]
+        if total is None:
+            log.warning("failed to identify mem usage info for %s in %s",
+                        unit, os.path.join(root, 'memory/system.slice', unit,
+                                           'memory.stat'))
+            return 0
+
+        return int(total / 1024)
+
+
+# SystemdUnitIndex keyed on data root. Unlike indexes that are only built from
+# command output (see OutputIndexCache) the unit index also queries the
+# journal for all units so it is cached for the duration of a run regardless
+# of where the systemctl output came from e.g. a binary command on a live host.
+# Must be cleared at the end of a run.
+SYSTEMD_UNIT_INDEX_CACHE = {}
+
+
+def get_unit_index():
+    """
+    Returns a SystemdUnitIndex for the current data root. The index is shared
+    for the duration of a run.
+    """
+    data_root = HotSOSConfig.data_root
+    if data_root not in SYSTEMD_UNIT_INDEX_CACHE:
+        SYSTEMD_UNIT_INDEX_CACHE[data_root] = SystemdUnitIndex(
+                                        CLIHelper().systemctl_status_all())
+
+    return SYSTEMD_UNIT_INDEX_CACHE[data_root]
+
+
+class SystemdService():
+    """ Representation of systemd service. """
+    def __init__(self, name, state, has_instances=False):
+        self.name = name
+        self.state = state
+        self.has_instances = has_instances
 
     @cached_property
     def start_time(self):
         """ Get most recent start time of this service unit.
 
-        We first look in systemd journal since that should be the fastest and
-        if not found (perhaps because service not restarted for a long time)
-        we look in service status.
-
         @returns: datetime.datetime object or None if time not found.
         """
         log.debug("fetching start time for svc %s", self.name)
-        cli = CLIHelper()
-        # must be in short-iso format e.g. 2023-07-04T00:05:23+0100
-        cexpr = re.compile(r"^(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\+\d{4})"
-                           r"\s+.+: (Started|Starting)")
-        journal = cli.journalctl(unit=self.name)
-        last = None
-        for line in journal:
-            ret = cexpr.search(line)
-            if ret:
-                last = ret.group(1)
-
-        if last:
-            return datetime.strptime(last, "%Y-%m-%dT%H:%M:%S%z")
-
-        log.debug("start time not found in journal, trying service status")
-        # NOTE: should consider getting service status directly rather than
-        #       searching in all but currently do this to have parity with
-        #       sosreport.
-        fs = FileSearcher(decode_errors='backslashreplace')
-        # The following expressions need to take account of control characters
-        # that might exist in the output e.g. line can start with '*' or U+25CF
-        # Active: active (running) since Wed 2022-02-09 22:38:17 UTC; 17h ago
-        seqdef = SequenceSearchDef(
-                    start=SearchDef(rf'\S+ ({self.name}.service) -'),
-                    body=SearchDef(r"\s+Active: active \(?\S*\)?\s*since "
-                                   r"\S{3} (\d{4}-\d{2}-\d{2} "
-                                   r"\d{2}:\d{2}:\d{2} [\w\+:-]+);"),
-                    end=SearchDef(r'(\S+) \S+.service'),
-                    tag='systemd')
-        with CLIHelperFile() as cli:
-            fs.add(seqdef, path=cli.systemctl_status_all())
-            sections = list(fs.run().find_sequence_sections(seqdef).values())
-            if len(sections) == 0:
-                log.warning("no active status found for %s.service (state=%s)",
-                            self.name, self.state)
-                return None
-
-            if len(sections) > 1:
-                log.warning("more than one status found for %s.service",
-                            self.name)
-
-            for result in sections[0]:
-                if result.tag == seqdef.body_tag:
-                    return dateutil_parser.parse(result.get(1),
-                                                 tzinfos=self._tzinfos)
-        log.debug("no start time identified for svc %s (state=%s)", self.name,
-                  self.state)
-        return None
+        return get_unit_index().start_time(f"{self.name}.service",
+                                           self.state)
 
     @cached_property
     def start_time_secs(self):
@@ -132,46 +293,8 @@ class SystemdService():
 
     @property
     def memory_current_kb(self):
-        """ Returns service current memory usage in kbytes.
-
-        See https://www.kernel.org/doc/Documentation/cgroup-v1/memory.txt
-        See https://www.kernel.org/doc/Documentation/cgroup-v2.txt
-        """
-        cgroupv1 = os.path.join(HotSOSConfig.data_root, 'sys/fs/cgroup',
-                                f"memory/system.slice/{self.name}.service",
-                                'memory.stat')
-        cgroupv2 = os.path.join(HotSOSConfig.data_root, 'sys/fs/cgroup',
-                                'system.slice', f"{self.name}.service",
-                                'memory.current')
-        if os.path.exists(cgroupv1):
-            total_usage = {}
-            fs = FileSearcher()
-            fs.add(SearchDef(r'(cache|rss|swap) (\d+)'), path=cgroupv1)
-            for result in fs.run().get(cgroupv1, {}):
-                total_usage[result.get(1)] = int(result.get(2))
-
-            if len(total_usage) == 0:
-                log.warning("failed to identify mem usage info for %s in %s",
-                            f"{self.name}.service", cgroupv1)
-
-            total = sum(total_usage.values())
-            if total == 0:
-                return total
-
-            return int(total / 1024)
-
-        # NOTE: memory.current (v2) is assumed not to be an approximation like
-        #       memory.usage_in_bytes in v1
-        if not os.path.exists(cgroupv2):
-            log.warning("service memory info not found at %s", cgroupv2)
-            return 0
-
-        with open(cgroupv2, encoding='utf-8') as fd:
-            total = int(fd.read())
-            if total == 0:
-                return total
-
-            return int(total / 1024)
+        """ Returns service current memory usage in kbytes. """
+        return get_unit_index().memory_current_kb(f"{self.name}.service")
 
     def __repr__(self):
         return (f"name={self.name}, state={self.state}, "
@@ -1,9 +1,10 @@
 import abc
+import fcntl
+import json
 import os
 from dataclasses import dataclass, field
 from typing import Any
 
-import yaml
 from hotsos.core.config import HotSOSConfig
 from hotsos.core.log import log
 from hotsos.core.utils import sorted_dict
@@ -54,7 +55,14 @@ class IssueEntry:
 
 
 class IssuesStoreBase(abc.ABC):
-    """ Base class for issue store backend implementatios. """
+    """
+    Base class for issue store backend implementations.
+
+    Issues are stored one per line as json and only ever appended to the
+    store so that the cost of adding an issue does not depend on how many
+    have already been added. Appends are done under an exclusive lock so that
+    the store can be safely shared by multiple processes.
+    """
     def __init__(self):
         if not os.path.isdir(HotSOSConfig.plugin_tmp_dir):
             raise FileNotFoundError(
@@ -65,12 +73,40 @@ class IssuesStoreBase(abc.ABC):
     def store_path(self):
         pass
 
+    @property
     @abc.abstractmethod
+    def store_root(self):
+        """ Name of the key under which entries are returned by load(). """
+
     def load(self):
-        pass
+        """
+        Fetch the current plugin store if it exists and return its contents
+        or an empty dict if it doesn't exist yet.
+        """
+        if not os.path.exists(self.store_path):
+            return {}
+
+        with open(self.store_path, encoding='utf-8') as fd:
+            entries = [json.loads(line) for line in fd if line.strip()]
+
+        if entries:
+            return {self.store_root: entries}
+
+        return {}
+
+    def _append(self, entry):
+        """
+        Append entry to the store.
+
+        @param entry: IssueEntry object
+        """
+        line = json.dumps(entry.content) + '\n'
+        with open(self.store_path, 'a', encoding='utf-8') as fd:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            fd.write(line)
 
     @abc.abstractmethod
-    def add(self, issue):
+    def add(self, issue, context=None):
         pass
 
 
@@ -78,81 +114,40 @@ class KnownBugsStore(IssuesStoreBase):
     """ Known bug backend store """
     @property
     def store_path(self):
-        return os.path.join(HotSOSConfig.plugin_tmp_dir, 'known_bugs.yaml')
+        return os.path.join(HotSOSConfig.plugin_tmp_dir, 'known_bugs.jsonl')
 
-    def load(self):
-        """
-        Fetch the current plugin known_bugs.yaml if it exists and return its
-        contents or None if it doesn't exist yet.
-        """
-        if not os.path.exists(self.store_path):
-            return {}
-
-        with open(self.store_path, encoding='utf-8') as fd:
-            bugs = yaml.safe_load(fd)
-        if bugs and IssuesManager.SUMMARY_OUT_BUGS_ROOT in bugs:
-            return bugs
-
-        return {}
+    @property
+    def store_root(self):
+        return IssuesManager.SUMMARY_OUT_BUGS_ROOT
 
     def add(self, issue, context=None):
-        #  def __init__(self, ref, message, key, context=None):
         entry = IssueEntry(
             ref=issue.url,
             message=issue.msg,
             key='id',
             context=context
         )
-        current = self.load()
-        if current:
-            current[IssuesManager.SUMMARY_OUT_BUGS_ROOT].append(entry.content)
-        else:
-            current = {IssuesManager.SUMMARY_OUT_BUGS_ROOT: [entry.content]}
-
-        with open(self.store_path, 'w', encoding='utf-8') as fd:
-            fd.write(yaml.dump(current))
+        self._append(entry)
 
 
 class IssuesStore(IssuesStoreBase):
     """ Potential issue backend store """
     @property
     def store_path(self):
-        return os.path.join(HotSOSConfig.plugin_tmp_dir, 'issues.yaml')
+        return os.path.join(HotSOSConfig.plugin_tmp_dir, 'issues.jsonl')
 
-    def load(self):
-        """
-        Fetch the current plugin issues.yaml if it exists and return its
-        contents or None if it doesn't exist yet.
-        """
-        if not os.path.exists(self.store_path):
-            return {}
-
-        with open(self.store_path, encoding='utf-8') as fd:
-            issues = yaml.safe_load(fd)
-        if issues and IssuesManager.SUMMARY_OUT_ISSUES_ROOT in issues:
-            return issues
-
-        return {}
+    @property
+    def store_root(self):
+        return IssuesManager.SUMMARY_OUT_ISSUES_ROOT
 
     def add(self, issue, context=None):
-        """
-        Fetch the current plugin issues.yaml if it exists and add new issue.
-        """
         entry = IssueEntry(
             ref=issue.name,
             message=issue.msg,
             key='type',
             context=context
         )
-        current = self.load()
-        key = IssuesManager.SUMMARY_OUT_ISSUES_ROOT
-        if current:
-            current[key].append(entry.content)
-        else:
-            current = {key: [entry.content]}
-
-        with open(self.store_path, 'w', encoding='utf-8') as fd:
-            fd.write(yaml.dump(current))
+        self._append(entry)
 
 
 class IssuesManager():
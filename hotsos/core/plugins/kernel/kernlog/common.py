@@ -13,6 +13,7 @@ from hotsos.core.search import (
     FileSearcher,
     SearchConstraintSearchSince,
 )
+from hotsos.core.host_helpers.common import KERNLOG_JOURNAL_PATH
 from hotsos.core.log import log
 
 KERNLOG_TS = r'\[\s*\d+\.\d+\]'
@@ -98,8 +99,7 @@ class KernLogSource(CLIHelperFile):
         super().__init__(catch_exceptions=False)
         self.path = None
         self.attempt = 0
-        self.fs_paths = ['var/log/kern.log',
-                         'sos_commands/logs/journalctl_--no-pager']
+        self.fs_paths = ['var/log/kern.log', KERNLOG_JOURNAL_PATH]
         self.fs_paths = [os.path.join(os.path.join(HotSOSConfig.data_root, f))
                          for f in self.fs_paths]
 
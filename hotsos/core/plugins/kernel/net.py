@@ -1,11 +1,14 @@
 import abc
 import os
+import re
 from collections import OrderedDict, UserList
+from collections.abc import Sequence
+from functools import cached_property
 
 from hotsos.core.config import HotSOSConfig
 from hotsos.core.host_helpers import SYSCtlFactory, CLIHelperFile
 from hotsos.core.log import log
-from hotsos.core.search import FileSearcher, SearchDef, ResultFieldInfo
+from hotsos.core.search import ResultFieldInfo
 
 
 class ProcNetBase(abc.ABC):
@@ -398,16 +401,156 @@ class SockStat(ProcNetBase):
         raise AttributeError(f"{fld} not found in {self.__class__.__name__}")
 
 
+class STOVRow():
+    """
+    A row of a STOVTable. Rows do not hold any values themselves; they are
+    looked up by field name in the columns of the table. Values set on a row
+    are stored in the table as a new column.
+    """
+    __slots__ = ('_table', '_idx')
+
+    def __init__(self, table, idx):
+        object.__setattr__(self, '_table', table)
+        object.__setattr__(self, '_idx', idx)
+
+    def __getattr__(self, key):
+        table = self._table
+        if key in table.translations:
+            return table.translations[key](self)
+
+        if key in table.columns:
+            return table.columns[key][self._idx]
+
+        raise AttributeError(f"{key} not found in row")
+
+    def __setattr__(self, key, value):
+        self._table.set_value(self._idx, key, value)
+
+
+class STOVTable(Sequence):
+    """
+    Columnar storage for a Standard Table of Values. Each field is stored as
+    a column and rows are only created on access (see STOVRow) which keeps
+    memory usage low for very large tables e.g. lsof output.
+
+    Hash indexes are maintained for the index_fields as rows are added so
+    that looking up all rows with a given value is a dictionary lookup.
+    """
+    def __init__(self, fields, index_fields=None, translations=None):
+        """
+        @param fields: list of field (column) names.
+        @param index_fields: optional list of fields to index.
+        @param translations: optional dictionary of name and function that
+                             takes a row and returns a value. Translations are
+                             looked up before columns.
+        """
+        self.columns = {name: [] for name in fields}
+        self.indexes = {name: {} for name in index_fields or []}
+        self.translations = translations or {}
+        self._len = 0
+
+    def append(self, values):
+        """
+        Add a row.
+
+        @param values: list of values in the same order as fields.
+        """
+        idx = self._len
+        for column, value in zip(self.columns.values(), values):
+            column.append(value)
+
+        for name, index in self.indexes.items():
+            value = self.columns[name][idx]
+            if value in index:
+                index[value].append(idx)
+            else:
+                index[value] = [idx]
+
+        self._len += 1
+
+    def set_value(self, idx, name, value):
+        if name not in self.columns:
+            self.columns[name] = [None] * self._len
+
+        self.columns[name][idx] = value
+
+    def lookup(self, name, value):
+        """
+        Returns list of rows where field name has the given value.
+
+        @param name: name of an indexed field.
+        @param value: value to look up.
+        """
+        return [STOVRow(self, idx)
+                for idx in self.indexes[name].get(value, [])]
+
+    def __len__(self):
+        return self._len
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [STOVRow(self, i) for i in range(self._len)[idx]]
+
+        if idx < 0:
+            idx += self._len
+
+        if not 0 <= idx < self._len:
+            raise IndexError("row index out of range")
+
+        return STOVRow(self, idx)
+
+
 class STOVParserBase(UserList):
-    """ Base class for implementations of Standard Table of Values. """
+    """ Base class for implementations of Standard Table of Values.
+
+    Values are stored in a STOVTable built in a single pass over the source
+    along with indexes of the fields listed in _index_fields.
+    """
+    _index_fields = []
+
     def __init__(self):
         super().__init__()
+        self.data = STOVTable(self._search_field_info, self._index_fields,
+                              self._translations)
         self._load()
 
     @abc.abstractmethod
     def _load(self):
         """ Load data from source. """
 
+    def _load_table(self, path):
+        """
+        Add a row to the table for each line of path that matches
+        _field_matcher.
+
+        @param path: path to file containing the table.
+        """
+        if not os.path.exists(path):
+            log.debug("file not found '%s' - skipping load", path)
+            return
+
+        finfo = self._search_field_info
+        types = [finfo.get(name) or (lambda value: value) for name in finfo]
+        expr = re.compile(self._field_matcher)
+        with open(path, encoding='utf-8', errors='backslashreplace') as fd:
+            for line in fd:
+                ret = expr.match(line)
+                if not ret:
+                    continue
+
+                self.data.append([value if value is None else vtype(value)
+                                  for vtype, value in zip(types,
+                                                          ret.groups())])
+
+    @property
+    def _translations(self):
+        """
+        Optional dictionary of name and function that takes a row and
+        returns a value. Allows exposing fields that are derived from
+        columns.
+        """
+        return {}
+
     @property
     @abc.abstractmethod
     def _search_field_info(self):
@@ -436,19 +579,6 @@ class STOVParserBase(UserList):
         """
 
 
-class FieldTranslator():
-    """ Field translator. """
-    def __init__(self, result, translations):
-        self.result = result
-        self.translations = translations
-
-    def __getattr__(self, key):
-        if key in self.translations:
-            return self.translations[key](self.result)
-
-        return getattr(self.result, key)
-
-
 class Lsof(STOVParserBase):
     """
     Provides a way to extract fields from lsof output.
@@ -462,17 +592,11 @@ class Lsof(STOVParserBase):
     systemd   1 0 mem  REG    9,1    18976 51133 /lib/
     /*...*/
     """
+    _index_fields = ['NODE', 'PID', 'COMMAND']
 
     def _load(self):
-        search = FileSearcher()
         with CLIHelperFile() as cli:
-            fout = cli.lsof_Mnlc()
-            search.add(SearchDef(self._header_matcher, tag='header'), fout)
-            search.add(SearchDef(self._field_matcher, tag='content',
-                                 field_info=self._search_field_info), fout)
-            results = search.run()
-            for r in results.find_by_tag('content'):
-                self.data.append(r)
+            self._load_table(cli.lsof_Mnlc())
 
     @staticmethod
     def _int_if_numeric(value):
@@ -527,7 +651,13 @@ class Lsof(STOVParserBase):
         return self._search_field_info
 
     def all_with_inode(self, inode):
-        return list(filter(lambda x: (x.NODE == inode), self.data))
+        return self.data.lookup('NODE', inode)
+
+    def all_with_pid(self, pid):
+        return self.data.lookup('PID', pid)
+
+    def all_with_command(self, command):
+        return self.data.lookup('COMMAND', command)
 
 
 class NetLink(STOVParserBase):
@@ -541,16 +671,15 @@ class NetLink(STOVParserBase):
     0000000000000000 0   142171 00000113 0    0    0    2     0     411370
     /*...*/
     """
+    _index_fields = ['Pid', 'Drops', 'Inode']
 
     def _load(self):
-        search = FileSearcher()
-        path = os.path.join(HotSOSConfig.data_root, 'proc/net/netlink')
-        search.add(SearchDef(self._header_matcher, tag='header'), path)
-        search.add(SearchDef(self._field_matcher, tag='content',
-                             field_info=self._search_field_info), path)
-        results = search.run()
-        for r in results.find_by_tag('content'):
-            self.data.append(FieldTranslator(r, self.fields))
+        self._load_table(os.path.join(HotSOSConfig.data_root,
+                                      'proc/net/netlink'))
+
+    @property
+    def _translations(self):
+        return self.fields
 
     @property
     def _search_field_info(self):
@@ -603,9 +732,14 @@ class NetLink(STOVParserBase):
             'sk_inode_num': lambda result: getattr(result, 'Inode'),
         }
 
-    @property
+    @cached_property
     def all_with_drops(self):
-        v = list(filter(lambda x: (x.sk_drops > 0), self.data))
+        # The Drops index is small (one entry per distinct drop count) so
+        # there is no need to scan every socket.
+        drops_index = self.data.indexes['Drops']
+        idxs = sorted(idx for drops, _idxs in drops_index.items()
+                      if drops > 0 for idx in _idxs)
+        v = [self.data[idx] for idx in idxs]
         if v:
             # Correlate netlink sockets with process id's by inode
             # only if there's matching data.
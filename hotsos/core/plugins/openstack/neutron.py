@@ -57,7 +57,9 @@ class ServiceChecks():
         cli = CLIHelper()
         cexpr = re.compile(r"Started OpenStack Neutron OVS cleanup.")
         for line in cli.journalctl(unit="neutron-ovs-cleanup"):
-            if re.compile("-- Reboot --").match(line):
+            # older versions of journalctl print "-- Reboot --" and newer
+            # ones "-- Boot <id> --".
+            if re.compile(r"-- (Reboot|Boot \S+) --").match(line):
                 # reset after reboot
                 run_manually = False
                 start_count = 0
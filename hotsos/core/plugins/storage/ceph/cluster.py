@@ -1,4 +1,5 @@
 import logging
+import os
 import re
 from functools import cached_property
 
@@ -15,7 +16,7 @@ from hotsos.core.plugins.storage.ceph.daemon import (
     CephMon,
     CephOSD,
 )
-from hotsos.core.utils import sorted_dict
+from hotsos.core.utils import iter_json_array, sorted_dict
 
 log = logging.getLogger()
 
@@ -601,46 +602,75 @@ class CephCluster():  # pylint: disable=too-many-public-methods
         rnames = set(self.daemon_release_names('osd').keys())
         return len(rnames) == 1 and required_rname in rnames
 
+    @staticmethod
+    def _iter_pg_stats():
+        """
+        Generator yielding pg_stats entries from ceph pg dump one at a time so
+        that the (potentially very large) dump is never fully loaded into
+        memory.
+        """
+        with CLIHelperFile() as cli:
+            path = cli.ceph_pg_dump_json_decoded()
+            if not path or not os.path.getsize(path):
+                return
+
+            try:
+                yield from iter_json_array(path, ['pg_map', 'pg_stats'])
+            except ValueError as exc:
+                log.warning("failed to decode pg_stats from %s: %s", path,
+                            exc)
+
     @cached_property
-    def laggy_pgs(self):
-        if not self.pg_dump:
-            return []
+    def _problem_pgs(self):
+        """
+        Collect laggy and large omap pgs from ceph pg dump. These are
+        gathered together so that the dump is only streamed once.
 
+        Returns tuple of (list of laggy pgs, list of large omap pgs).
+        """
         laggy_pgs = []
+        large_omap_pgs = []
         # The states we consider problematic for network related issues
         laggy_like_states = ['laggy', 'wait']
-        for pg in self.pg_dump['pg_map']['pg_stats']:
+        for pg in self._iter_pg_stats():
             if any(x in pg['state'].split('+') for x in laggy_like_states):
                 laggy_pgs.append(pg)
 
-        return laggy_pgs
+            if pg['stat_sum']['num_large_omap_objects'] > 0:
+                large_omap_pgs.append(pg)
+
+        return laggy_pgs, large_omap_pgs
+
+    @cached_property
+    def laggy_pgs(self):
+        return self._problem_pgs[0]
+
+    @cached_property
+    def _pool_names(self):
+        """ Map of pool id to pool name. """
+        names = {}
+        for pool in self._osd_dump.get('pools', []):
+            names.setdefault(pool['pool'], pool['pool_name'])
+
+        return names
 
     def pool_id_to_name(self, pool_id):
         if not self._osd_dump:
             return None
 
-        pools = self._osd_dump.get('pools', [])
-        for pool in pools:
-            if pool['pool'] == int(pool_id):
-                return pool['pool_name']
-
-        return None
+        return self._pool_names.get(int(pool_id))
 
     @cached_property
     def large_omap_pgs(self):
         _large_omap_pgs = {}
-        if not self.pg_dump:
-            return _large_omap_pgs
-
-        for pg in self.pg_dump['pg_map']['pg_stats']:
-            if pg['stat_sum']['num_large_omap_objects'] > 0:
-                pg_id = pg['pgid']
-                pg_pool_id = pg_id.partition('.')[0]
-                _large_omap_pgs[pg['pgid']] = {
-                    'pool': self.pool_id_to_name(pg_pool_id),
-                    'last_scrub_stamp': pg['last_scrub_stamp'],
-                    'last_deep_scrub_stamp': pg['last_deep_scrub_stamp']
-                }
+        for pg in self._problem_pgs[1]:
+            pg_id = pg['pgid']
+            pg_pool_id = pg_id.partition('.')[0]
+            _large_omap_pgs[pg['pgid']] = {
+                'pool': self.pool_id_to_name(pg_pool_id),
+                'last_scrub_stamp': pg['last_scrub_stamp'],
+                'last_deep_scrub_stamp': pg['last_deep_scrub_stamp']
+            }
 
         return _large_omap_pgs
 
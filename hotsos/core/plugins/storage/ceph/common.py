@@ -427,11 +427,10 @@ class CephChecks(StorageBase):
         """
         osds = {}
         tcmalloc_osds = 0
-        for row in Lsof():
-            if row.COMMAND == 'ceph-osd':
-                osds[row.PID] = 1
-                if re.search("libtcmalloc", row.NAME):
-                    tcmalloc_osds += 1
+        for row in Lsof().all_with_command('ceph-osd'):
+            osds[row.PID] = 1
+            if re.search("libtcmalloc", row.NAME):
+                tcmalloc_osds += 1
 
         return len(osds) == tcmalloc_osds
 
@@ -4,6 +4,7 @@ from functools import cached_property
 
 from hotsos.core.config import HotSOSConfig
 from hotsos.core.host_helpers import CLIHelper, APTPackageHelper
+from hotsos.core.host_helpers.common import SMARTCTL_DIRS
 from hotsos.core.log import log
 from hotsos.core.plugins.storage import StorageBase
 
@@ -25,8 +26,8 @@ class SmartctlChecks(StorageBase):
             return True
 
         # Check if smartctl output exists in sosreport
-        sos_commands = os.path.join(HotSOSConfig.data_root, 'sos_commands')
-        for path in [os.path.join(sos_commands, d) for d in ('nvme', 'ata')]:
+        for path in [os.path.join(HotSOSConfig.data_root, d)
+                     for d in SMARTCTL_DIRS]:
             if os.path.isdir(path) and os.listdir(path):
                 log.debug("smartctl data found in '%s'", path)
                 return True
@@ -1,4 +1,6 @@
 import abc
+import copy
+import importlib
 import os
 from enum import IntEnum, auto
 from dataclasses import dataclass
@@ -8,12 +10,14 @@ from jinja2 import FileSystemLoader, Environment
 from hotsos.core.config import HotSOSConfig
 from hotsos.core.issues import IssuesManager
 from hotsos.core.log import log
+from hotsos.core.profiling import PROFILER
 from hotsos.core.ycheck.engine.common import YHandlerBase
 from hotsos.core.ycheck.scenarios import YScenarioChecker
 from hotsos.core.ycheck.common import GlobalSearcher
 from hotsos.core.ycheck.events import EventsSearchPreloader
 from hotsos.core.ycheck.scenarios import ScenariosSearchPreloader
 from hotsos.core.exceptions import NameNotSetError
+from hotsos.plugin_extensions import PLUGIN_MANIFEST
 
 PLUGINS = {}
 PLUGIN_RUN_ORDER = []
@@ -39,9 +43,9 @@ class PluginRegistryMeta(type):
           should appear in the summary entry for that plugin. These indexes
           start at 0 and are unique to a plugin.
 
-    NOTE: at the time of writing these registrations are triggered by importing
-          the plugin in hotsos.plugin_extensions.__init__.py so be sure to add
-          new plugins there.
+    NOTE: these registrations are triggered by importing the modules listed
+          for the plugin in hotsos.plugin_extensions.PLUGIN_MANIFEST (see
+          load_plugin()) so be sure to add new plugins there.
     """
 
     def __init__(cls, _name, _mro, members):
@@ -76,8 +80,26 @@ class HOTSOSDumper(yaml.Dumper):  # pylint: disable=too-many-ancestors
 
 
 def get_plugins_sorted():
-    """ Return list of plugin names in the order they are to be run. """
-    return [e[0] for e in sorted(PLUGIN_RUN_ORDER, key=lambda e: e[1])]
+    """
+    Return list of plugin names in the order they are to be run. This does
+    not require any plugins to be loaded.
+    """
+    return list(PLUGIN_MANIFEST)
+
+
+def load_plugin(plugin):
+    """
+    Import the modules of a plugin so that its parts are registered. This is
+    a no-op if they have already been imported.
+
+    Returns list of registered parts.
+
+    @param plugin: plugin name.
+    """
+    for module in PLUGIN_MANIFEST.get(plugin, []):
+        importlib.import_module(module)
+
+    return PLUGINS[plugin]
 
 
 def yaml_dump(data):
@@ -365,59 +387,25 @@ class ApplicationSummaryBase(metaclass=PluginRegistryMeta):
 
 class PartOutputManager():
     """
-    Collects output of all parts from a plugin and saves them in YAML format.
+    Collects output of all parts from a plugin. Output is kept in memory
+    until it is aggregated at the end of the plugin run.
+
+    When plugins are run in a separate process their aggregated output is
+    returned to the parent so there is no need to save it to disk.
     """
+    def __init__(self):
+        self.indexes = {}
 
     def save(self, data, index):
         """
-        Save part output yaml in temporary location. These are collected and
-        aggregated at the end of the plugin run.
+        Save part output. These are collected and aggregated at the end of the
+        plugin run.
         """
         log.debug("saving entry: %s (index=%s)", list(data.keys())[0], index)
-        HOTSOSDumper.add_representer(
-            dict,
-            HOTSOSDumper.represent_dict_preserve_order)
-        out = yaml.dump(data, Dumper=HOTSOSDumper,
-                        default_flow_style=False).rstrip("\n")
-
-        part_path = os.path.join(HotSOSConfig.plugin_tmp_dir,
-                                 (f"{HotSOSConfig.plugin_name}."
-                                  f"{HotSOSConfig.part_name}.part.yaml"))
-
-        # don't clobber
-        if os.path.exists(part_path):
-            newpath = part_path
-            i = 0
-            while os.path.exists(newpath):
-                i += 1
-                newpath = f"{part_path}.{i}"
-
-            part_path = newpath
-
-        with open(part_path, 'w', encoding='utf-8') as fd:
-            fd.write(out)
-
-        self.add_to_index(index, part_path)
-
-    @property
-    def indexes(self):
-        path = os.path.join(HotSOSConfig.plugin_tmp_dir, "index.yaml")
-        if os.path.exists(path):
-            with open(path, encoding='utf-8') as fd:
-                return yaml.safe_load(fd.read()) or {}
-
-        return {}
-
-    def add_to_index(self, index, part):
-        indexes = self.indexes
-        path = os.path.join(HotSOSConfig.plugin_tmp_dir, "index.yaml")
-        with open(path, 'w', encoding='utf-8') as fd:
-            if index in indexes:
-                indexes[index].append(part)
-            else:
-                indexes[index] = [part]
-
-            fd.write(yaml.dump(indexes))
+        if index in self.indexes:
+            self.indexes[index].append(data)
+        else:
+            self.indexes[index] = [data]
 
     @staticmethod
     def meld_part_output(data, existing):
@@ -445,13 +433,10 @@ class PartOutputManager():
         parts = {}
         for index in sorted(self.indexes):
             for part in self.indexes[index]:
-                with open(part, encoding='utf-8') as fd:
-                    part_yaml = yaml.safe_load(fd)
-
-                    # Don't allow root level keys to be clobbered, instead just
-                    # update them. This assumes that part subkeys will be
-                    # unique.
-                    self.meld_part_output(part_yaml, parts)
+                # Don't allow root level keys to be clobbered, instead just
+                # update them. This assumes that part subkeys will be
+                # unique. A copy is melded since this modifies its input.
+                self.meld_part_output(copy.deepcopy(part), parts)
 
         return {HotSOSConfig.plugin_name: parts}
 
@@ -608,7 +593,7 @@ class PluginRunner():
     """
     def __init__(self, plugin):
         self.plugin = plugin
-        self.parts = PLUGINS[plugin]
+        self.parts = load_plugin(plugin)
         self.failed_parts = []
         self.part_mgr = PartOutputManager()
         self.issues_mgr = IssuesManager()
@@ -618,7 +603,8 @@ class PluginRunner():
         # Load searches into the GlobalSearcher
         for preloader in [EventsSearchPreloader, ScenariosSearchPreloader]:
             try:
-                preloader(global_searcher).run()
+                with PROFILER.profile('preloader', preloader.__name__):
+                    preloader(global_searcher).run()
             # We really do want to catch all here since we don't care why
             # it failed but don't want to fail hard if it does.
             except Exception as exc:  # pylint: disable=W0718
@@ -640,7 +626,8 @@ class PluginRunner():
             # update current env to reflect actual part being run
             HotSOSConfig.part_name = name
             try:
-                always_part(global_searcher).run()
+                with PROFILER.profile('part', name):
+                    always_part(global_searcher).run()
             # We really do want to catch all here since we don't care why
             # it failed but don't want to fail hard if it does.
             except Exception as exc:  # pylint: disable=W0718
@@ -679,6 +666,45 @@ class PluginRunner():
 
         return False
 
+    def _run_plugin_part(self, part_info, global_searcher):
+        """ Execute a single part for the current plugin context.
+
+        @param part_info: dict containing part runner and summary index.
+        @param global_searcher: GlobalSearcher object
+        """
+        runner = part_info['runner']
+        name = runner.__name__
+        if issubclass(runner, YHandlerBase):
+            inst = runner(global_searcher)
+        else:
+            inst = runner(global_searcher=global_searcher)
+
+        # Only run plugin if it declares itself runnable.
+        if not HotSOSConfig.force_mode and not inst.is_runnable():
+            log.debug("%s.%s not runnable - skipping",
+                      HotSOSConfig.plugin_name, name)
+            return
+
+        log.debug("running %s.%s", HotSOSConfig.plugin_name, name)
+        try:
+            # NOTE: since all parts are expected to be implementations
+            # of PluginPartBase we expect them to always define an
+            # output property.
+            for key, entry in inst.output.items():
+                out = {key: entry.data}
+                if inst.summary_subkey:
+                    out = {inst.summary_subkey: out}
+
+                part_max = PluginPartBase.PLUGIN_PART_INDEX_MAX
+                part_index = part_info['summary_part_index']
+                index = (part_index * part_max) + entry.index
+                self.part_mgr.save(out, index=index)
+        # We really do want to catch all here since we don't care why
+        # it failed but don't want to fail hard if it does.
+        except Exception as exc:  # pylint: disable=W0718
+            self.failed_parts.append(name)
+            log.exception("part '%s' raised exception: %s", name, exc)
+
     def _run_plugin_parts(self, global_searcher):
         """ Execute parts for the current plugin context.
 
@@ -687,59 +713,56 @@ class PluginRunner():
         """
         for part_info in self.parts:
             # update current env to reflect actual part being run
-            runner = part_info['runner']
-            name = runner.__name__
+            name = part_info['runner'].__name__
             HotSOSConfig.part_name = name
-            if issubclass(runner, YHandlerBase):
-                inst = runner(global_searcher)
-            else:
-                inst = runner(global_searcher=global_searcher)
-
-            # Only run plugin if it declares itself runnable.
-            if not HotSOSConfig.force_mode and not inst.is_runnable():
-                log.debug("%s.%s not runnable - skipping",
-                          HotSOSConfig.plugin_name, name)
-                continue
-
-            log.debug("running %s.%s", HotSOSConfig.plugin_name, name)
-            try:
-                # NOTE: since all parts are expected to be implementations
-                # of PluginPartBase we expect them to always define an
-                # output property.
-                for key, entry in inst.output.items():
-                    out = {key: entry.data}
-                    if inst.summary_subkey:
-                        out = {inst.summary_subkey: out}
-
-                    part_max = PluginPartBase.PLUGIN_PART_INDEX_MAX
-                    part_index = part_info['summary_part_index']
-                    index = (part_index * part_max) + entry.index
-                    self.part_mgr.save(out, index=index)
-            # We really do want to catch all here since we don't care why
-            # it failed but don't want to fail hard if it does.
-            except Exception as exc:  # pylint: disable=W0718
-                self.failed_parts.append(name)
-                log.exception("part '%s' raised exception: %s", name, exc)
+            with PROFILER.profile('part', name):
+                self._run_plugin_part(part_info, global_searcher)
 
         # Add issues to summary.
         self._save_issues_to_summary()
 
         return self.part_mgr.all()
 
-    def run(self):
-        """ Execute all plugin parts. """
+    def preload(self, global_searcher):
+        """
+        Load the searches for this plugin into the global searcher. The
+        searcher may be shared with other plugins so that all searches get
+        executed together before any plugin is run.
+
+        Returns True if the plugin is runnable and its searches were loaded,
+        otherwise False.
+
+        @param global_searcher: GlobalSearcher object
+        """
         self.failed_parts = []
         if not self._plugin_is_runnable():
             log.info("plugin '%s' not runnable - skipping", self.plugin)
-            return {}
+            return False
+
+        self._load_global_searcher(global_searcher)
+        global_searcher.register_plugin_searches(self.plugin)
+        return True
 
-        with GlobalSearcher() as global_searcher:
-            self._load_global_searcher(global_searcher)
+    def run(self, global_searcher=None):
+        """ Execute all plugin parts.
 
+        @param global_searcher: optional GlobalSearcher object that has already
+                                been loaded with the searches for this plugin
+                                using preload(). If not provided, a new one is
+                                created and loaded for the lifetime of this
+                                plugin run.
+        """
+        if global_searcher is None:
+            global_searcher = GlobalSearcher()
+            if not self.preload(global_searcher):
+                return {}
+
+        with global_searcher:
             # Run the searches so that results are ready to be consumed when
-            # the parts and handlers are run.
+            # the parts and handlers are run. This is a no-op if they have
+            # already been run.
             global_searcher.run()
 
-            self._run_always_parts(global_searcher)
-
-            return self._run_plugin_parts(global_searcher)
+            with PROFILER.profile('plugin', self.plugin):
+                self._run_always_parts(global_searcher)
+                return self._run_plugin_parts(global_searcher)
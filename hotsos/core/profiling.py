@@ -0,0 +1,207 @@
+import glob
+import json
+import os
+import resource
+import sys
+import time
+from contextlib import contextmanager
+
+from hotsos.core.config import HotSOSConfig
+from hotsos.core.log import log
+
+# Kinds of record and the summary key under which they are shown (in this
+# order). Kinds that are not per-plugin are not keyed by name.
+PROFILE_KINDS = {'search': 'search',
+                 'plugin': 'total',
+                 'preloader': 'preloaders',
+                 'part': 'parts',
+                 'scenario': 'scenarios',
+                 'event': 'events'}
+UNNAMED_PROFILE_KINDS = ['search', 'plugin']
+# Records that do not belong to any plugin e.g. the global search are shown
+# under this key.
+GLOBAL_PROFILE_KEY = 'global'
+PROFILE_METRICS = ['wall', 'cpu', 'rss-delta-kb', 'subprocesses',
+                   'bytes-read']
+
+
+class Profiler():
+    """
+    Records the resources used by the global search and each plugin, search
+    preloader, plugin part, scenario and event when profiling is enabled
+    (HotSOSConfig.profile). Records are nested e.g. a plugin record includes
+    the resources used by all of its parts.
+
+    The following are recorded for each:
+
+        * wall - elapsed time in seconds.
+        * cpu - user + system time in seconds of this process and any
+                subprocesses it waited on.
+        * rss-delta-kb - increase in peak resident set size in kilobytes.
+        * subprocesses - number of subprocesses started.
+        * bytes-read - number of bytes read (rchar from /proc/<pid>/io) by
+                       this process and its subprocesses e.g. search workers.
+    """
+    def __init__(self):
+        self.records = []
+        self.subprocesses = 0
+        self._audit_hook_installed = False
+
+    def _audit_hook(self, event, _args):
+        if event == 'subprocess.Popen':
+            self.subprocesses += 1
+
+    def _install_audit_hook(self):
+        # NOTE: audit hooks cannot be removed so we only install one if
+        #       profiling is actually used.
+        if not self._audit_hook_installed:
+            sys.addaudithook(self._audit_hook)
+            self._audit_hook_installed = True
+
+    @staticmethod
+    def _rchar(pid):
+        try:
+            with open(f'/proc/{pid}/io', encoding='utf-8') as fd:
+                for line in fd:
+                    if line.startswith('rchar:'):
+                        return int(line.split()[1])
+        except OSError:
+            pass
+
+        return 0
+
+    @staticmethod
+    def _live_descendants(pid):
+        """ Returns list of pids of all live descendants of pid. """
+        pids = []
+        for path in glob.glob(f'/proc/{pid}/task/*/children'):
+            try:
+                with open(path, encoding='utf-8') as fd:
+                    children = fd.read().split()
+            except OSError:
+                continue
+
+            for child in children:
+                pids.append(child)
+                pids.extend(Profiler._live_descendants(child))
+
+        return pids
+
+    @classmethod
+    def _bytes_read(cls):
+        """
+        Returns number of bytes read by this process and its descendants. The
+        kernel adds the io of a child to its parent once it has been reaped so
+        only those still running need to be added.
+        """
+        return sum(cls._rchar(pid)
+                   for pid in [os.getpid()] +
+                   cls._live_descendants(os.getpid()))
+
+    def _sample(self):
+        usage = (resource.getrusage(resource.RUSAGE_SELF),
+                 resource.getrusage(resource.RUSAGE_CHILDREN))
+        return {'wall': time.perf_counter(),
+                'cpu': sum(u.ru_utime + u.ru_stime for u in usage),
+                # ru_maxrss is in kilobytes on Linux
+                'rss-delta-kb': usage[0].ru_maxrss,
+                'subprocesses': self.subprocesses,
+                'bytes-read': self._bytes_read()}
+
+    @contextmanager
+    def profile(self, kind, name, plugin=None):
+        """
+        Context manager that records the resources used within it. Does
+        nothing if profiling is not enabled.
+
+        @param kind: one of PROFILE_KINDS
+        @param name: name of the thing being profiled.
+        @param plugin: optional plugin name. Defaults to the current plugin.
+        """
+        if not HotSOSConfig.profile:
+            yield
+            return
+
+        self._install_audit_hook()
+        start = self._sample()
+        try:
+            yield
+        finally:
+            end = self._sample()
+            record = {'kind': kind,
+                      'plugin': plugin or HotSOSConfig.plugin_name,
+                      'name': name,
+                      'pid': os.getpid(),
+                      'start': start['wall']}
+            record.update({key: end[key] - start[key]
+                           for key in PROFILE_METRICS})
+            self.records.append(record)
+
+    def reset(self):
+        self.records = []
+
+    def summary(self):
+        """
+        Return records as a dict keyed by plugin then kind then name. Records
+        with the same name are aggregated.
+        """
+        kinds = list(PROFILE_KINDS)
+        out = {}
+        entries = []
+        for record in sorted(self.records,
+                             key=lambda r: kinds.index(r['kind'])):
+            parent = out.setdefault(record['plugin'] or 'hotsos', {})
+            key = PROFILE_KINDS[record['kind']]
+            if record['kind'] not in UNNAMED_PROFILE_KINDS:
+                parent = parent.setdefault(key, {})
+                key = record['name']
+
+            if key not in parent:
+                parent[key] = dict.fromkeys(PROFILE_METRICS, 0)
+                entries.append(parent[key])
+
+            for metric in PROFILE_METRICS:
+                parent[key][metric] += record[metric]
+
+        for entry in entries:
+            for metric in ['wall', 'cpu']:
+                entry[metric] = round(entry[metric], 3)
+
+        return out
+
+    def trace(self):
+        """
+        Return records in Chrome trace event format which can be loaded into
+        e.g. chrome://tracing or https://ui.perfetto.dev.
+        """
+        if not self.records:
+            return {'traceEvents': []}
+
+        epoch = min(r['start'] for r in self.records)
+        events = []
+        for record in self.records:
+            name = record['name']
+            if record['kind'] != 'plugin':
+                name = f"{record['plugin']}.{name}"
+
+            events.append({'name': name,
+                           'cat': record['kind'],
+                           'ph': 'X',
+                           'ts': round((record['start'] - epoch) * 10 ** 6),
+                           'dur': round(record['wall'] * 10 ** 6),
+                           'pid': record['pid'],
+                           'tid': record['pid'],
+                           'args': {'cpu': round(record['cpu'], 6),
+                                    **{key: record[key]
+                                       for key in PROFILE_METRICS
+                                       if key not in ['wall', 'cpu']}}})
+
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def save_trace(self, path):
+        log.debug("saving profile trace to %s", path)
+        with open(path, 'w', encoding='utf-8') as fd:
+            json.dump(self.trace(), fd)
+
+
+PROFILER = Profiler()
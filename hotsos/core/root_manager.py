@@ -1,4 +1,6 @@
+import fnmatch
 import os
+import re
 import shutil
 import sys
 import tarfile
@@ -7,9 +9,179 @@ from functools import cached_property
 
 from hotsos.core.config import HotSOSConfig
 from hotsos.core.host_helpers import CLIHelper
+from hotsos.core.host_helpers.cli.cli import get_command_file_paths
+from hotsos.core.host_helpers.common import (
+    KERNLOG_JOURNAL_PATH,
+    PS_AXO_FLAGS_PATH,
+    SMARTCTL_DIRS,
+)
 from hotsos.core.log import log
 from hotsos.core.exceptions import MismatchError, InvalidPathError
 
+# Paths under sos_commands that are read directly rather than with the command
+# catalog.
+SELECTIVE_EXTRACT_PATHS = ([PS_AXO_FLAGS_PATH, KERNLOG_JOURNAL_PATH] +
+                           [f"{path}/*" for path in SMARTCTL_DIRS])
+
+# Names of sosreport archives found when searching a directory for data roots.
+SOSREPORT_ARCHIVE_RE = re.compile(r'^sosreport-.+\.tar(\.(xz|gz|bz2))?$')
+
+
+def is_sosreport_dir(path):
+    """ Returns True if path is an unpacked sosreport. """
+    return os.path.isdir(os.path.join(path, 'sos_commands'))
+
+
+def find_data_roots(paths):
+    """
+    Expand the data root paths provided on the command line. A directory that
+    is not itself a sosreport but contains sosreport archives and/or unpacked
+    sosreports is replaced by those entries (sorted by name). Archives must be
+    regular files named like those created by sos (see SOSREPORT_ARCHIVE_RE)
+    so that unrelated files are never opened. Anything else is returned
+    as-is.
+
+    @param paths: list of paths.
+    @return: list of data root paths.
+    """
+    data_roots = []
+    for path in paths:
+        if not os.path.isdir(path) or is_sosreport_dir(path):
+            data_roots.append(path)
+            continue
+
+        found = []
+        for entry in sorted(os.listdir(path)):
+            entry = os.path.join(path, entry)
+            if os.path.isdir(entry):
+                if is_sosreport_dir(entry):
+                    found.append(entry)
+            elif (os.path.isfile(entry) and
+                  SOSREPORT_ARCHIVE_RE.match(os.path.basename(entry)) and
+                  tarfile.is_tarfile(entry)):
+                found.append(entry)
+
+        if not found:
+            data_roots.append(path)
+            continue
+
+        log.debug("found %s data root(s) in %s", len(found), path)
+        data_roots.extend(found)
+
+    return data_roots
+
+
+class ArchiveMemberFilter():
+    """
+    Selects the members of a sosreport archive that need to be extracted.
+
+    The bulk of a sosreport is typically the output of commands saved under
+    sos_commands which is mostly accessed using the command catalog. Members
+    under sos_commands are therefore only selected if they match a path
+    pattern used by the catalog or one declared in SELECTIVE_EXTRACT_PATHS
+    for those read directly.
+    Everything else is always selected since it is accessed directly by
+    plugins. The targets of selected links are also selected and any that
+    were already skipped are recorded as missing so that they can be
+    extracted with a subsequent pass (see select_missing()).
+    """
+    def __init__(self, rootdir, patterns):
+        """
+        @param rootdir: name of the root directory of the archive.
+        @param patterns: glob patterns of paths relative to rootdir.
+        """
+        self.rootdir = rootdir
+        self.regex = re.compile('|'.join(fnmatch.translate(f"{rootdir}/{p}")
+                                         for p in sorted(patterns)))
+        self.required = set()
+        self.skipped = set()
+        self.missing = set()
+        self.num_extracted = 0
+
+    def _is_wanted(self, member):
+        if member.isdir() or member.name in self.required:
+            return True
+
+        if not member.name.startswith(f"{self.rootdir}/sos_commands/"):
+            return True
+
+        return self.regex.match(member.name) is not None
+
+    @staticmethod
+    def _link_target(member):
+        """ Return archive name of link target or None if not in archive. """
+        if member.islnk():
+            return member.linkname
+
+        if os.path.isabs(member.linkname):
+            return None
+
+        return os.path.normpath(os.path.join(os.path.dirname(member.name),
+                                             member.linkname))
+
+    def _add_link_target(self, member):
+        """
+        Ensure the target of a link is extracted. Returns False if the link
+        cannot be extracted yet i.e. it is a hard link whose target has not
+        been extracted.
+        """
+        target = self._link_target(member)
+        if target is None:
+            return True
+
+        if target not in self.skipped:
+            self.required.add(target)
+            return True
+
+        self.missing.add(target)
+        if member.islnk():
+            self.missing.add(member.name)
+            return False
+
+        return True
+
+    def select(self, members):
+        """
+        Yield members that need to be extracted.
+
+        @param members: iterable of tarfile.TarInfo
+        """
+        for member in members:
+            if not self._is_wanted(member):
+                self.skipped.add(member.name)
+                continue
+
+            if ((member.issym() or member.islnk()) and not
+                    self._add_link_target(member)):
+                continue
+
+            self.num_extracted += 1
+            yield member
+
+    def select_missing(self, members):
+        """
+        Yield members that were found to be needed after they were skipped.
+
+        @param members: iterable of tarfile.TarInfo
+        """
+        missing = self.missing
+        self.missing = set()
+        self.skipped -= missing
+        for member in members:
+            if member.name not in missing:
+                continue
+
+            if member.issym() or member.islnk():
+                target = self._link_target(member)
+                if target in self.skipped:
+                    self.missing.add(target)
+                    if member.islnk():
+                        self.missing.add(member.name)
+                        continue
+
+            self.num_extracted += 1
+            yield member
+
 
 class DataRootManager():
     """
@@ -20,6 +192,8 @@ class DataRootManager():
     """
     TYPE_HOST = 0
     TYPE_SOSREPORT = 1
+    # Marks a selectively extracted sosreport (placed alongside it).
+    PARTIAL_SUFFIX = '.partial'
 
     def __init__(self, path, sos_unpack_dir=None):
         self.path = path
@@ -74,36 +248,119 @@ class DataRootManager():
             return path
 
         if tarfile.is_tarfile(path):
-            with tarfile.open(path) as tar:
-                rootdir = tar.firstmember.name.partition('/')[0]
-                target = os.path.join(self.tmpdir, rootdir)
-                if not os.path.exists(target):
-                    sys.stdout.write(f"INFO: extracting sosreport {path} to "
-                                     f"{target}\n")
-                    try:
-                        tar.extractall(self.tmpdir)
-                    # We really do want to catch all here since we don't care
-                    # why it failed but don't want to fail hard if it does.
-                    except Exception:  # pylint: disable=W0718
-                        log.exception("error occurred while unpacking "
-                                      "sosreport:")
-                        # some members might fail to extract e.g. permission
-                        # denied but we dont want that to cause the whole run
-                        # to fail so we just log a message and ignore them.
-                        tar.errorlevel = 0
-                        sys.stdout.write("INFO: one or more members failed to "
-                                         "extract - disabling error mode and "
-                                         "continuing extraction (which will "
-                                         "be incomplete as a result)\n")
-                        tar.extractall(self.tmpdir)
-                else:
-                    sys.stdout.write(f"INFO: target {target} already exists - "
-                                     "skipping unpack\n")
+            if HotSOSConfig.force_mode or HotSOSConfig.use_all_logs:
+                return self._extract_all(path)
 
-            return target
+            return self._extract_selective(path)
 
         raise InvalidPathError(f"invalid data root '{path}'")
 
+    def _extract_all(self, path):
+        """
+        Extract the entire sosreport archive. If a previous selective
+        extraction exists it is completed.
+        """
+        with tarfile.open(path) as tar:
+            rootdir = tar.firstmember.name.partition('/')[0]
+            target = os.path.join(self.tmpdir, rootdir)
+            partial_marker = target + self.PARTIAL_SUFFIX
+            if os.path.exists(target) and not os.path.exists(partial_marker):
+                sys.stdout.write(f"INFO: target {target} already exists - "
+                                 "skipping unpack\n")
+                return target
+
+            sys.stdout.write(f"INFO: extracting sosreport {path} to "
+                             f"{target}\n")
+            try:
+                tar.extractall(self.tmpdir)
+            # We really do want to catch all here since we don't care
+            # why it failed but don't want to fail hard if it does.
+            except Exception:  # pylint: disable=W0718
+                log.exception("error occurred while unpacking "
+                              "sosreport:")
+                # some members might fail to extract e.g. permission
+                # denied but we dont want that to cause the whole run
+                # to fail so we just log a message and ignore them.
+                tar.errorlevel = 0
+                sys.stdout.write("INFO: one or more members failed to "
+                                 "extract - disabling error mode and "
+                                 "continuing extraction (which will "
+                                 "be incomplete as a result)\n")
+                tar.extractall(self.tmpdir)
+
+        if os.path.exists(partial_marker):
+            os.remove(partial_marker)
+
+        return target
+
+    def _stream_extract(self, path, select, errorlevel):
+        """
+        Extract members of archive in a single sequential pass of the
+        (compressed) stream.
+
+        @param path: path to archive.
+        @param select: generator function that takes the archive members and
+                       yields those to be extracted.
+        @param errorlevel: tarfile errorlevel.
+        """
+        with tarfile.open(path, 'r|*') as tar:
+            tar.errorlevel = errorlevel
+            tar.extractall(self.tmpdir, members=select(tar))
+
+    def _extract_selective(self, path):
+        """
+        Extract only the members of the sosreport archive that are needed to
+        run hotsos (see ArchiveMemberFilter). Extraction is streamed from the
+        archive so that it is only decompressed once unless members that were
+        already skipped are found to be needed later on e.g. because they are
+        the target of a link.
+        """
+        with tarfile.open(path, 'r|*') as tar:
+            rootdir = tar.firstmember.name.partition('/')[0]
+
+        target = os.path.join(self.tmpdir, rootdir)
+        if os.path.exists(target):
+            sys.stdout.write(f"INFO: target {target} already exists - "
+                             "skipping unpack\n")
+            return target
+
+        sys.stdout.write(f"INFO: extracting sosreport {path} to {target} "
+                         "(selective - use --force or --all-logs to extract "
+                         "everything)\n")
+        patterns = get_command_file_paths()
+        patterns.update(SELECTIVE_EXTRACT_PATHS)
+        for errorlevel in [1, 0]:
+            member_filter = ArchiveMemberFilter(rootdir, patterns)
+            try:
+                self._stream_extract(path, member_filter.select, errorlevel)
+                while member_filter.missing:
+                    log.debug("extracting %s missed member(s) of %s",
+                              len(member_filter.missing), path)
+                    self._stream_extract(path, member_filter.select_missing,
+                                         errorlevel)
+            # We really do want to catch all here since we don't care
+            # why it failed but don't want to fail hard if it does.
+            except Exception:  # pylint: disable=W0718
+                if errorlevel == 0:
+                    raise
+
+                log.exception("error occurred while unpacking sosreport:")
+                sys.stdout.write("INFO: one or more members failed to "
+                                 "extract - disabling error mode and "
+                                 "retrying extraction (which will "
+                                 "be incomplete as a result)\n")
+                continue
+
+            break
+
+        log.debug("extracted %s and skipped %s member(s) of %s",
+                  member_filter.num_extracted, len(member_filter.skipped),
+                  path)
+        with open(target + self.PARTIAL_SUFFIX, 'w', encoding='utf-8'):
+            pass
+
+        return target
+
     def _type(self, path):
         if path == '/':
             return self.TYPE_HOST
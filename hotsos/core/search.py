@@ -1,4 +1,5 @@
 import os
+import re
 from datetime import timedelta
 from functools import cached_property
 
@@ -16,6 +17,13 @@ from hotsos.core.config import HotSOSConfig
 from hotsos.core.host_helpers import CLIHelper, UptimeHelper
 from hotsos.core.log import log
 
+try:
+    from re import _constants as sre_constants, _parser as sre_parse
+except ImportError:
+    # Python < 3.11
+    import sre_constants  # pylint: disable=deprecated-module
+    import sre_parse  # pylint: disable=deprecated-module
+
 
 # This module acts as a proxy to searchkit but with some addons/modifications
 __all__ = [
@@ -25,6 +33,54 @@ __all__ = [
     ]
 
 
+class SearchPrefilter():
+    """
+    Combines the hints of a group of searches into a single expression that
+    is run at most once per line. If it does not match, none of the searches
+    in the group can match so they can all skip the line without running
+    their own hint.
+    """
+    def __init__(self, hints):
+        """
+        @param hints: list of compiled hint patterns.
+        """
+        self.pattern = re.compile('|'.join(f'(?:{hint.pattern})'
+                                           for hint in hints))
+        self._line = None
+        self._hit = False
+
+    def hit(self, line):
+        """ Return True if any hint in the group matches line. """
+        # Every search in the group is given the same line object so we only
+        # need to run the combined expression when it changes.
+        if line is not self._line:
+            self._line = line
+            self._hit = self.pattern.search(line) is not None
+
+        return self._hit
+
+
+class PrefilteredHint():
+    """
+    Drop-in replacement for a compiled SearchDef hint that first consults
+    the SearchPrefilter shared by all searches registered against the same
+    files.
+    """
+    def __init__(self, prefilter, hint):
+        self.prefilter = prefilter
+        self.hint = hint
+
+    @property
+    def pattern(self):
+        return self.hint.pattern
+
+    def search(self, line):
+        if not self.prefilter.hit(line):
+            return None
+
+        return self.hint.search(line)
+
+
 class FileSearcher(_FileSearcher):
     """
     Custom representation of searchkit FilesSearcher that sets some parameters
@@ -42,6 +98,70 @@ class FileSearcher(_FileSearcher):
                          decode_errors='backslashreplace',
                          **kwargs)
 
+    @staticmethod
+    def _hinted_searchdefs(search):
+        """ Return list of SearchDef with a hint that make up search. """
+        if isinstance(search, SequenceSearchDef):
+            sdefs = [search.s_start, search.s_body, search.s_end]
+        else:
+            sdefs = [search]
+
+        hinted = []
+        for sdef in sdefs:
+            if sdef is None or not sdef.hint:
+                continue
+
+            if isinstance(sdef.hint, PrefilteredHint):
+                # searcher has been run before so start again
+                sdef.hint = sdef.hint.hint
+
+            # Hints with global flags or backreferences cannot be combined
+            # with others.
+            if (sdef.hint.flags & ~re.UNICODE or
+                    re.search(r'\\[1-9]|\(\?P=', sdef.hint.pattern)):
+                continue
+
+            hinted.append(sdef)
+
+        return hinted
+
+    def _apply_prefilters(self):
+        """
+        Group searches by the set of files they are registered against and
+        give each group a single combined prefilter. A line that matches none
+        of the hints in a group is then rejected with one expression rather
+        than one per search.
+        """
+        files_by_sdef = {}
+        for entry in self.catalog:
+            for search in entry['searches']:
+                for sdef in self._hinted_searchdefs(search):
+                    files_by_sdef.setdefault(sdef, set()).add(entry['path'])
+
+        groups = {}
+        for sdef, files in files_by_sdef.items():
+            groups.setdefault(frozenset(files), []).append(sdef)
+
+        for files, sdefs in groups.items():
+            if len(sdefs) < 2:
+                continue
+
+            try:
+                prefilter = SearchPrefilter([sdef.hint for sdef in sdefs])
+            except re.error as exc:
+                log.debug("unable to combine search hints: %s", exc)
+                continue
+
+            for sdef in sdefs:
+                sdef.hint = PrefilteredHint(prefilter, sdef.hint)
+
+            log.debug("using combined prefilter for %s searches across %s "
+                      "file(s)", len(sdefs), len(files))
+
+    def run(self):
+        self._apply_prefilters()
+        return super().run()
+
 
 class SearchConstraintSearchSince(_SearchConstraintSearchSince):
     """
@@ -253,3 +373,193 @@ def create_constraint(search_result_age_hours=None,
             log.warning("failed to create search constraint: %s", exc)
 
     return None
+
+
+class RegexLiteralAnalyser():
+    """
+    Analyse a regular expression to find literal substrings that must be
+    present in any line it matches. These can be used as a cheap pre-filter
+    (searchkit hint) so that the full expression only runs on lines that can
+    possibly match.
+
+    Each required term is a tuple of one or more alternative literals of
+    which at least one must be present. If the pattern does not require any
+    literal (or it cannot be parsed or is case-insensitive) no terms are
+    returned and the pattern must be run as-is.
+    """
+    # pylint can't see the sre constants
+    # pylint: disable=no-member
+    # Literals shorter than this are too common to be worth a pre-filter.
+    MIN_HINT_LENGTH = 3
+    REPEATS = (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT,
+               getattr(sre_constants, 'POSSESSIVE_REPEAT', None))
+
+    def __init__(self, pattern):
+        """
+        @param pattern: regular expression string or list of strings of which
+                        any may match.
+        """
+        if not isinstance(pattern, list):
+            pattern = [pattern]
+
+        self.patterns = pattern
+
+    @staticmethod
+    def _literal(op, av):
+        """ Return single character matched by op or None. """
+        if op == sre_constants.LITERAL:
+            return chr(av)
+
+        if (op == sre_constants.IN and len(av) == 1 and
+                av[0][0] == sre_constants.LITERAL):
+            return chr(av[0][1])
+
+        return None
+
+    @staticmethod
+    def _subpattern(op, av, ignorecase):
+        """ Return (subpattern items, ignorecase) for group ops. """
+        if op == sre_constants.SUBPATTERN:
+            _, add_flags, del_flags, items = av
+            if add_flags & sre_constants.SRE_FLAG_IGNORECASE:
+                ignorecase = True
+            elif del_flags & sre_constants.SRE_FLAG_IGNORECASE:
+                ignorecase = False
+
+            return items, ignorecase
+
+        return av, ignorecase
+
+    def _branch(self, alternatives, ignorecase):
+        """ Return a term for a branch if every alternative has one. """
+        term = []
+        for items in alternatives:
+            exact, terms = self._walk(items, ignorecase)
+            if exact:
+                term.append(exact)
+                continue
+
+            best = self.best_term(terms)
+            if not best:
+                return None
+
+            term.extend(best)
+
+        return tuple(term)
+
+    def _walk(self, items, ignorecase):  # pylint: disable=R0912
+        """
+        Walk parsed regex items.
+
+        @return: tuple of (exact, terms) where exact is the literal string
+                 matched by items if they only ever match that string
+                 otherwise None and terms is a list of required terms.
+        """
+        exact = ''
+        terms = []
+        current = ''
+        for op, av in items:
+            lit = None
+            if not ignorecase:
+                lit = self._literal(op, av)
+
+            if op in (sre_constants.SUBPATTERN,
+                      getattr(sre_constants, 'ATOMIC_GROUP', None)):
+                sub_items, sub_ignorecase = self._subpattern(op, av,
+                                                             ignorecase)
+                sub_exact, sub_terms = self._walk(sub_items, sub_ignorecase)
+                if sub_exact:
+                    lit = sub_exact
+                else:
+                    terms.extend(sub_terms)
+            elif op in self.REPEATS and av[0] >= 1:
+                sub_exact, sub_terms = self._walk(av[2], ignorecase)
+                if sub_exact and av[0] == av[1]:
+                    lit = sub_exact * av[0]
+                elif sub_exact:
+                    terms.append((sub_exact * av[0],))
+                else:
+                    terms.extend(sub_terms)
+            elif op == sre_constants.BRANCH:
+                term = self._branch(av[1], ignorecase)
+                if term:
+                    terms.append(term)
+            elif op == sre_constants.AT:
+                # zero-width so does not break up a literal
+                exact = None
+                continue
+
+            if lit is not None:
+                current += lit
+                if exact is not None:
+                    exact += lit
+
+                continue
+
+            exact = None
+            if current:
+                terms.append((current,))
+                current = ''
+
+        if current:
+            terms.append((current,))
+
+        return exact, terms
+
+    @classmethod
+    def best_term(cls, terms):
+        """ Return the term whose shortest alternative is the longest. """
+        if not terms:
+            return None
+
+        return max(terms, key=lambda term: min(len(lit) for lit in term))
+
+    def required_terms(self, pattern):
+        """
+        Return list of required terms for a single pattern.
+
+        @param pattern: regular expression string.
+        """
+        try:
+            parsed = sre_parse.parse(pattern)
+        except (re.error, TypeError):
+            return []
+
+        if parsed.state.flags & sre_constants.SRE_FLAG_IGNORECASE:
+            return []
+
+        exact, terms = self._walk(parsed, False)
+        if exact:
+            return [(exact,)]
+
+        return terms
+
+    @cached_property
+    def hint_literals(self):
+        """
+        Return a tuple of literals of which at least one is present in any
+        line that matches. The tuple is empty if no suitable literals are
+        found.
+        """
+        literals = []
+        for pattern in self.patterns:
+            best = self.best_term(self.required_terms(pattern))
+            if (not best or
+                    min(len(lit) for lit in best) < self.MIN_HINT_LENGTH):
+                return ()
+
+            literals.extend(lit for lit in best if lit not in literals)
+
+        return tuple(literals)
+
+    @property
+    def hint(self):
+        """
+        Return a regular expression that can be used as a search hint or None
+        if no hint is possible.
+        """
+        literals = self.hint_literals
+        if not literals:
+            return None
+
+        return '|'.join(re.escape(lit) for lit in literals)
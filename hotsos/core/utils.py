@@ -1,6 +1,8 @@
 import abc
 import glob
+import json
 import os
+import re
 import tempfile
 from collections import namedtuple
 from operator import attrgetter
@@ -111,6 +113,123 @@ def sort_suffixed_integers(values, reverse=False):
     return [t.raw for t in reals]
 
 
+class JSONStreamReader():
+    """
+    Incrementally decodes a JSON document from a file object, holding only
+    the value currently being decoded (plus one read chunk) in memory.
+    """
+    WHITESPACE = re.compile(r'\s*')
+    NUMBER_CHARS = '0123456789.eE+-'
+
+    def __init__(self, fd, chunk_size=1 << 16):
+        self.fd = fd
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self, size):
+        """ Discard consumed data and read up to size more characters. """
+        chunk = self.fd.read(size)
+        if not chunk:
+            self.eof = True
+
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+
+    def peek(self):
+        """ Return the next non-whitespace character or '' at EOF. """
+        while True:
+            self.pos = self.WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf) or self.eof:
+                return self.buf[self.pos:self.pos + 1]
+
+            self._fill(self.chunk_size)
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"expected '{char}' but found '{found}'")
+
+        self.pos += 1
+
+    def decode(self):
+        """ Decode and return the next value. """
+        self.peek()
+        size = self.chunk_size
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError as exc:
+                if self.eof:
+                    raise ValueError(str(exc)) from exc
+
+                value, end = None, None
+
+            # A number that was cut short by the end of the buffer may
+            # continue into the next chunk so we only accept a value if it
+            # is followed by something that cannot be part of it.
+            if end is not None and (self.eof or
+                                    (end < len(self.buf) and
+                                     self.buf[end] not in self.NUMBER_CHARS)):
+                self.pos = end
+                return value
+
+            self._fill(size)
+            size *= 2
+
+    def iter_array(self, keys):
+        """
+        Navigate through nested objects following keys and yield each item
+        of the array found there. Nothing beyond the end of the array is
+        read.
+
+        @param keys: list of object keys leading to the array.
+        """
+        for key in keys:
+            self.expect('{')
+            while True:
+                if self.peek() != '"':
+                    raise ValueError(f"key '{key}' not found")
+
+                name = self.decode()
+                self.expect(':')
+                if name == key:
+                    break
+
+                self.decode()
+                if self.peek() == ',':
+                    self.pos += 1
+
+        self.expect('[')
+        if self.peek() == ']':
+            return
+
+        while True:
+            yield self.decode()
+            if self.peek() != ',':
+                self.expect(']')
+                return
+
+            self.pos += 1
+
+
+def iter_json_array(path, keys):
+    """
+    Generator yielding the items of a JSON array nested within objects in the
+    file at path without loading the whole file into memory. Anything that
+    follows the array in the file e.g. trailing non-JSON lines appended to
+    ceph command output is ignored.
+
+    @param path: path to file containing JSON.
+    @param keys: list of object keys leading to the array.
+    @raises ValueError: if the file is not valid JSON or a key is not found.
+    """
+    with open(path, encoding='utf-8') as fd:
+        yield from JSONStreamReader(fd).iter_array(keys)
+
+
 class PathFinderBase:
     """
     Discovers correct path to a file. This is used to support file locations
@@ -128,6 +247,14 @@ class PathFinderBase:
         """ This must be implemented and return a list of root locations to
         use when searching for a given subpath. """
 
+    @classmethod
+    def reset_affinity(cls):
+        """ Clear affinity saved by this class and all its subclasses. Must be
+        called between data roots analysed by the same process. """
+        cls.PATH_AFFINITY = None
+        for subcls in cls.__subclasses__():
+            subcls.reset_affinity()
+
     def resolve(self, subpath):
         if self.PATH_AFFINITY:
             log.debug("using affinity path %s", self.PATH_AFFINITY)
@@ -66,6 +66,12 @@ class GlobalSearcher(contextlib.AbstractContextManager, UserDict):
     Entries must be unique. Once all searches are loaded they are executed and
     their results are made available to anyone who wants them. Results are
     accessed using the yaml dot path used to register the search.
+
+    A single instance can be shared by more than one plugin so that searches
+    from all plugins are executed in a single pass over the filesystem. Since
+    search tags are prefixed with the name of the plugin that owns them, each
+    plugin only ever sees its own results. Load labels are scoped to the
+    current plugin for the same reason.
     """
 
     def __init__(self):
@@ -77,6 +83,8 @@ class GlobalSearcher(contextlib.AbstractContextManager, UserDict):
             constraint = None
 
         self._loaded_searches = []
+        self._registered_plugins = set()
+        self._requires_results = {}
         self._results = None
         self._searcher = FileSearcher(constraint=constraint)
         log.debug("creating new global searcher (%s)", self._searcher)
@@ -114,14 +122,34 @@ class GlobalSearcher(contextlib.AbstractContextManager, UserDict):
 
         @param label: string label to mark a set of searches as registered.
         """
-        if label in self._loaded_searches:
+        if self.is_loaded(label):
             raise SearchRegistryError("Search Registry has already been "
-                                      f"loaded by label={label}")
+                                      f"loaded by label={label} (plugin="
+                                      f"{HotSOSConfig.plugin_name})")
 
-        self._loaded_searches.append(label)
+        self._loaded_searches.append((HotSOSConfig.plugin_name, label))
 
     def is_loaded(self, label):
-        return label in self._loaded_searches
+        """ Labels are scoped to the plugin currently being executed. """
+        return (HotSOSConfig.plugin_name, label) in self._loaded_searches
+
+    def get_requires_result(self, path):
+        """ Return the memoised result of a requires property or None if
+        it has not been evaluated. Results are scoped to the plugin currently
+        being executed.
+
+        @param path: requires property override path.
+        """
+        return self._requires_results.get((HotSOSConfig.plugin_name, path))
+
+    def set_requires_result(self, path, result):
+        """ Memoise the result of a requires property so that it need only
+        be evaluated once per run.
+
+        @param path: requires property override path.
+        @param result: True or False
+        """
+        self._requires_results[(HotSOSConfig.plugin_name, path)] = result
 
     @property
     def searcher(self):
@@ -137,17 +165,36 @@ class GlobalSearcher(contextlib.AbstractContextManager, UserDict):
             log.debug("using cached global searcher results")
             return self._results
 
+        if not self._registered_plugins:
+            self.register_plugin_searches(HotSOSConfig.plugin_name)
+
+        log.debug("fetching global searcher results")
+        self._results = self.searcher.run()
+        return self._results
+
+    def register_plugin_searches(self, plugin_name):
+        """
+        Add any automatically registered searches belonging to the given
+        plugin. This is a no-op if they have already been added.
+
+        @param plugin_name: name of plugin.
+        """
+        if plugin_name in self._registered_plugins:
+            return
+
+        if self._results is not None:
+            raise SearchRegistryError("cannot register searches for plugin "
+                                      f"'{plugin_name}' - searches have "
+                                      "already been executed")
+
+        self._registered_plugins.add(plugin_name)
         for s in SEARCHES_TO_BE_REGISTERED:
-            if not s().validate(HotSOSConfig.plugin_name):
+            if not s().validate(plugin_name):
                 continue
 
             self.add_search(s.simple_search(), s.sequence_search(),
                             s.passthrough_results, s.paths())
 
-        log.debug("fetching global searcher results")
-        self._results = self.searcher.run()
-        return self._results
-
     def add_search(self, simple_search, sequence_search, passthrough_results,
                    paths):
         """
@@ -241,6 +288,45 @@ class GlobalSearcherPreloaderBase():
 
         return re.match(fr"^{path_filter}", path) is None
 
+    @staticmethod
+    def requirements_met(global_searcher, item, preload=False):
+        """
+        Evaluate the requires property of a scenario or event (which may be
+        inherited from its group) and memoise the result in the global
+        searcher so that it is only evaluated once.
+
+        When called from a preloader any error evaluating the requirement is
+        ignored and the item is assumed to be required since the requirement
+        will be evaluated again when the item is loaded. Preloaders do not
+        give their definitions access to the global searcher so that a
+        requirement cannot cause searches to be executed before they have all
+        been loaded.
+
+        @param global_searcher: GlobalSearcher object
+        @param item: YDefsSection leaf or root section.
+        @param preload: set to True if called from a preloader.
+        @return: True if item has no requirements or they are met.
+        """
+        if HotSOSConfig.force_mode or not item.requires:
+            return True
+
+        path = item.requires.override_path
+        result = global_searcher.get_requires_result(path)
+        if result is not None:
+            return result
+
+        try:
+            result = item.requires.result
+        except Exception:  # pylint: disable=W0718
+            if not preload:
+                raise
+
+            log.debug("unable to pre-evaluate requirements %s", path)
+            return True
+
+        global_searcher.set_requires_result(path, result)
+        return result
+
     @abc.abstractmethod
     def _preload_searches(self):
         """ Discover searches and load them into the global searcher. """
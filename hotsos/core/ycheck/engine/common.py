@@ -1,11 +1,163 @@
 import abc
+import hashlib
 import os
+import pickle
+import stat
+import tempfile
+from functools import cached_property, lru_cache
 
 import yaml
 from hotsos.core.config import HotSOSConfig
 from hotsos.core.log import log
 
 
+class YDefsCache():
+    """
+    Process-wide cache of parsed yaml definitions for a given defs path.
+
+    Parsing yaml is expensive and the same files are loaded more than once
+    per run so the parsed content of each file is kept in memory. A
+    precompiled bundle of all definitions can also be saved alongside the
+    definitions (see save_bundle()) so that runs do not need to parse any yaml
+    at all. The bundle is built when packaging (e.g. the snap) and never at
+    runtime. It is only used if the hash of the definitions it was built from
+    matches the current definitions and it can only have been written by the
+    current user or root.
+    """
+    BUNDLE_NAME = '.ydefs.pickle'
+
+    def __init__(self, defs_path):
+        """
+        @param defs_path: path to root of yaml definitions.
+        """
+        self.defs_path = os.path.realpath(defs_path)
+        self.bundle_path = os.path.join(self.defs_path, self.BUNDLE_NAME)
+        self._content = {}
+
+    def _def_files(self):
+        for root, dirs, files in os.walk(self.defs_path):
+            dirs.sort()
+            for name in sorted(files):
+                if name.endswith('.yaml'):
+                    yield os.path.join(root, name)
+
+    @cached_property
+    def tree_hash(self):
+        """ Hash of the relative path and contents of all definitions. """
+        hasher = hashlib.sha256()
+        for path in self._def_files():
+            hasher.update(os.path.relpath(path, self.defs_path).encode())
+            with open(path, 'rb') as fd:
+                hasher.update(fd.read())
+
+        return hasher.hexdigest()
+
+    @cached_property
+    def bundle(self):
+        """
+        Load precompiled definitions. Returns empty dict if there is no
+        bundle or it is out of date.
+        """
+        try:
+            with open(self.bundle_path, 'rb') as fd:
+                st = os.fstat(fd.fileno())
+                # Unpickling can execute arbitrary code so only trust a
+                # bundle that nobody else could have written.
+                if (st.st_uid not in (0, os.getuid()) or
+                        st.st_mode & (stat.S_IWGRP | stat.S_IWOTH)):
+                    log.warning("ignoring ydefs bundle %s since it could "
+                                "have been written by another user",
+                                self.bundle_path)
+                    return {}
+
+                bundle = pickle.load(fd)
+        except FileNotFoundError:
+            return {}
+        # We don't care why it failed, we will just parse the yaml instead.
+        except Exception as exc:  # pylint: disable=W0718
+            log.info("unable to load ydefs bundle %s: %s", self.bundle_path,
+                     exc)
+            return {}
+
+        if bundle.get('hash') != self.tree_hash:
+            log.debug("ydefs bundle %s is out of date", self.bundle_path)
+            return {}
+
+        log.debug("using ydefs bundle %s", self.bundle_path)
+        return bundle['defs']
+
+    def load(self, path):
+        """
+        Return parsed contents of yaml definition. The returned object is
+        shared and must not be modified.
+
+        @param path: absolute path to yaml file beneath defs path.
+        """
+        relpath = os.path.relpath(os.path.realpath(path), self.defs_path)
+        if relpath in self.bundle:
+            return self.bundle[relpath]
+
+        st = os.stat(path)
+        key = (st.st_size, st.st_mtime_ns)
+        cached = self._content.get(relpath)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        with open(path, encoding='utf-8') as fd:
+            content = yaml.safe_load(fd.read()) or {}
+
+        self._content[relpath] = (key, content)
+        return content
+
+    def load_all(self):
+        """
+        Load all definitions. Useful to warm the cache before forking worker
+        processes so that they do not each need to do it.
+
+        @return: dict of parsed definitions keyed by path relative to the
+                 defs path.
+        """
+        return {os.path.relpath(path, self.defs_path): self.load(path)
+                for path in self._def_files()}
+
+    def save_bundle(self):
+        """
+        Save a precompiled bundle of all definitions if the current one is
+        missing or out of date. This is intended to be run when packaging
+        hotsos. Failure to save e.g. because the defs path is read-only is not
+        an error.
+
+        @return: True if a bundle was saved otherwise False.
+        """
+        if self.bundle:
+            return False
+
+        defs = self.load_all()
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.defs_path)
+            with os.fdopen(fd, 'wb') as tmp:
+                pickle.dump({'hash': self.tree_hash, 'defs': defs}, tmp)
+
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, self.bundle_path)
+        except OSError as exc:
+            log.debug("unable to save ydefs bundle %s: %s", self.bundle_path,
+                      exc)
+            return False
+
+        log.debug("saved ydefs bundle %s (%s files)", self.bundle_path,
+                  len(defs))
+        # reload on next access
+        del self.bundle
+        return True
+
+
+@lru_cache(maxsize=4)
+def get_ydefs_cache(defs_path):
+    """ Returns the YDefsCache for defs_path. """
+    return YDefsCache(defs_path)
+
+
 class YDefsLoader():
     """ Load yaml definitions. """
 
@@ -18,6 +170,10 @@ class YDefsLoader():
         self.stats_num_files_loaded = 0
         self.filter_path = filter_path
 
+    @property
+    def cache(self):
+        return get_ydefs_cache(HotSOSConfig.plugin_yaml_defs)
+
     @staticmethod
     def _is_def(abs_path):
         return abs_path.endswith('.yaml')
@@ -40,9 +196,8 @@ class YDefsLoader():
                     continue
 
                 if self._get_yname(abs_path) == os.path.basename(path):
-                    with open(abs_path, encoding='utf-8') as fd:
-                        log.debug("applying dir globals %s", entry)
-                        defs.update(yaml.safe_load(fd.read()) or {})
+                    log.debug("applying dir globals %s", entry)
+                    defs.update(self.cache.load(abs_path))
 
                     # NOTE: these files do not count towards the total loaded
                     # since they are only supposed to contain directory-level
@@ -50,10 +205,8 @@ class YDefsLoader():
                     # directory.
                     continue
 
-                with open(abs_path, encoding='utf-8') as fd:
-                    self.stats_num_files_loaded += 1
-                    _content = yaml.safe_load(fd.read()) or {}
-                    defs[self._get_yname(abs_path)] = _content
+                self.stats_num_files_loaded += 1
+                defs[self._get_yname(abs_path)] = self.cache.load(abs_path)
 
         return defs
 
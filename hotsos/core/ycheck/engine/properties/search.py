@@ -4,6 +4,7 @@ from functools import cached_property
 from hotsos.core.log import log
 from hotsos.core.search import (
     create_constraint,
+    RegexLiteralAnalyser,
     SearchDef,
     SequenceSearchDef,
     ExtraSearchConstraints,
@@ -173,6 +174,23 @@ class YPropertySearchBase(YPropertyOverrideBase):
             log.exception("")
             raise
 
+    @staticmethod
+    def _search_hint(pattern, hint=None):
+        """
+        Return the hint to use for the given pattern. A hint provided in the
+        definition always takes precedence otherwise we try to derive one
+        from literals that the pattern requires.
+        """
+        if hint:
+            return str(hint)
+
+        hint = RegexLiteralAnalyser(pattern).hint
+        if hint:
+            log.debug("using derived hint '%s' for pattern '%s'", hint,
+                      pattern)
+
+        return hint
+
     @property
     def is_sequence_search(self):
         seq_keys = YPropertySequencePart.get_override_keys_back_compat()
@@ -189,9 +207,7 @@ class YPropertySearchBase(YPropertyOverrideBase):
             return sdef
 
         pattern = self.search_pattern
-        hint = None
-        if self.hint:
-            hint = str(self.hint)
+        hint = self._search_hint(pattern, self.hint)
 
         constraints = None
         if self.constraints and self.constraints.filesearch_constraints_obj:
@@ -203,6 +219,12 @@ class YPropertySearchBase(YPropertyOverrideBase):
         self.cache.set('simple_search', sdef)
         return sdef
 
+    def _sequence_part_searchdef(self, part, tag=None):
+        """ Create a SearchDef for a sequence start, body or end part. """
+        pattern = part.search_pattern
+        return SearchDef(pattern, tag=tag,
+                         hint=self._search_hint(pattern, part.hint))
+
     @property
     def sequence_search(self):
         if not self.is_sequence_search or self.passthrough_results:
@@ -217,18 +239,17 @@ class YPropertySearchBase(YPropertyOverrideBase):
         seq_end = self.end
 
         if (seq_body or (seq_end and not self.passthrough_results)):
-            sd_start = SearchDef(seq_start.search_pattern)
+            sd_start = self._sequence_part_searchdef(seq_start)
 
             sd_end = None
             # explicit end is optional for sequence definition
             if seq_end:
-                sd_end = SearchDef(seq_end.search_pattern)
+                sd_end = self._sequence_part_searchdef(seq_end)
 
             sd_body = None
             if seq_body:
-                sd_body = SearchDef(seq_body.search_pattern)
+                sd_body = self._sequence_part_searchdef(seq_body)
 
-            # NOTE: we don't use hints here
             tag = self.unique_search_tag
             sdef = SequenceSearchDef(start=sd_start, body=sd_body,
                                      end=sd_end, tag=tag)
@@ -259,8 +280,8 @@ class YPropertySearchBase(YPropertyOverrideBase):
         # start and end required for core.analytics.LogEventStats
         start_tag = f"{self.unique_search_tag}-start"
         end_tag = f"{self.unique_search_tag}-end"
-        sdefs = [SearchDef(str(seq_start.search_pattern), tag=start_tag),
-                 SearchDef(str(seq_end.search_pattern), tag=end_tag)]
+        sdefs = [self._sequence_part_searchdef(seq_start, tag=start_tag),
+                 self._sequence_part_searchdef(seq_end, tag=end_tag)]
         self.cache.set('sequence_passthrough_search', sdefs)
         return sdefs
 
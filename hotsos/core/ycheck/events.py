@@ -4,6 +4,7 @@ from dataclasses import dataclass
 
 from hotsos.core.config import HotSOSConfig
 from hotsos.core.log import log
+from hotsos.core.profiling import PROFILER
 from hotsos.core.utils import sorted_dict
 from hotsos.core.ycheck.engine import (
     YDefsLoader,
@@ -370,7 +371,7 @@ class EventsSearchPreloader(YHandlerBase, GlobalSearcherPreloaderBase):
     @property
     def events(self):
         """
-        Generator for all events.
+        Generator for all events whose requirements are met.
 
         Searches are expected to exist within checks so we extract them from
         each event and discover their searches.
@@ -386,6 +387,12 @@ class EventsSearchPreloader(YHandlerBase, GlobalSearcherPreloaderBase):
                          "(filter=%s)", event.resolve_path, self.filter)
                 continue
 
+            if not self.requirements_met(self.global_searcher, event,
+                                         preload=True):
+                log.debug("event %s pre-requisites not met - skipping "
+                          "pre-search", event.resolve_path)
+                continue
+
             yield event
 
     def _preload_searches(self):
@@ -458,16 +465,14 @@ class EventHandlerBase(YHandlerBase, EventProcessingUtils):
     def filter(self):
         return HotSOSConfig.event_filter
 
-    @staticmethod
-    def meets_requirements(item):
+    def meets_requirements(self, item):
         """
         If an item or group has a requirements property it must return True
-        in order to be executed.
+        in order to be executed. The result may already have been memoised by
+        the preloader.
         """
-        if HotSOSConfig.force_mode:
-            return True
-
-        if item.requires and not item.requires.result:
+        if not EventsSearchPreloader.requirements_met(self.global_searcher,
+                                                      item):
             log.debug("item '%s' pre-requisites not met - "
                       "skipping", item.name)
             return False
@@ -587,8 +592,10 @@ class EventHandlerBase(YHandlerBase, EventProcessingUtils):
                               event, event_search['search_tag'])
                     continue
 
-                ret = self._exec_callback(event, section_name, search_results,
-                                          event_search)
+                with PROFILER.profile('event', f'{self.event_group}.'
+                                      f'{section_name}.{event}'):
+                    ret = self._exec_callback(event, section_name,
+                                              search_results, event_search)
                 if not ret:
                     continue
 
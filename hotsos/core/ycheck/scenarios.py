@@ -3,6 +3,7 @@ from functools import cached_property
 from hotsos.core.config import HotSOSConfig
 from hotsos.core.issues import IssuesManager, HotSOSScenariosWarning
 from hotsos.core.log import log
+from hotsos.core.profiling import PROFILER
 from hotsos.core.ycheck.engine import (
     YDefsLoader,
     YDefsSection,
@@ -31,27 +32,59 @@ class ScenariosSearchPreloader(YHandlerBase, GlobalSearcherPreloaderBase):
         plugin_defs = YDefsLoader('scenarios').plugin_defs
         return YDefsSection(HotSOSConfig.plugin_name, plugin_defs or {})
 
-    @property
-    def scenarios(self):
+    @classmethod
+    def runnable_scenarios(cls, global_searcher, root, preload=False):
         """
-        Generator for all scenarios.
-
-        Searches are expected to exist within checks so we extract them from
-        each scenario and discover their searches.
+        Generator for all scenarios that are not filtered and whose
+        requirements are met. Requirement results are memoised in the global
+        searcher so that they are only evaluated once.
 
+        @param global_searcher: GlobalSearcher object
+        @param root: YDefsSection containing all scenarios.
+        @param preload: set to True if called from a preloader.
         @return: scenario
         """
-        for scenario in self.root.leaf_sections:
+        if not cls.requirements_met(global_searcher, root, preload=preload):
+            log.debug("plugin '%s' scenarios pre-requisites not met - "
+                      "skipping", HotSOSConfig.plugin_name)
+            return
+
+        scenario_filter = HotSOSConfig.scenario_filter
+        to_skip = set()
+        for scenario in root.leaf_sections:
             # NOTE: scenario is not an override object, it is a PTreeSection
             # that contains the objects i.e. we go looking for the checks etc
             # within this scenario (sub)section.
-            if self.skip_filtered(self.filter, scenario.resolve_path):
-                log.info("skipping scenario %s from pre-search "
-                         "(filter=%s)", scenario.resolve_path, self.filter)
+            if cls.skip_filtered(scenario_filter, scenario.resolve_path):
+                log.info("skipping scenario %s (filter=%s)",
+                         scenario.resolve_path, scenario_filter)
+                continue
+
+            # Only register scenarios if requirements are satisfied.
+            group_name = scenario.parent.name
+            if (group_name in to_skip or
+                    not cls.requirements_met(global_searcher, scenario,
+                                             preload=preload)):
+                log.debug("%s requirements not met - skipping scenario %s",
+                          group_name, scenario.name)
+                to_skip.add(group_name)
                 continue
 
             yield scenario
 
+    @property
+    def scenarios(self):
+        """
+        Generator for all scenarios that can be run.
+
+        Searches are expected to exist within checks so we extract them from
+        each scenario and discover their searches.
+
+        @return: scenario
+        """
+        yield from self.runnable_scenarios(self.global_searcher, self.root,
+                                           preload=True)
+
     def _preload_searches(self):
         """
         Find all scenario checks that have a search property and load their
@@ -152,35 +185,13 @@ class YScenarioChecker(YHandlerBase):
         yscenarios = YDefsSection(HotSOSConfig.plugin_name, plugin_content,
                                   context=YDefsContext({'global_searcher':
                                                         self.global_searcher}))
-        if (not HotSOSConfig.force_mode and yscenarios.requires and not
-                yscenarios.requires.result):
-            log.debug("plugin '%s' scenarios pre-requisites not met - "
-                      "skipping", HotSOSConfig.plugin_name)
-            return
-
         log.debug("sections=%s, scenarios=%s",
                   len(list(yscenarios.branch_sections)),
                   len(list(yscenarios.leaf_sections)))
 
-        to_skip = set()
-        for scenario in yscenarios.leaf_sections:
-            if ScenariosSearchPreloader.skip_filtered(self.filter,
-                                                      scenario.resolve_path):
-                log.info("skipping scenario %s (filter=%s)",
-                         scenario.resolve_path,
-                         HotSOSConfig.scenario_filter)
-                continue
-
-            # Only register scenarios if requirements are satisfied.
-            group_name = scenario.parent.name
-            if (not HotSOSConfig.force_mode and
-                    (group_name in to_skip or
-                        (scenario.requires and not scenario.requires.result))):
-                log.debug("%s requirements not met - skipping scenario %s",
-                          group_name, scenario.name)
-                to_skip.add(group_name)
-                continue
-
+        for scenario in ScenariosSearchPreloader.runnable_scenarios(
+                                                        self.global_searcher,
+                                                        yscenarios):
             scenario.checks.initialise(scenario.vars)
             scenario.checks.check_context.global_searcher = \
                 self.global_searcher
@@ -237,7 +248,8 @@ class YScenarioChecker(YHandlerBase):
             log.debug("running scenario: %s", scenario.name)
             # catch failed scenarios and allow others to run
             try:
-                self._run_scenario_conclusion(scenario, issue_mgr)
+                with PROFILER.profile('scenario', scenario.name):
+                    self._run_scenario_conclusion(scenario, issue_mgr)
             # We really do want to catch all here since we don't care why
             # it failed but don't want to fail hard if it does.
             except Exception:  # pylint: disable=W0718
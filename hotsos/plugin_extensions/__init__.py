@@ -1,19 +1,23 @@
-# Must include all summary plugin handlers that need to be autoregister
-from . import (  # noqa: F401
-    juju,
-    kernel,
-    kubernetes,
-    landscape,
-    lxd,
-    maas,
-    microcloud,
-    mysql,
-    openstack,
-    openvswitch,
-    pacemaker,
-    rabbitmq,
-    sosreport,
-    storage,
-    system,
-    vault
-)
+# Manifest of all plugins in the order they are run along with the modules
+# that must be imported for their summary parts to be registered (see
+# hotsos.core.plugintools.PluginRegistryMeta). Modules are only imported when
+# a plugin is run so all plugins must be added here.
+PLUGIN_MANIFEST = {
+    'hotsos': ['hotsos.client'],
+    'system': ['hotsos.plugin_extensions.system'],
+    'sosreport': ['hotsos.plugin_extensions.sosreport'],
+    'mysql': ['hotsos.plugin_extensions.mysql'],
+    'openstack': ['hotsos.plugin_extensions.openstack'],
+    'pacemaker': ['hotsos.plugin_extensions.pacemaker'],
+    'openvswitch': ['hotsos.plugin_extensions.openvswitch'],
+    'rabbitmq': ['hotsos.plugin_extensions.rabbitmq'],
+    'kubernetes': ['hotsos.plugin_extensions.kubernetes'],
+    'storage': ['hotsos.plugin_extensions.storage'],
+    'vault': ['hotsos.plugin_extensions.vault'],
+    'lxd': ['hotsos.plugin_extensions.lxd'],
+    'juju': ['hotsos.plugin_extensions.juju'],
+    'maas': ['hotsos.plugin_extensions.maas'],
+    'landscape': ['hotsos.plugin_extensions.landscape'],
+    'microcloud': ['hotsos.plugin_extensions.microcloud'],
+    'kernel': ['hotsos.plugin_extensions.kernel'],
+}
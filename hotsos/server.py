@@ -0,0 +1,368 @@
+"""
+Warm daemon mode.
+
+Importing plugins and loading defs is a fixed cost paid by every invocation of
+hotsos. When running hotsos on many data roots over time (e.g. from automation)
+this can be avoided by starting a long running server that does it once and
+then accepts analysis requests over a local Unix socket.
+
+Requests and responses are single lines of json. A request must contain a
+data_root and can optionally contain plugins (list), scenario, event, format,
+minimal (short or very-short) and html_escape. The response contains either
+the summary in the requested format under "output" or an "error" message.
+"""
+import concurrent.futures
+import contextlib
+import json
+import multiprocessing
+import os
+import shutil
+import socket
+import socketserver
+import tempfile
+import threading
+from concurrent.futures.process import BrokenProcessPool
+
+from hotsos.client import (
+    HotSOSClient,
+    SUPPORTED_MINIMAL_MODES,
+    SUPPORTED_SUMMARY_FORMATS,
+    reset_run_state,
+)
+from hotsos.core import plugintools
+from hotsos.core.config import HotSOSConfig
+from hotsos.core.log import log
+from hotsos.core.root_manager import DataRootManager
+from hotsos.core.ycheck.engine.common import get_ydefs_cache
+
+# Requests larger than this are rejected.
+MAX_REQUEST_SIZE = 64 * 1024
+
+
+class ServeRequestError(Exception):
+    """ Raised when a request received by the server is not valid. """
+
+
+def _run_serve_worker(request):
+    """
+    Run a single analysis request in a worker process and return the summary
+    in the requested format. Workers are re-used between requests so any
+    config changed here must be restored and all other per-run state reset.
+    Each request gets its own temporary
+    directory which is used for unpacking sosreports and all state saved
+    during the run.
+
+    @param request: validated request dict.
+    """
+    saved_config = {key: getattr(HotSOSConfig, key)
+                    for key in ['data_root', 'scenario_filter',
+                                'event_filter']}
+    tmpdir = tempfile.mkdtemp(prefix='hotsos-serve-')
+    saved_tmpdir = tempfile.tempdir
+    tempfile.tempdir = tmpdir
+    try:
+        HotSOSConfig.set(scenario_filter=request['scenario'],
+                         event_filter=request['event'])
+        with DataRootManager(request['data_root']) as drm:
+            HotSOSConfig.data_root = drm.data_root
+            log.debug("analysing %s (pid=%s)", drm.name, os.getpid())
+            client = HotSOSClient(request['plugins'])
+            client.run()
+            output = client.summary.get_builder()
+            output.minimal(request['minimal'])
+            return output.to(fmt=request['format'],
+                             html_escape=request['html_escape'])
+    finally:
+        reset_run_state()
+        HotSOSConfig.set(**saved_config)
+        tempfile.tempdir = saved_tmpdir
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+class HotSOSRequestHandler(socketserver.StreamRequestHandler):
+    """ Handle a single request received by HotSOSServer. """
+
+    @staticmethod
+    def validate(request):
+        """
+        Validate a request and return it with defaults applied.
+
+        @param request: request dict.
+        """
+        if not isinstance(request, dict):
+            raise ServeRequestError("request must be a json object")
+
+        valid_keys = ['data_root', 'plugins', 'scenario', 'event', 'format',
+                      'minimal', 'html_escape']
+        invalid = [key for key in request if key not in valid_keys]
+        if invalid:
+            raise ServeRequestError("invalid request keys: "
+                                    f"{', '.join(invalid)}")
+
+        data_root = request.get('data_root')
+        if not data_root or not os.path.exists(data_root):
+            raise ServeRequestError(f"data_root '{data_root}' not found")
+
+        plugins = request.get('plugins') or []
+        unknown = [p for p in plugins
+                   if p not in plugintools.get_plugins_sorted()]
+        if unknown:
+            raise ServeRequestError(f"unknown plugins: {', '.join(unknown)}")
+
+        if plugins:
+            # ensure these are always run
+            plugins = list(set(plugins).union(['hotsos', 'system']))
+
+        fmt = request.get('format', 'json')
+        if fmt not in SUPPORTED_SUMMARY_FORMATS:
+            raise ServeRequestError(f"unsupported format '{fmt}'")
+
+        minimal = request.get('minimal')
+        if minimal not in SUPPORTED_MINIMAL_MODES + [None]:
+            raise ServeRequestError(f"unsupported minimal mode '{minimal}'")
+
+        return {'data_root': os.path.abspath(data_root),
+                'plugins': plugins,
+                'scenario': request.get('scenario', ''),
+                'event': request.get('event', ''),
+                'format': fmt,
+                'minimal': None if minimal == 'full' else minimal,
+                'html_escape': bool(request.get('html_escape', False))}
+
+    def _respond(self, response):
+        self.wfile.write(json.dumps(response).encode() + b'\n')
+
+    def handle(self):
+        line = self.rfile.readline(MAX_REQUEST_SIZE + 1)
+        if not line:
+            return
+
+        try:
+            if len(line) > MAX_REQUEST_SIZE:
+                raise ServeRequestError("request too large")
+
+            try:
+                request = self.validate(json.loads(line))
+            except json.JSONDecodeError as exc:
+                raise ServeRequestError(f"invalid json: {exc}") from exc
+        except ServeRequestError as exc:
+            self._respond({'error': str(exc)})
+            return
+
+        with self.server.busy():
+            log.debug("received request for %s", request['data_root'])
+            try:
+                output = self.server.analyse(request)
+            # We really do want to catch all here so that one bad request does
+            # not stop the server.
+            except Exception as exc:  # pylint: disable=W0718
+                log.exception("error analysing %s", request['data_root'])
+                self._respond({'error': str(exc)})
+                return
+
+        self._respond({'output': output})
+
+
+class HotSOSServer(socketserver.ThreadingUnixStreamServer):
+    """
+    Long running server that accepts analysis requests over a Unix socket.
+
+    Plugins are imported and defs loaded once when the server starts and
+    requests are run in a pool of worker processes that are forked from the
+    server so that they inherit this state. The number of workers limits how
+    many requests are analysed concurrently and further requests wait until
+    a worker is free. If a worker dies the request it was running fails and
+    the pool is replaced.
+
+    Workers are only ever forked from the thread running serve_forever() and
+    while no handler threads are busy so that they cannot inherit a lock held
+    by another thread.
+    """
+    daemon_threads = True
+
+    def __init__(self, socket_path, workers=1):
+        """
+        @param socket_path: path of Unix socket to listen on.
+        @param workers: maximum number of requests to analyse concurrently.
+        """
+        self.socket_path = socket_path
+        self.workers = workers
+        self._executor = None
+        self._executor_broken = False
+        # Number of handler threads that are busy i.e. not waiting on the
+        # worker pool.
+        self._busy = 0
+        self._state = threading.Condition()
+        self._remove_stale_socket()
+        # only the user running the server can connect to it
+        umask = os.umask(0o077)
+        try:
+            super().__init__(socket_path, HotSOSRequestHandler)
+        finally:
+            os.umask(umask)
+
+    def _remove_stale_socket(self):
+        if not os.path.exists(self.socket_path):
+            return
+
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            try:
+                sock.connect(self.socket_path)
+            except (ConnectionRefusedError, FileNotFoundError):
+                log.debug("removing stale socket %s", self.socket_path)
+                os.remove(self.socket_path)
+            else:
+                raise FileExistsError("another server is already listening "
+                                      f"on {self.socket_path}")
+
+    @staticmethod
+    def warm_up():
+        """ Load state that does not depend on the data root. """
+        for plugin in plugintools.get_plugins_sorted():
+            plugintools.load_plugin(plugin)
+
+        log.debug("loading defs from %s", HotSOSConfig.plugin_yaml_defs)
+        get_ydefs_cache(HotSOSConfig.plugin_yaml_defs).load_all()
+
+    def _start_executor(self):
+        executor = concurrent.futures.ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context('fork'))
+        # Workers are forked on first use so do that now rather than when
+        # the first request arrives.
+        executor.submit(os.getpid).result()
+        return executor
+
+    @contextlib.contextmanager
+    def busy(self):
+        """
+        Mark the calling handler thread as busy for the duration of the
+        context. Waits for the worker pool to be replaced first if it is
+        broken.
+        """
+        with self._state:
+            self._state.wait_for(lambda: not self._executor_broken)
+            self._busy += 1
+
+        try:
+            yield
+        finally:
+            with self._state:
+                self._busy -= 1
+                self._state.notify_all()
+
+    @contextlib.contextmanager
+    def _idle(self):
+        """
+        Mark the calling handler thread as not busy for the duration of the
+        context e.g. while it waits on the worker pool.
+        """
+        with self._state:
+            self._busy -= 1
+            self._state.notify_all()
+
+        try:
+            yield
+        finally:
+            with self._state:
+                self._state.wait_for(lambda: not self._executor_broken)
+                self._busy += 1
+
+    def _set_broken(self, executor):
+        """
+        Flag the worker pool as broken so that it is replaced by
+        service_actions(). A pool is broken for good once any of its workers
+        dies (e.g. killed by the OOM killer).
+
+        @param executor: the executor that was found to be broken. Nothing is
+                         done if it has already been replaced.
+        """
+        with self._state:
+            if self._executor is executor:
+                self._executor_broken = True
+
+    def service_actions(self):
+        """ Called by serve_forever() on each loop. Replaces the worker pool
+        if it is broken. """
+        with self._state:
+            if not self._executor_broken:
+                return
+
+            self._state.wait_for(lambda: self._busy == 0)
+            log.warning("worker pool is broken - restarting it")
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = self._start_executor()
+            self._executor_broken = False
+            self._state.notify_all()
+
+    def _submit(self, func, *args):
+        """
+        Run func in the worker pool and return its result. Must be called by
+        a busy handler thread (see busy()). If the pool is already broken
+        when func is submitted, func is resubmitted once the pool has been
+        replaced. If it breaks while func is running BrokenProcessPool is
+        raised for this call only.
+        """
+        with self._state:
+            executor = self._executor
+
+        try:
+            future = executor.submit(func, *args)
+        except BrokenProcessPool:
+            self._set_broken(executor)
+            # wait for service_actions() to replace it
+            with self._idle():
+                pass
+
+            with self._state:
+                executor = self._executor
+
+            future = executor.submit(func, *args)
+
+        with self._idle():
+            try:
+                return future.result()
+            except BrokenProcessPool:
+                self._set_broken(executor)
+                raise
+
+    def analyse(self, request):
+        """
+        Run a validated request in the worker pool and return its output.
+        """
+        return self._submit(_run_serve_worker, request)
+
+    def serve_forever(self, *args, **kwargs):
+        self.warm_up()
+        with self._state:
+            self._executor = self._start_executor()
+
+        try:
+            super().serve_forever(*args, **kwargs)
+        finally:
+            with self._state:
+                executor, self._executor = self._executor, None
+
+            executor.shutdown()
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+
+def send_request(socket_path, request, timeout=None):
+    """
+    Send a request to a HotSOSServer and return the response.
+
+    @param socket_path: path of Unix socket the server is listening on.
+    @param request: request dict.
+    @param timeout: optional socket timeout in seconds.
+    @return: response dict.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(socket_path)
+        sock.sendall(json.dumps(request).encode() + b'\n')
+        with sock.makefile('rb') as fd:
+            return json.loads(fd.readline())
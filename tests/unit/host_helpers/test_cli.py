@@ -85,6 +85,20 @@ class TestCLIHelper(utils.BaseTestCase):
     def test_get_date_w_tz(self):
         self.assertEqual(host_cli.CLIHelper().date(), '1616669705')
 
+    @utils.create_data_root({'sos_commands/date/date':
+                             'Thu Mar  4 10:55:05 HKT 2021'})
+    def test_get_date_w_hkt_tz(self):
+        with mock.patch.object(cli_common, 'subprocess') as mock_subprocess:
+            cli = host_cli.CLIHelper()
+            self.assertEqual(cli.date(), '1614826505')
+            self.assertEqual(cli.date(format='+%Y-%m-%d %H:%M:%S'),
+                             '2021-03-04 02:55:05')
+            self.assertEqual(cli.date(format='--iso-8601'), '2021-03-04')
+            self.assertEqual(cli.date(format='+%Z'), 'UTC')
+            self.assertEqual(cli.date(no_format=True),
+                             'Thu Mar 4 02:55:05 UTC 2021')
+            self.assertFalse(mock_subprocess.called)
+
     @utils.create_data_root({'sos_commands/date/date':
                              'Thu Mar 25 10:55:05 123UTC 2021'})
     def test_get_date_w_invalid_tz(self):
@@ -230,6 +244,40 @@ class TestCLIHelper(utils.BaseTestCase):
         self.assertEqual(out, expected)
 
 
+class TestCLIHelperShared(utils.BaseTestCase):
+    """ Tests for state shared between CLIHelper instances. """
+
+    def test_command_catalog_shared(self):
+        shared = host_cli.CLIHelper().command_catalog
+        self.assertIs(host_cli.CLIHelper().command_catalog, shared)
+        with self.assertRaises(TypeError):
+            shared['foo'] = []  # pylint: disable=E1137
+
+        sources = shared['ethtool']
+        # a missing source must not leave the shared command modified
+        self.assertEqual(host_cli.CLIHelper().ethtool(interface='foo'), [])
+        self.assertNotEqual(host_cli.CLIHelper().ethtool(interface='ens3'),
+                            [])
+        self.assertTrue(sources[1].path.endswith('ethtool_{interface}'))
+        self.assertFalse(any(s.is_call_copy for s in sources))
+
+    @utils.create_data_root({'ps': 'line1\nline2\n'})
+    def test_file_cmd_output_cached(self):
+        out = host_cli.CLIHelper().ps()
+        self.assertEqual(out, ['line1\n', 'line2\n'])
+        self.assertIs(host_cli.CLIHelper().ps(), out)
+        with self.assertRaises(TypeError):
+            out.append('line3\n')
+
+        # a change to the file invalidates the cache
+        with open(os.path.join(HotSOSConfig.data_root, 'ps'), 'a',
+                  encoding='utf-8') as fd:
+            fd.write('line3\n')
+
+        self.assertEqual(host_cli.CLIHelper().ps(),
+                         ['line1\n', 'line2\n', 'line3\n'])
+
+
 class TestCommandAffinity(utils.BaseTestCase):
     """ Tests for command affinity. """
 
@@ -0,0 +1,184 @@
+import json
+import lzma
+import os
+import struct
+from datetime import datetime, timezone
+
+from hotsos.core.config import HotSOSConfig
+from hotsos.core.host_helpers.cli import cli as host_cli
+from hotsos.core.host_helpers import journal as host_journal
+from hotsos.core.host_helpers.exceptions import SourceNotFound
+
+from .. import utils
+
+BOOT1 = '11111111111111111111111111111111'
+BOOT2 = '22222222222222222222222222222222'
+HEADER_SIZE = 256
+
+
+def realtime(date):
+    """ Return date string as microseconds since the epoch. """
+    return int(datetime.fromisoformat(date).replace(
+        tzinfo=timezone.utc).timestamp()) * 10 ** 6
+
+
+JOURNAL_ENTRIES = [
+    (realtime('2022-02-01 10:00:00'), BOOT1,
+     {'_TRANSPORT': 'kernel', 'SYSLOG_IDENTIFIER': 'kernel',
+      '_HOSTNAME': 'compute4', 'MESSAGE': 'too old'}),
+    (realtime('2022-02-09 10:00:00'), BOOT1,
+     {'_TRANSPORT': 'journal', 'SYSLOG_IDENTIFIER': 'systemd', '_PID': '1',
+      '_HOSTNAME': 'compute4', 'UNIT': 'neutron-ovs-cleanup.service',
+      'MESSAGE_ID': '39f53479d3a045ac8e11786248231fbf',
+      'MESSAGE': 'Started OpenStack Neutron OVS cleanup.'}),
+    (realtime('2022-02-09 10:00:01'), BOOT1,
+     {'_TRANSPORT': 'kernel', 'SYSLOG_IDENTIFIER': 'kernel',
+      '_HOSTNAME': 'compute4', 'MESSAGE': 'boot1 kernel message'}),
+    (realtime('2022-02-10 09:00:00'), BOOT2,
+     {'_TRANSPORT': 'stdout', 'SYSLOG_IDENTIFIER': 'neutron-ovs-cleanup',
+      '_PID': '1234', '_HOSTNAME': 'compute4',
+      '_SYSTEMD_UNIT': 'neutron-ovs-cleanup.service',
+      'MESSAGE': 'cleaning up\n\tbridges ' + 'x' * 64}),
+    (realtime('2022-02-10 09:00:01'), BOOT2,
+     {'_TRANSPORT': 'kernel', 'SYSLOG_IDENTIFIER': 'kernel',
+      '_HOSTNAME': 'compute4', 'MESSAGE': 'boot2 kernel message'}),
+]
+
+
+def make_journal(entries, compact=False):
+    """
+    Create the contents of a minimal systemd journal file containing only
+    the data and entry objects needed to read entries. Long data payloads
+    are xz compressed.
+    """
+    buf = bytearray(HEADER_SIZE)
+    data_offsets = {}
+    tail = 0
+
+    def add_object(otype, flags, body):
+        nonlocal tail
+        tail = len(buf)
+        buf.extend(struct.pack('<BB6xQ', otype, flags, 16 + len(body)))
+        buf.extend(body)
+        buf.extend(bytes(-len(buf) % 8))
+        return tail
+
+    def add_data(payload):
+        if payload not in data_offsets:
+            flags = 0
+            body = payload
+            if len(payload) > 64:
+                body = lzma.compress(payload)
+                flags = host_journal.OBJECT_COMPRESSED_XZ
+
+            data_offsets[payload] = add_object(
+                host_journal.OBJECT_DATA, flags,
+                bytes(56 if compact else 48) + body)
+
+        return data_offsets[payload]
+
+    for ts, boot_id, fields in entries:
+        items = b''
+        for field, value in fields.items():
+            offset = add_data(f'{field}={value}'.encode())
+            if compact:
+                items += struct.pack('<I', offset)
+            else:
+                items += struct.pack('<QQ', offset, 0)
+
+        add_object(host_journal.OBJECT_ENTRY, 0,
+                   host_journal.ENTRY_HEADER.pack(0, ts, 0,
+                                                  bytes.fromhex(boot_id), 0) +
+                   items)
+
+    flags = host_journal.HEADER_INCOMPATIBLE_COMPACT if compact else 0
+    struct.pack_into('<8sII', buf, 0, host_journal.JOURNAL_SIGNATURE, 0,
+                     flags)
+    struct.pack_into('<Q', buf, host_journal.HEADER_HEADER_SIZE_OFFSET,
+                     HEADER_SIZE)
+    struct.pack_into('<Q', buf, host_journal.HEADER_TAIL_OBJECT_OFFSET, tail)
+    return bytes(buf)
+
+
+class TestJournal(utils.BaseTestCase):
+    """ Unit tests for systemd journal helpers. """
+
+    @staticmethod
+    def write_journal(entries, compact=False):
+        path = os.path.join(HotSOSConfig.data_root,
+                            'var/log/journal/0123456789abcdef')
+        os.makedirs(path)
+        path = os.path.join(path, 'system.journal')
+        with open(path, 'wb') as fd:
+            fd.write(make_journal(entries, compact=compact))
+
+        return path
+
+    @utils.create_data_root({})
+    def test_journal_file_reader(self):
+        for compact in [False, True]:
+            path = self.write_journal(JOURNAL_ENTRIES, compact=compact)
+            reader = host_journal.JournalFileReader(path)
+            self.assertEqual(list(reader.entries()), JOURNAL_ENTRIES)
+            os.remove(path)
+            os.rmdir(os.path.dirname(path))
+
+    @utils.create_data_root({'var/log/journal/system.journal': 'LPKS'})
+    def test_journal_file_reader_invalid(self):
+        path = os.path.join(HotSOSConfig.data_root,
+                            'var/log/journal/system.journal')
+        with self.assertRaises(host_journal.JournalFormatError):
+            list(host_journal.JournalFileReader(path).entries())
+
+    @utils.create_data_root({})
+    def test_journal_index(self):
+        self.write_journal(JOURNAL_ENTRIES, compact=True)
+        index = host_journal.JournalIndex(
+            os.path.join(HotSOSConfig.data_root, 'var/log/journal'))
+        entries = list(index.query(unit='neutron-ovs-cleanup.service'))
+        self.assertEqual(entries, JOURNAL_ENTRIES[1:2] + JOURNAL_ENTRIES[3:4])
+        entries = list(index.query(kernel=True))
+        self.assertEqual(entries, JOURNAL_ENTRIES[4:])
+        entries = list(index.query(since=JOURNAL_ENTRIES[2][0],
+                                   matches={'_TRANSPORT': ['kernel']}))
+        self.assertEqual(entries, [JOURNAL_ENTRIES[2], JOURNAL_ENTRIES[4]])
+        entries = list(index.query(matches={'SYSLOG_IDENTIFIER': ['systemd'],
+                                            '_PID': ['1', '2']}))
+        self.assertEqual(entries, JOURNAL_ENTRIES[1:2])
+        self.assertTrue(os.path.exists(index.db_path))
+
+    @utils.create_data_root({})
+    def test_journalctl(self):
+        self.write_journal(JOURNAL_ENTRIES)
+        cli = host_cli.CLIHelper()
+        indent = ' ' * len('2022-02-10T09:00:00+0000 compute4 '
+                           'neutron-ovs-cleanup[1234]: ')
+        expected = ['2022-02-09T10:00:00+0000 compute4 systemd[1]: Started '
+                    'OpenStack Neutron OVS cleanup.\n',
+                    f'-- Boot {BOOT2} --\n',
+                    '2022-02-10T09:00:00+0000 compute4 '
+                    'neutron-ovs-cleanup[1234]: cleaning up\n',
+                    f'{indent}        bridges {"x" * 64}\n']
+        self.assertEqual(cli.journalctl(unit='neutron-ovs-cleanup'),
+                         expected)
+        self.assertEqual(cli.journalctl(unit='neutron-ovs-cleanup',
+                                        date='2022-02-10'), expected[2:])
+        self.assertEqual(cli.journalctl(opts='-k'),
+                         ['2022-02-10T09:00:01+0000 compute4 kernel: boot2 '
+                          'kernel message\n'])
+        message_id = JOURNAL_ENTRIES[1][2]['MESSAGE_ID']
+        out = cli.journalctl(opts=f'-ojson _PID=1 MESSAGE_ID=foo '
+                                  f'MESSAGE_ID={message_id}')
+        self.assertEqual([json.loads(line) for line in out],
+                         [{'__REALTIME_TIMESTAMP':
+                           str(JOURNAL_ENTRIES[1][0]),
+                           '_BOOT_ID': BOOT1, **JOURNAL_ENTRIES[1][2]}])
+
+    @utils.create_data_root({})
+    def test_journalctl_unsupported_opts(self):
+        self.write_journal(JOURNAL_ENTRIES)
+        cmd = host_cli.JournalctlIndexFileCmd('var/log/journal')
+        for kwargs in [{'opts': '--reverse'}, {'opts': '-ocat'},
+                       {'opts': 'FOO=bar'}, {'unit': 'neutron-*'}]:
+            with self.assertRaises(SourceNotFound):
+                cmd(**kwargs)
@@ -1,4 +1,9 @@
 
+import itertools
+import shutil
+import subprocess
+import unittest
+
 from hotsos.core.host_helpers import packaging as host_pack
 
 from .. import utils
@@ -41,6 +46,33 @@ class TestAPTPackageHelper(utils.BaseTestCase):
         obj = host_pack.APTPackageHelper(["systemd"])
         self.assertEqual(obj.all_formatted, expected)
 
+    def test_is_installed_full_search(self):
+        obj = host_pack.APTPackageHelper(["systemd"])
+        self.assertFalse(obj.is_installed("apt"))
+        self.assertTrue(obj.is_installed("apt", allow_full_search=True))
+        self.assertTrue(obj.is_installed("ap[t]", allow_full_search=True))
+        self.assertFalse(obj.is_installed("ap", allow_full_search=True))
+
+    def test_expression_alternation(self):
+        obj = host_pack.APTPackageHelper(["systemd-sysv|python3-systemd"],
+                                         ["systemd-(sysv|timesyncd)"])
+        self.assertEqual(obj.core, {'python3-systemd': '234-3build2',
+                                    'systemd-sysv': '245.4-4ubuntu3.15'})
+        self.assertEqual(list(obj.all), ['python3-systemd', 'systemd-sysv',
+                                         'systemd-timesyncd'])
+
+    def test_index_shared(self):
+        a = host_pack.APTPackageHelper(["systemd"])
+        b = host_pack.APTPackageHelper(["apt"])
+        self.assertIs(a.index, b.index)
+        entry = a.index.names['systemd']
+        self.assertEqual((entry.state, entry.version, entry.arch),
+                         ('ii', '245.4-4ubuntu3.15', 'amd64'))
+        self.assertIs(a.index.find(["systemd"]), a.index.find(["systemd"]))
+        index = a.index
+        host_pack.PACKAGE_INDEX_CACHE.clear()
+        self.assertIsNot(a.index, index)
+
 
 class TestSnapPackageHelper(utils.BaseTestCase):
     """ Unit tests for snap helper """
@@ -59,6 +91,13 @@ class TestSnapPackageHelper(utils.BaseTestCase):
         obj = host_pack.SnapPackageHelper(["core20"])
         self.assertEqual(obj.all_formatted, expected)
 
+    def test_core_and_other(self):
+        obj = host_pack.SnapPackageHelper(core_snaps=['core2.'],
+                                          other_snaps=['core20', 'lxd'])
+        self.assertEqual(list(obj.core), ['core20'])
+        self.assertEqual(list(obj.all), ['core20', 'lxd'])
+        self.assertEqual(obj.get_revision('lxd'), '22340')
+
     @utils.create_data_root({'sos_commands/snap/snap_list_--all':
                              SNAP_LIST_W_DISABLED})
     def test_ignore_disabled(self):
@@ -419,3 +458,49 @@ class TestDPKGVersion(utils.BaseTestCase):  # noqa, pylint: disable=too-many-pub
                 '1:8.2p1-4ubuntu0.4',
                 [{'foo': '1:8.2p1-4ubuntu0.4'}]
             )
+
+    def test_dpkg_compare_versions(self):
+        for a, b, expected in [('1.0', '1.0', 0),
+                               ('1.0', '1.0-0', 0),
+                               ('0:1.0', '1.0', 0),
+                               ('1.0~rc1', '1.0', -1),
+                               ('1.0~~', '1.0~', -1),
+                               ('1.0', '1.0a', -1),
+                               ('1.0a', '1.0+', -1),
+                               ('1.9', '1.10', -1),
+                               ('1.0-1ubuntu1', '1.0-1ubuntu1.1', -1),
+                               ('2:1.0', '1:9.9', 1),
+                               ('', '0', -1),
+                               ('', '', 0)]:
+            result = host_pack.dpkg_compare_versions(a, b)
+            self.assertEqual((result > 0) - (result < 0), expected,
+                             f"{a} vs {b}")
+
+    def test_dpkg_parse_version(self):
+        self.assertEqual(host_pack.dpkg_parse_version('1:8.2p1-4ubuntu0.4'),
+                         (1, '8.2p1', '4ubuntu0.4'))
+        self.assertEqual(host_pack.dpkg_parse_version('1.2-3-4'),
+                         (0, '1.2-3', '4'))
+        self.assertIsNone(host_pack.dpkg_parse_version(''))
+        for bad in ['a1', '1:', ':1', 'x:1', '1.0-', '1 0', '1_0',
+                    '1.0-a_b']:
+            with self.assertRaises(host_pack.DPKGBadVersionSyntax):
+                host_pack.dpkg_parse_version(bad)
+
+        # shared by all data roots analysed by a process so must be bounded
+        self.assertIsNotNone(host_pack.dpkg_parse_version.cache_info().maxsize)
+
+    @unittest.skipIf(shutil.which('dpkg') is None, 'dpkg not available')
+    def test_dpkg_compare_versions_matches_dpkg(self):
+        versions = ['', '0', '1.0', '1.0~rc1', '1.0~', '1.0+1', '1.0-1',
+                    '1:0.9', '2:1.0-0ubuntu1~cloud0', '1.00', '1.0a',
+                    '10.2.5-0ubuntu0.16.04.1', '1.0-1~bpo1', '1.0-1+b1',
+                    '0:1.0', '1.a', '1.A', '1.0~~', '1.2.3-4-5']
+        for a, b in itertools.product(versions, repeat=2):
+            for op in ['lt', 'eq', 'gt']:
+                ret = subprocess.call(['dpkg', '--compare-versions', '--',
+                                       a, op, b])
+                result = host_pack.dpkg_compare_versions(a, b)
+                result = {'lt': result < 0, 'eq': result == 0,
+                          'gt': result > 0}[op]
+                self.assertEqual(result, ret == 0, f"{a} {op} {b}")
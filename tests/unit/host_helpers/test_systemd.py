@@ -1,3 +1,6 @@
+import json
+from unittest import mock
+
 from hotsos.core.host_helpers import systemd as host_systemd
 from hotsos.core.plugins.storage.ceph.common import CEPH_SERVICES_EXPRS
 
@@ -194,3 +197,55 @@ Feb 09 22:38:17 compute4 systemd[1]: Starting System Logging Service...
             self.assertEqual(len(log.output), 1)
             self.assertIn('no active status found for neutron-ovs-cleanup',
                           log.output[0])
+
+    def test_unit_index(self):
+        index = host_systemd.get_unit_index()
+        self.assertIs(index, host_systemd.get_unit_index())
+        status = index.units['rsyslog.service']
+        self.assertEqual(status.active_state, 'active')
+        self.assertEqual(status.sub_state, 'running')
+        self.assertEqual(status.since, '2022-02-09 22:38:17 UTC')
+        self.assertEqual(status.main_pid, 923)
+        self.assertEqual(status.memory, '4.1M')
+        self.assertEqual(index.units['-.mount'].sub_state, 'mounted')
+        self.assertEqual(index.units['-.mount'].main_pid, None)
+
+    @mock.patch.object(host_systemd, 'CLIHelper')
+    def test_unit_index_shared_uncached_output(self, mock_cli):
+        """
+        The index must be shared even if the systemctl output is not cached
+        e.g. when it comes from a binary command on a live host.
+        """
+        mock_cli.return_value.systemctl_status_all.return_value = []
+        mock_cli.return_value.journalctl.return_value = []
+        for svc in ['rsyslog', 'nova-compute']:
+            self.assertIsNone(
+                host_systemd.SystemdService(svc, 'enabled').start_time)
+            self.assertIsInstance(
+                host_systemd.SystemdService(svc, 'enabled').memory_current_kb,
+                int)
+
+        self.assertEqual(
+            mock_cli.return_value.systemctl_status_all.call_count, 1)
+        self.assertEqual(mock_cli.return_value.journalctl.call_count, 1)
+
+    @mock.patch.object(host_systemd, 'CLIHelper')
+    def test_unit_index_journal(self, mock_cli):
+        entries = [{'UNIT': 'rsyslog.service',
+                    '__REALTIME_TIMESTAMP': '1644446297000000'},
+                   {'UNIT': 'nova-compute.service',
+                    '__REALTIME_TIMESTAMP': '1644446298000000'},
+                   {'UNIT': 'rsyslog.service',
+                    '__REALTIME_TIMESTAMP': '1644446299000000'},
+                   {'USER_UNIT': 'dbus.service',
+                    '__REALTIME_TIMESTAMP': '1644446300000000'}]
+        mock_cli.return_value.journalctl.return_value = \
+            [json.dumps(e) + '\n' for e in entries] + ['-- No entries --\n']
+        index = host_systemd.SystemdUnitIndex([])
+        self.assertEqual(index.start_time('rsyslog.service').timestamp(),
+                         1644446299.0)
+        self.assertEqual(index.start_time('nova-compute.service').timestamp(),
+                         1644446298.0)
+        self.assertEqual(list(index.journal_start_times),
+                         ['rsyslog.service', 'nova-compute.service'])
+        self.assertEqual(mock_cli.return_value.journalctl.call_count, 1)
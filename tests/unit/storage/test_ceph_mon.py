@@ -387,6 +387,49 @@ class TestCoreCephCluster(  # pylint: disable=too-many-public-methods
         self.assertEqual(cli.CLIHelper().ceph_report_json_decoded(),
                          {'foo': 'bar'})
 
+    @utils.create_data_root({'sos_commands/ceph_mon/json_output/'
+                             'ceph_pg_dump_--format_json-pretty':
+                             json.dumps(PG_DUMP_JSON_DECODED, indent=4) +
+                             '\ndumped all\n'},
+                            copy_from_original=['sos_commands/ceph_mon/'
+                                                'json_output/ceph_osd_dump_'
+                                                '--format_json-pretty'])
+    def test_pg_dump_file_last_line_filter(self):
+        self.assertEqual(cli.CLIHelper().ceph_pg_dump_json_decoded(),
+                         PG_DUMP_JSON_DECODED)
+        cluster = ceph.CephCluster()
+        self.assertEqual(cluster.laggy_pgs,
+                         PG_DUMP_JSON_DECODED['pg_map']['pg_stats'])
+        self.assertEqual(cluster.large_omap_pgs,
+                         {'2.f': {
+                             'pool': 'glance',
+                             'last_scrub_stamp': '2021-09-16T21:26:00.00',
+                             'last_deep_scrub_stamp':
+                                 '2021-09-16T21:26:00.00'}})
+
+    @utils.create_data_root({'sos_commands/ceph_mon/json_output/'
+                             'ceph_pg_dump_--format_json-pretty':
+                             '{"pg_map": {"pg_stats": [{"state": '})
+    def test_pg_dump_file_invalid(self):
+        cluster = ceph.CephCluster()
+        self.assertEqual(cluster.laggy_pgs, [])
+        self.assertEqual(cluster.large_omap_pgs, {})
+
+    @utils.create_data_root({'sos_commands/ceph_mon/json_output/'
+                             'ceph_pg_dump_--format_json-pretty':
+                             json.dumps(PG_DUMP_JSON_DECODED)},
+                            copy_from_original=['sos_commands/ceph_mon/'
+                                                'json_output/ceph_osd_dump_'
+                                                '--format_json-pretty'])
+    def test_pg_dump_streamed_once(self):
+        with mock.patch.object(ceph.cluster, 'iter_json_array',
+                               wraps=ceph.cluster.iter_json_array) as mock_it:
+            cluster = ceph.CephCluster()
+            self.assertEqual(cluster.laggy_pgs,
+                             PG_DUMP_JSON_DECODED['pg_map']['pg_stats'])
+            self.assertEqual(list(cluster.large_omap_pgs), ['2.f'])
+            self.assertEqual(mock_it.call_count, 1)
+
 
 class TestCephMonSummary(CephMonTestsBase):
     """ Unit tests for ceph mon summary. """
@@ -1,4 +1,5 @@
 import os
+from datetime import datetime, timedelta
 
 from hotsos.core import analytics
 from hotsos.core.config import HotSOSConfig
@@ -207,3 +208,47 @@ class TestAnalytics(utils.BaseTestCase):
         expected = {'avg': 60.0, 'incomplete': 2, 'max': 60.0, 'min': 60.0,
                     'samples': 2, 'stdev': 0.0}
         self.assertEqual(stats, expected)
+
+    def test_parse_timestamps(self):
+        timestamps = ['2021-07-19 09:01:58.498', '2021-07-19 09:01:58.1',
+                      '2021-07-19 09:01:58.498']
+        self.assertEqual(analytics.LogEventStats.parse_timestamps(timestamps),
+                         [datetime(2021, 7, 19, 9, 1, 58, 498000),
+                          datetime(2021, 7, 19, 9, 1, 58, 100000),
+                          datetime(2021, 7, 19, 9, 1, 58, 498000)])
+        with self.assertRaises(ValueError):
+            analytics.LogEventStats.parse_timestamps(['2021-07-19 09:01:58'])
+
+    def test_find_most_recent_start(self):
+        events = analytics.EventCollection()
+        start = datetime(2021, 7, 19, 9, 1, 58)
+        for secs, metadata in [(20, 'a'), (0, 'b'), (10, 'c'), (10, 'd')]:
+            events.add_event_start('0', start + timedelta(seconds=secs),
+                                   metadata=metadata)
+
+        item = events.find_most_recent_start('0',
+                                             start - timedelta(seconds=1))
+        self.assertEqual(item, {})
+        item = events.find_most_recent_start('0',
+                                             start + timedelta(seconds=15))
+        self.assertEqual(item['metadata'], 'c')
+        item = events.find_most_recent_start('0',
+                                             start + timedelta(seconds=25))
+        self.assertEqual(item['metadata'], 'a')
+
+    @utils.create_data_root({'atestfile': SEQ_TEST_5})
+    def test_top_n_shortest(self):
+        fname = os.path.join(HotSOSConfig.data_root, 'atestfile')
+        s = FileSearcher()
+        expr = r'^([0-9\-]+) (\S+) iteration:([0-9]+) start'
+        s.add(SearchDef(expr, tag="eventX-start"), path=fname)
+        expr = r'^([0-9\-]+) (\S+) iteration:([0-9]+) end'
+        s.add(SearchDef(expr, tag="eventX-end"), path=fname)
+        events = analytics.LogEventStats(s.run(), "eventX")
+        events.run()
+        self.assertEqual(list(events.get_top_n_events_sorted(1)), ['0'])
+        self.assertEqual(
+            list(events.get_top_n_events_sorted(1, reverse=False)), ['1'])
+        self.assertIs(events.data.complete_events,
+                      events.data.complete_events)
+        self.assertEqual(len(events.data.incomplete_events), 2)
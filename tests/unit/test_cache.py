@@ -0,0 +1,133 @@
+import os
+import tempfile
+
+from hotsos.client import HotSOSClient
+from hotsos.core.cache import (
+    PersistentCache,
+    get_persistent_cache,
+    reset_persistent_cache,
+)
+from hotsos.core.config import HotSOSConfig
+from hotsos.core.host_helpers.cli import CLIHelper
+
+from . import utils
+
+
+class TestPersistentCache(utils.BaseTestCase):
+    """ Unit tests for the persistent cache. """
+
+    def setUp(self):
+        super().setUp()
+        self.cache_dir = tempfile.mkdtemp(dir=self.global_tmp_dir)
+
+    def test_disabled(self):
+        self.assertIsNone(get_persistent_cache())
+        HotSOSConfig.cache_dir = self.cache_dir
+        self.assertIsNotNone(get_persistent_cache())
+        HotSOSConfig.data_root = '/'
+        self.assertIsNone(get_persistent_cache())
+
+    @utils.create_data_root({'foo.txt': 'foo'})
+    def test_get_set(self):
+        cache = PersistentCache(self.cache_dir, 1024 ** 2,
+                                HotSOSConfig.data_root, ())
+        self.assertIsNone(cache.get('test', ('a', 1)))
+        cache.set('test', ('a', 1), {'a': [1, 2]})
+        self.assertEqual(cache.get('test', ('a', 1)), {'a': [1, 2]})
+        self.assertIsNone(cache.get('test', ('a', 2)))
+        self.assertIsNone(cache.get('other', ('a', 1)))
+
+    @utils.create_data_root({'foo.txt': 'foo'})
+    def test_set_unwritable(self):
+        cache_dir = os.path.join(self.cache_dir, 'notadir')
+        with open(cache_dir, 'w', encoding='utf-8'):
+            pass
+
+        cache = PersistentCache(cache_dir, 1024 ** 2, HotSOSConfig.data_root,
+                                ())
+        cache.set('test', 'a', 1)
+        self.assertIsNone(cache.get('test', 'a'))
+
+    @utils.create_data_root({'foo.txt': 'foo'})
+    def test_reset(self):
+        HotSOSConfig.cache_dir = self.cache_dir
+        cache = get_persistent_cache()
+        self.assertIs(get_persistent_cache(), cache)
+        reset_persistent_cache()
+        self.assertIsNot(get_persistent_cache(), cache)
+
+    @utils.create_data_root({'foo.txt': 'foo'})
+    def test_data_root_change_invalidates(self):
+        cache = PersistentCache(self.cache_dir, 1024 ** 2,
+                                HotSOSConfig.data_root, ())
+        cache.set('test', 'a', 1)
+        self.assertEqual(cache.get('test', 'a'), 1)
+        with open(os.path.join(HotSOSConfig.data_root, 'foo.txt'), 'a',
+                  encoding='utf-8') as fd:
+            fd.write('bar')
+
+        cache = PersistentCache(self.cache_dir, 1024 ** 2,
+                                HotSOSConfig.data_root, ())
+        self.assertIsNone(cache.get('test', 'a'))
+
+        cache = PersistentCache(self.cache_dir, 1024 ** 2,
+                                HotSOSConfig.data_root,
+                                (('force_mode', 'True'),))
+        self.assertIsNone(cache.get('test', 'a'))
+
+    @utils.create_data_root({'foo.txt': 'foo'})
+    def test_evict_lru(self):
+        cache = PersistentCache(self.cache_dir, 3500,
+                                HotSOSConfig.data_root, ())
+        for i in range(3):
+            cache.set('test', i, 'x' * 1000)
+            path = cache._path('test', i)  # pylint: disable=protected-access
+            os.utime(path, ns=(i, i))
+
+        # make 0 the most recently used
+        self.assertIsNotNone(cache.get('test', 0))
+        cache.set('test', 3, 'x' * 1000)
+        cache.evict()
+        self.assertIsNotNone(cache.get('test', 0))
+        self.assertIsNone(cache.get('test', 1))
+        self.assertIsNotNone(cache.get('test', 2))
+        self.assertIsNotNone(cache.get('test', 3))
+
+    @utils.create_data_root({'uptime':
+                             ' 10:00:00 up 1 day,  1 user,  load average: '
+                             '0.00, 0.00, 0.00\n'})
+    def test_cli_output_cached(self):
+        HotSOSConfig.cache_dir = self.cache_dir
+        expected = CLIHelper().uptime()
+        self.assertTrue(expected.startswith('10:00:00 up 1 day'))
+        os.remove(os.path.join(HotSOSConfig.data_root, 'uptime'))
+        # fingerprint is computed once per run so the cached output is used.
+        self.assertEqual(CLIHelper().uptime(), expected)
+
+    @utils.create_data_root({'sos_commands/dpkg/dpkg_-l':
+                             'ii  foo 1.0 amd64 foo\n'})
+    def test_cli_output_shared(self):
+        """
+        Read-only command output is shared for the duration of a run whether
+        or not it came from the persistent cache.
+        """
+        HotSOSConfig.cache_dir = self.cache_dir
+        for _ in range(2):
+            output = CLIHelper().dpkg_l()
+            self.assertEqual(output, ['ii  foo 1.0 amd64 foo\n'])
+            self.assertIs(CLIHelper().dpkg_l(), output)
+            reset_persistent_cache()
+
+    def test_plugin_output_cached_per_profile(self):
+        """
+        Output cached by a run that was not profiled must not be used by one
+        that is since it has no profile records for the plugin.
+        """
+        HotSOSConfig.cache_dir = self.cache_dir
+        for profile in [False, True]:
+            HotSOSConfig.profile = profile
+            client = HotSOSClient(['hotsos', 'juju'])
+            client.run()
+
+        summary = client.summary.get_builder().content
+        self.assertIn('juju', summary['profile'])
@@ -0,0 +1,43 @@
+import json
+import os
+import subprocess
+import sys
+
+from hotsos.core.config import HotSOSConfig
+
+from . import utils
+
+HOTBENCH = os.path.join(os.path.dirname(utils.HOTSOS_ROOT), 'tools',
+                        'benchmark', 'hotbench.py')
+
+
+class TestHotBench(utils.BaseTestCase):
+    """ Smoke tests for the benchmark harness. """
+
+    @staticmethod
+    def _run(*args):
+        env = dict(os.environ,
+                   PYTHONPATH=os.path.dirname(utils.HOTSOS_ROOT))
+        return subprocess.run([sys.executable, HOTBENCH, *args],
+                              capture_output=True, check=False, text=True,
+                              env=env)
+
+    def test_run_case(self):
+        out = self._run('--data-root', HotSOSConfig.data_root,
+                        '--cases', 'helper.APTPackageHelper',
+                        '--repeat', '1')
+        self.assertEqual(out.returncode, 0, out.stderr)
+        results = json.loads(out.stdout)
+        self.assertEqual(results['data-root'], HotSOSConfig.data_root)
+        self.assertEqual(list(results['results']),
+                         ['helper.APTPackageHelper'])
+        result = results['results']['helper.APTPackageHelper']
+        self.assertEqual(len(result['wall']['runs']), 1)
+
+    def test_unknown_case(self):
+        out = self._run('--data-root', HotSOSConfig.data_root,
+                        '--plugins', 'juju', '--cases', 'client.all,foo')
+        self.assertEqual(out.returncode, 2)
+        self.assertIn("unknown cases: foo (valid cases are: client.all, "
+                      "client.plugin.juju, helper.APTPackageHelper, "
+                      "helper.CephCluster)", out.stderr)
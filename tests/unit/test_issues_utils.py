@@ -1,3 +1,5 @@
+import json
+import multiprocessing
 import os
 
 import yaml
@@ -73,6 +75,25 @@ class TestIssuesUtils(utils.BaseTestCase):
                             'context': {'path': '/foo/bar', 'linenumber': 123},
                             'origin': 'testplugin.testpart'}]})
 
+    def test_add_issues_multiprocess(self):
+        def add_issues(worker):
+            for i in range(50):
+                IssuesManager().add(MemoryWarning(f"test{worker}.{i}"))
+
+        procs = [multiprocessing.get_context('fork').Process(
+                 target=add_issues, args=(worker,)) for worker in range(4)]
+        for proc in procs:
+            proc.start()
+
+        for proc in procs:
+            proc.join()
+
+        ret = IssuesManager().load_issues()
+        self.assertEqual(ret[IssuesManager.SUMMARY_OUT_ISSUES_ROOT]
+                         ['MemoryWarnings'],
+                         sorted(f"test{w}.{i}" for w in range(4)
+                                for i in range(50)))
+
 
 class TestKnownBugsUtils(utils.BaseTestCase):
     """ Unit tests for known bugs utils. """
@@ -82,9 +103,10 @@ class TestKnownBugsUtils(utils.BaseTestCase):
                         'message': None,
                         'origin': 'testplugin.testpart'}]}
         with open(os.path.join(self.plugin_tmp_dir,
-                               'known_bugs.yaml'),
+                               'known_bugs.jsonl'),
                   'w', encoding='utf-8') as fd:
-            fd.write(yaml.dump(known_bugs))
+            for bug in known_bugs[IssuesManager.SUMMARY_OUT_BUGS_ROOT]:
+                fd.write(json.dumps(bug) + '\n')
 
         ret = IssuesManager().load_bugs()
         self.assertEqual(ret, known_bugs)
@@ -110,9 +132,10 @@ class TestKnownBugsUtils(utils.BaseTestCase):
                         'message': None,
                         'origin': 'testplugin.testpart'}]}
         with open(os.path.join(self.plugin_tmp_dir,
-                               'known_bugs.yaml'),
+                               'known_bugs.jsonl'),
                   'w', encoding='utf-8') as fd:
-            fd.write(yaml.dump(known_bugs))
+            for bug in known_bugs[IssuesManager.SUMMARY_OUT_BUGS_ROOT]:
+                fd.write(json.dumps(bug) + '\n')
 
         mgr = IssuesManager()
         mgr.add(LaunchpadBug(2, None))
@@ -640,6 +640,25 @@ class TestKernelNetworkInfo(TestKernelBase):
                 self.assertEqual(getattr(row, fname),
                                  expected_output[ridx][fidx])
 
+    @utils.create_data_root(
+        {'sos_commands/process/lsof_M_-n_-l_-c': LSOF_MNLC}
+    )
+    def test_lsof_indexes(self):
+        uut = Lsof()
+        self.assertEqual([f"{r.COMMAND}/{r.PID}"
+                          for r in uut.all_with_inode(34703)],
+                         ['ovs-vswit/13936', 'qemu-syst/20986'])
+        self.assertEqual([r.NAME for r in uut.all_with_inode('TCP')],
+                         ['192.168.2.24:46064->192.168.2.45:5673 '
+                          '(ESTABLISHED)'])
+        self.assertEqual(len(uut.all_with_pid(13936)),
+                         len([r for r in uut if r.PID == 13936]))
+        self.assertEqual([r.FD for r in uut.all_with_command('systemd')],
+                         ['cwd', 'rtd', 'txt'])
+        self.assertEqual(uut.all_with_inode(1), [])
+        self.assertEqual(uut.data[-1].COMMAND, 'sosreport')
+        self.assertEqual([r.FD for r in uut.data[1:3]], ['rtd', 'txt'])
+
     @utils.create_data_root(
         {'proc/net/netlink': PROC_NETLINK}
     )
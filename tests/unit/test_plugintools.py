@@ -1,10 +1,18 @@
 import os
 import json
 import logging
+import subprocess
+import sys
 import tempfile
 from unittest import mock
 
-from hotsos.client import OutputManager, OutputBuilder
+from hotsos.client import (
+    HotSOSClient,
+    HotSOSFleetClient,
+    OutputManager,
+    OutputBuilder,
+)
+from hotsos.core.config import HotSOSConfig
 from hotsos.core.host_helpers.cli import CLIHelper
 from hotsos.core.issues import IssuesManager
 from hotsos.core import plugintools
@@ -320,6 +328,43 @@ plain value
         filtered = OutputManager(summary).get_builder().to(fmt="html")
         self.assertEqual(filtered, expected)
 
+    def test_plugin_manifest_order(self):
+        for plugin in plugintools.get_plugins_sorted():
+            self.assertTrue(plugintools.load_plugin(plugin))
+
+        run_order = [e[0] for e in sorted(plugintools.PLUGIN_RUN_ORDER,
+                                          key=lambda e: e[1])]
+        self.assertEqual(run_order, plugintools.get_plugins_sorted())
+
+    def test_plugins_not_imported_at_startup(self):
+        """
+        Plugins and slow to import dependencies only needed by some of them
+        must not be imported until needed.
+        """
+        code = ('import sys, hotsos.cli; '
+                'print([m for m in sys.modules '
+                'if m.startswith("hotsos.plugin_extensions.") or '
+                'm.split(".")[0] in ["cryptography", "pytz", "dateutil"]])')
+        out = subprocess.run([sys.executable, '-c', code],
+                             capture_output=True, check=True, text=True)
+        self.assertEqual(out.stdout.strip(), '[]')
+
+    def test_part_output_manager(self):
+        mgr = plugintools.PartOutputManager()
+        mgr.save({'services': {'foo': 1}}, index=2)
+        mgr.save({'failed-parts': ['a']}, index=0)
+        mgr.save({'services': {'bar': 2}}, index=1)
+        mgr.save({'info': 'x'}, index=1)
+        expected = {HotSOSConfig.plugin_name:
+                    {'failed-parts': ['a'],
+                     'services': {'bar': 2, 'foo': 1},
+                     'info': 'x'}}
+        self.assertEqual(mgr.all(), expected)
+        self.assertEqual(list(mgr.all()[HotSOSConfig.plugin_name]),
+                         ['failed-parts', 'services', 'info'])
+        # aggregation must not modify saved output
+        self.assertEqual(mgr.all(), expected)
+
 
 class TestOutputManagerLogile(utils.BaseTestCase):
     """
@@ -340,3 +385,107 @@ class TestOutputManagerLogile(utils.BaseTestCase):
 
             # Will have been deleted by compress()
             self.assertFalse(os.path.exists(ftmp.name))
+
+
+class TestHotSOSClient(utils.BaseTestCase):
+    """
+    Tests for HotSOSClient plugin execution.
+    """
+
+    def test_run_plugin_workers(self):
+        plugins = ['hotsos', 'juju', 'kernel']
+        client = HotSOSClient(plugins)
+        client.run()
+        expected = client.summary.get_builder().to(fmt='yaml')
+        self.assertEqual(list(client.summary.get_builder().content),
+                         plugins)
+
+        HotSOSConfig.plugin_workers = 3
+        client = HotSOSClient(plugins)
+        client.run()
+        self.assertEqual(client.summary.get_builder().to(fmt='yaml'),
+                         expected)
+
+    def test_run_plugin_workers_plugin_failed(self):
+        plugins = ['hotsos', 'juju', 'kernel']
+        client = HotSOSClient(plugins)
+        client.run()
+        expected = client.summary.get_builder().content
+        run = plugintools.PluginRunner.run
+
+        def fake_run(runner, *args, **kwargs):
+            if runner.plugin == 'juju':
+                raise RuntimeError('juju failed')
+
+            return run(runner, *args, **kwargs)
+
+        HotSOSConfig.plugin_workers = 3
+        with mock.patch.object(plugintools.PluginRunner, 'run', fake_run):
+            client = HotSOSClient(plugins)
+            client.run()
+
+        content = client.summary.get_builder().content
+        self.assertEqual(list(content), plugins)
+        self.assertEqual(content['juju'],
+                         {'failed-parts': [p['runner'].__name__ for p in
+                                           plugintools.PLUGINS['juju']]})
+        for plugin in ['hotsos', 'kernel']:
+            self.assertEqual(content[plugin], expected[plugin])
+
+    def test_run_fleet(self):
+        plugins = ['hotsos', 'juju']
+        client = HotSOSClient(plugins)
+        client.run()
+        expected = client.summary.get_builder().content
+
+        data_root = HotSOSConfig.data_root
+        invalid = os.path.join(self.global_tmp_dir, 'notasosreport')
+        with open(invalid, 'w', encoding='utf-8') as fd:
+            fd.write('foo')
+
+        for workers in [1, 2]:
+            client = HotSOSFleetClient([data_root, invalid, data_root],
+                                       plugins, workers=workers)
+            client.run()
+            self.assertEqual(HotSOSConfig.data_root, data_root)
+            name = os.path.basename(data_root.rstrip('/'))
+            self.assertEqual(list(client.results),
+                             [name, 'notasosreport', f'{name}-2'])
+            self.assertEqual(client.results[name]['summary'], expected)
+            self.assertEqual(client.results[f'{name}-2']['summary'],
+                             expected)
+            index = client.index
+            self.assertEqual(index[name],
+                             {'data-root': data_root,
+                              **OutputBuilder(expected).minimal(
+                                  'very-short').content})
+            self.assertEqual(index['notasosreport'],
+                             {'data-root': invalid,
+                              'error': f"invalid data root '{invalid}'"})
+
+        with tempfile.TemporaryDirectory() as dtmp:
+            self.assertEqual(client.save(output_path=dtmp), dtmp)
+            with open(os.path.join(dtmp, 'hotsos-index.json'),
+                      encoding='utf-8') as fd:
+                self.assertEqual(json.load(fd), index)
+
+            self.assertTrue(os.path.exists(
+                os.path.join(dtmp, f'{name}-2.summary.yaml')))
+            self.assertFalse(os.path.exists(
+                os.path.join(dtmp, 'notasosreport.summary.yaml')))
+
+    @mock.patch.dict(os.environ, {'HOTSOS_DISABLE_AFFINITY': 'False'})
+    def test_run_fleet_path_affinity(self):
+        """
+        Path affinity saved while analysing one data root must not be used
+        for the next one analysed by the same worker.
+        """
+        data_roots = utils.create_path_affinity_data_roots(
+                         self.global_tmp_dir)
+        client = HotSOSFleetClient(list(data_roots.values()), ['openvswitch'])
+        client.run()
+        for layout in data_roots:
+            summary = client.results[layout]['summary']
+            checks = summary['openvswitch']['ovs-checks']
+            self.assertEqual(checks['errors-and-warnings'],
+                             {'ovs-vswitchd': {'ERR': {'2022-02-10': 1}}})
@@ -0,0 +1,108 @@
+import multiprocessing
+import os
+import subprocess
+
+from hotsos.client import HotSOSClient
+from hotsos.core.config import HotSOSConfig
+from hotsos.core.profiling import (
+    GLOBAL_PROFILE_KEY,
+    PROFILE_METRICS,
+    Profiler,
+)
+
+from . import utils
+
+
+class TestProfiler(utils.BaseTestCase):
+    """ Unit tests for the profiler. """
+
+    def test_disabled(self):
+        profiler = Profiler()
+        with profiler.profile('part', 'apart'):
+            pass
+
+        self.assertEqual(profiler.records, [])
+        self.assertEqual(profiler.summary(), {})
+
+    def test_profile(self):
+        HotSOSConfig.profile = True
+        HotSOSConfig.plugin_name = 'testplugin'
+        profiler = Profiler()
+        with profiler.profile('plugin', 'testplugin'):
+            for _ in range(2):
+                with profiler.profile('part', 'apart'):
+                    subprocess.run(['true'], check=True)
+
+        self.assertEqual(len(profiler.records), 3)
+        summary = profiler.summary()
+        self.assertEqual(list(summary), ['testplugin'])
+        self.assertEqual(list(summary['testplugin']), ['total', 'parts'])
+        self.assertEqual(list(summary['testplugin']['total']),
+                         PROFILE_METRICS)
+        self.assertEqual(summary['testplugin']['total']['subprocesses'], 2)
+        self.assertEqual(
+            summary['testplugin']['parts']['apart']['subprocesses'], 2)
+
+        events = profiler.trace()['traceEvents']
+        self.assertEqual([e['name'] for e in events],
+                         ['testplugin.apart', 'testplugin.apart',
+                          'testplugin'])
+        self.assertEqual([e['cat'] for e in events],
+                         ['part', 'part', 'plugin'])
+        self.assertEqual(min(e['ts'] for e in events), 0)
+        self.assertEqual(events[0]['args']['subprocesses'], 1)
+
+    @staticmethod
+    def _read_file(path, done, release):
+        with open(path, 'rb') as fd:
+            fd.read()
+
+        done.set()
+        release.wait()
+
+    def test_bytes_read_subprocesses(self):
+        """ Bytes read by subprocesses are counted whether or not they have
+        exited by the end of the profile. """
+        HotSOSConfig.profile = True
+        path = os.path.join(self.global_tmp_dir, 'afile')
+        size = 1024 ** 2
+        with open(path, 'wb') as fd:
+            fd.write(b'x' * size)
+
+        profiler = Profiler()
+        ctxt = multiprocessing.get_context('fork')
+        for wait in [True, False]:
+            done = ctxt.Event()
+            release = ctxt.Event()
+            if wait:
+                release.set()
+
+            proc = ctxt.Process(target=self._read_file,
+                                args=(path, done, release))
+            with profiler.profile('part', 'apart'):
+                proc.start()
+                done.wait()
+                if wait:
+                    proc.join()
+
+            release.set()
+            proc.join()
+            self.assertGreaterEqual(profiler.records[-1]['bytes-read'], size)
+
+    def test_client_profile(self):
+        HotSOSConfig.profile = True
+        for workers in [1, 2]:
+            HotSOSConfig.plugin_workers = workers
+            client = HotSOSClient(['hotsos', 'openstack'])
+            client.run()
+            profile = client.summary.get_builder().content['profile']
+            self.assertEqual(list(profile),
+                             [GLOBAL_PROFILE_KEY, 'hotsos', 'openstack'])
+            self.assertEqual(list(profile[GLOBAL_PROFILE_KEY]), ['search'])
+            self.assertGreater(
+                profile[GLOBAL_PROFILE_KEY]['search']['bytes-read'], 0)
+            self.assertEqual(list(profile['hotsos']),
+                             ['total', 'preloaders', 'parts'])
+            self.assertIn('scenarios', profile['openstack'])
+            self.assertIn('events', profile['openstack'])
+            self.assertIn('OpenStackSummary', profile['openstack']['parts'])
@@ -6,6 +6,8 @@ from unittest import mock
 
 import hotsos.core.root_manager
 from hotsos.core.config import HotSOSConfig
+from hotsos.core.host_helpers.common import KERNLOG_JOURNAL_PATH
+from hotsos.core.plugins.kernel.kernlog.common import KernLogSource
 
 from . import utils
 
@@ -24,10 +26,10 @@ class TestRootManager(utils.BaseTestCase):
         super().tearDown()
 
     @staticmethod
-    def create_sosreport(sospath):
+    def create_sosreport(sospath, archive=None):
         os.makedirs(os.path.join(sospath, 'sos_commands'))
         tarroot = os.path.basename(sospath)
-        with tarfile.open(sospath + '.xz', 'w:xz') as tar:
+        with tarfile.open(archive or sospath + '.xz', 'w:xz') as tar:
             tar.add(name=sospath, arcname=tarroot)
 
     def test_sos_data_root(self):
@@ -76,3 +78,122 @@ class TestRootManager(utils.BaseTestCase):
         os.makedirs(path)
         drm = hotsos.core.root_manager.DataRootManager(path)
         self.assertEqual(drm.basename, 'bar')
+
+    def test_find_data_roots(self):
+        archive = os.path.join(self.tmpdir, 'sosreport-host-2024.tar.xz')
+        self.create_sosreport(os.path.join(self.tmpdir, 'othersos'),
+                              archive=archive)
+        os.makedirs(os.path.join(self.tmpdir, 'notsos'))
+        with open(os.path.join(self.tmpdir, 'notes.txt'), 'w',
+                  encoding='utf-8') as fd:
+            fd.write('foo')
+
+        # must not be opened
+        os.mkfifo(os.path.join(self.tmpdir, 'sosreport-fifo.tar.xz'))
+        with mock.patch.object(hotsos.core.root_manager.tarfile,
+                               'is_tarfile',
+                               side_effect=tarfile.is_tarfile) as \
+                mock_is_tarfile:
+            find_data_roots = hotsos.core.root_manager.find_data_roots
+            # tarballs not named like a sosreport (mysos.xz) are ignored
+            expected = [os.path.join(self.tmpdir, name)
+                        for name in ['mysos', 'othersos',
+                                     'sosreport-host-2024.tar.xz']]
+            self.assertEqual(find_data_roots([self.tmpdir]), expected)
+            mock_is_tarfile.assert_called_once_with(archive)
+
+        # sosreports and anything else are returned as-is
+        self.assertEqual(find_data_roots([self.sospath_unpacked,
+                                          self.sospath_packed]),
+                         [self.sospath_unpacked, self.sospath_packed])
+        notsos = os.path.join(self.tmpdir, 'notsos')
+        self.assertEqual(find_data_roots([notsos]), [notsos])
+        self.assertEqual(find_data_roots([]), [])
+
+    def test_selective_extraction(self):
+        sospath = os.path.join(self.tmpdir, 'selectivesos')
+        files = {'etc/hostname': 'host1',
+                 'sos_commands/date/date': 'Thu Feb 10 16:19:17 UTC 2022',
+                 'sos_commands/foo/unused': 'unused',
+                 'sos_commands/foo/early': 'early',
+                 'sos_commands/foo/late': 'late',
+                 'sos_commands/foo/hard': 'hard'}
+        for path, content in files.items():
+            path = os.path.join(sospath, path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as fd:
+                fd.write(content)
+
+        # Members are added in sorted order so the target of aa is yet to be
+        # extracted when it is found whereas the targets of zz* have already
+        # been skipped.
+        os.symlink('sos_commands/foo/early', os.path.join(sospath, 'aa'))
+        os.symlink('sos_commands/foo/late', os.path.join(sospath, 'zz'))
+        os.link(os.path.join(sospath, 'sos_commands/foo/hard'),
+                os.path.join(sospath, 'zzhard'))
+        with tarfile.open(sospath + '.tar.gz', 'w:gz') as tar:
+            tar.add(name=sospath, arcname='selectivesos')
+
+        unpack_dir = os.path.join(self.tmpdir, 'unpack')
+        os.makedirs(unpack_dir)
+        HotSOSConfig.use_all_logs = False
+        with hotsos.core.root_manager.DataRootManager(
+                sospath + '.tar.gz', sos_unpack_dir=unpack_dir) as drm:
+            root = drm.data_root
+            self.assertEqual(root, os.path.join(unpack_dir, 'selectivesos'))
+            self.assertTrue(os.path.exists(root + '.partial'))
+            expected = {'etc/hostname': 'host1',
+                        'sos_commands/date/date': files['sos_commands/date/'
+                                                        'date'],
+                        'aa': 'early',
+                        'zz': 'late',
+                        'zzhard': 'hard'}
+            for path, content in expected.items():
+                with open(os.path.join(root, path), encoding='utf-8') as fd:
+                    self.assertEqual(fd.read(), content)
+
+            self.assertFalse(os.path.exists(
+                os.path.join(root, 'sos_commands/foo/unused')))
+
+        # full extraction completes the partial one
+        HotSOSConfig.force_mode = True
+        with hotsos.core.root_manager.DataRootManager(
+                sospath + '.tar.gz', sos_unpack_dir=unpack_dir) as drm:
+            root = drm.data_root
+            self.assertFalse(os.path.exists(root + '.partial'))
+            self.assertTrue(os.path.exists(
+                os.path.join(root, 'sos_commands/foo/unused')))
+
+    def test_selective_extraction_direct_readers(self):
+        """
+        Paths under sos_commands that are read directly rather than with the
+        command catalog must still be extracted.
+        """
+        sospath = os.path.join(self.tmpdir, 'kernlogsos')
+        journal = os.path.join(sospath, KERNLOG_JOURNAL_PATH)
+        os.makedirs(os.path.dirname(journal))
+        with open(journal, 'w', encoding='utf-8') as fd:
+            fd.write('Feb 10 16:19:17 host1 kernel: [    0.000000] foo\n')
+
+        smartctl = os.path.join(sospath, 'sos_commands/ata/smartctl_-a_sda')
+        os.makedirs(os.path.dirname(smartctl))
+        with open(smartctl, 'w', encoding='utf-8') as fd:
+            fd.write('SMART overall-health self-assessment test result: '
+                     'PASSED\n')
+
+        with tarfile.open(sospath + '.tar.gz', 'w:gz') as tar:
+            tar.add(name=sospath, arcname='kernlogsos')
+
+        shutil.rmtree(sospath)
+        HotSOSConfig.use_all_logs = False
+        with hotsos.core.root_manager.DataRootManager(
+                sospath + '.tar.gz',
+                sos_unpack_dir=os.path.join(self.tmpdir, 'unpack')) as drm:
+            root = drm.data_root
+            self.assertTrue(os.path.exists(root + '.partial'))
+            self.assertTrue(os.path.exists(
+                os.path.join(root, 'sos_commands/ata/smartctl_-a_sda')))
+            HotSOSConfig.data_root = root
+            with KernLogSource() as kernlog:
+                self.assertEqual(kernlog.path,
+                                 os.path.join(root, KERNLOG_JOURNAL_PATH))
@@ -0,0 +1,77 @@
+import os
+
+from hotsos.core.config import HotSOSConfig
+from hotsos.core.search import (
+    FileSearcher,
+    PrefilteredHint,
+    SearchDef,
+    SearchPrefilter,
+    SequenceSearchDef,
+)
+
+from . import utils
+
+LOG = """2021-07-19 09:01:58 INFO starting foo
+2021-07-19 09:01:59 ERROR something broke
+2021-07-19 09:02:00 INFO nothing to see
+2021-07-19 09:02:01 WARNING disk nearly full
+2021-07-19 09:02:02 INFO finished foo
+"""
+
+
+class TestSearchPrefilter(utils.BaseTestCase):
+    """ Unit tests for the combined search prefilter. """
+
+    def test_hit(self):
+        prefilter = SearchPrefilter([SearchDef('.+', hint='ERROR').hint,
+                                     SearchDef('.+', hint='WARN').hint])
+        self.assertTrue(prefilter.hit('an ERROR line'))
+        self.assertTrue(prefilter.hit('a WARNING line'))
+        self.assertFalse(prefilter.hit('an INFO line'))
+
+    def test_hit_memoised(self):
+        prefilter = SearchPrefilter([SearchDef('.+', hint='ERROR').hint])
+        line = 'an ERROR line'
+        self.assertTrue(prefilter.hit(line))
+        prefilter.pattern = None
+        self.assertTrue(prefilter.hit(line))
+
+    @utils.create_data_root({'atestfile': LOG, 'otherfile': LOG})
+    def test_searcher_results(self):
+        fname = os.path.join(HotSOSConfig.data_root, 'atestfile')
+        other = os.path.join(HotSOSConfig.data_root, 'otherfile')
+        s = FileSearcher()
+        s.add(SearchDef(r'\S+ \S+ ERROR (.+)', hint='ERROR', tag='error'),
+              path=fname)
+        s.add(SearchDef(r'\S+ \S+ WARNING (.+)', hint='WARNING',
+                        tag='warning'), path=fname)
+        s.add(SearchDef(r'\S+ \S+ INFO (.+)', hint='INFO', tag='info'),
+              path=other)
+        s.add(SearchDef(r'.+ (nothing) .+', tag='nohint'), path=fname)
+        seq = SequenceSearchDef(start=SearchDef(r'.+ (starting) foo',
+                                                hint='starting'),
+                                end=SearchDef(r'.+ (finished) foo',
+                                              hint='finished'),
+                                tag='seq')
+        s.add(seq, path=fname)
+        results = s.run()
+        hint = s.catalog.resolve_from_tag('error')[0].hint
+        self.assertIsInstance(hint, PrefilteredHint)
+        self.assertIsInstance(seq.s_start.hint, PrefilteredHint)
+        # only searches registered against the same files are combined
+        info = s.catalog.resolve_from_tag('info')[0]
+        self.assertNotIsInstance(info.hint, PrefilteredHint)
+
+        self.assertEqual([r.get(1) for r in results.find_by_tag('error')],
+                         ['something broke'])
+        self.assertEqual([r.get(1) for r in results.find_by_tag('warning')],
+                         ['disk nearly full'])
+        self.assertEqual([r.get(1) for r in results.find_by_tag('nohint')],
+                         ['nothing'])
+        self.assertEqual(len(results.find_by_tag('info')), 3)
+        sections = results.find_sequence_sections(seq)
+        self.assertEqual(len(sections), 1)
+
+        # running again must not stack prefilters
+        s.run()
+        self.assertIsInstance(hint.hint, type(hint.prefilter.pattern))
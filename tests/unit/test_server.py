@@ -0,0 +1,126 @@
+import json
+import os
+import signal
+import tempfile
+import threading
+from concurrent.futures.process import BrokenProcessPool
+from unittest import mock
+
+from hotsos.core.config import HotSOSConfig
+from hotsos.server import HotSOSServer, send_request
+
+from . import utils
+
+# It is fine for a test to access a protected member so allow it for all tests
+# pylint: disable=protected-access
+
+
+class TestHotSOSServer(utils.BaseTestCase):
+    """ Unit tests for HotSOS server. """
+
+    def setUp(self):
+        super().setUp()
+        self._start_server()
+
+    def tearDown(self):
+        self._stop_server()
+        super().tearDown()
+
+    def _start_server(self):
+        self.socket_path = os.path.join(
+            tempfile.mkdtemp(dir=self.global_tmp_dir), 'hotsos.sock')
+        self.server = HotSOSServer(self.socket_path, workers=1)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+
+    def _stop_server(self):
+        self.server.shutdown()
+        self.thread.join()
+        self.server.server_close()
+
+    def test_socket_permissions(self):
+        self.assertEqual(os.stat(self.socket_path).st_mode & 0o777, 0o700)
+
+    def test_already_listening(self):
+        with self.assertRaises(FileExistsError):
+            HotSOSServer(self.socket_path)
+
+    def test_invalid_requests(self):
+        for request, error in [
+                (['foo'], "request must be a json object"),
+                ({'foo': 1}, "invalid request keys: foo"),
+                ({'data_root': '/doesnotexist'},
+                 "data_root '/doesnotexist' not found"),
+                ({'data_root': HotSOSConfig.data_root,
+                  'plugins': ['doesnotexist']},
+                 "unknown plugins: doesnotexist"),
+                ({'data_root': HotSOSConfig.data_root, 'format': 'foo'},
+                 "unsupported format 'foo'")]:
+            response = send_request(self.socket_path, request, timeout=10)
+            self.assertEqual(response, {'error': error})
+
+    def _request(self, **kwargs):
+        request = {'data_root': HotSOSConfig.data_root, 'format': 'json'}
+        request.update(kwargs)
+        response = send_request(self.socket_path, request, timeout=300)
+        self.assertNotIn('error', response)
+        return json.loads(response['output'])
+
+    def test_request(self):
+        summary = self._request(plugins=['hotsos'])
+        self.assertEqual(sorted(summary), ['hotsos', 'system'])
+
+    def test_requests_reuse_worker(self):
+        """
+        Consecutive requests run by the same worker must not see each
+        other's plugins or filters.
+        """
+        summary = self._request(plugins=['juju'], scenario='doesnotexist',
+                                event='doesnotexist', minimal='very-short')
+        self.assertNotIn('juju', summary.get('bugs-detected', {}))
+        summary = self._request(plugins=['juju'], minimal='very-short')
+        self.assertIn('juju', summary['bugs-detected'])
+        summary = self._request(plugins=['hotsos'])
+        self.assertEqual(sorted(summary), ['hotsos', 'system'])
+
+    @mock.patch.dict(os.environ, {'HOTSOS_DISABLE_AFFINITY': 'False'})
+    def test_requests_reuse_worker_path_affinity(self):
+        """
+        Path affinity saved while running one request must not be used by
+        the next request run by the same worker.
+        """
+        # workers must be forked with affinity enabled
+        self._stop_server()
+        self._start_server()
+        data_roots = utils.create_path_affinity_data_roots(
+                         self.global_tmp_dir)
+        for data_root in data_roots.values():
+            summary = self._request(data_root=data_root,
+                                    plugins=['openvswitch'])
+            checks = summary['openvswitch']['ovs-checks']
+            self.assertEqual(checks['errors-and-warnings'],
+                             {'ovs-vswitchd': {'ERR': {'2022-02-10': 1}}})
+
+    def test_worker_died(self):
+        start_executor = self.server._start_executor
+        threads = []
+
+        def fake_start_executor():
+            threads.append(threading.current_thread())
+            return start_executor()
+
+        # wait for the server to be ready
+        send_request(self.socket_path, ['foo'], timeout=300)
+        with mock.patch.object(self.server, '_start_executor',
+                               fake_start_executor):
+            with self.server.busy():
+                pid = self.server._submit(os.getpid)
+                with self.assertRaises(BrokenProcessPool):
+                    self.server._submit(os.kill, pid, signal.SIGKILL)
+
+                self.assertNotEqual(self.server._submit(os.getpid), pid)
+
+        # the pool must only be forked by the thread running serve_forever
+        self.assertEqual(threads, [self.thread])
+        summary = self._request(plugins=['hotsos'])
+        self.assertEqual(sorted(summary), ['hotsos', 'system'])
@@ -1,3 +1,6 @@
+import io
+import json
+
 from hotsos.core import utils as core_utils
 
 from . import utils
@@ -61,3 +64,22 @@ class TestUtils(utils.BaseTestCase):
                          melange, reverse=False),
                          ['0.0k', '1', '0.002k', 3, '22k', '111k', '3g',
                           '12P'])
+
+    def test_json_stream_reader_iter_array(self):
+        items = [{'a': [1, 2.5e-3, None]}, -123456789, 'x"y', True, []]
+        doc = {'skip': {'b': [1, {'c': 'd'}]},
+               'outer': {'n': 100, 'inner': items, 'after': 1}}
+        contents = json.dumps(doc, indent=2) + '\ndumped all\n'
+        for chunk_size in [1, 3, 1024]:
+            reader = core_utils.JSONStreamReader(io.StringIO(contents),
+                                                 chunk_size=chunk_size)
+            self.assertEqual(list(reader.iter_array(['outer', 'inner'])),
+                             items)
+
+    def test_json_stream_reader_iter_array_invalid(self):
+        for contents in ['', '[]', '{"outer": {}}', '{"outer": [1, 2]}',
+                         '{"outer": {"inner": [1, }}', '{"outer": [1']:
+            reader = core_utils.JSONStreamReader(io.StringIO(contents),
+                                                 chunk_size=2)
+            with self.assertRaises(ValueError):
+                list(reader.iter_array(['outer', 'inner']))
@@ -9,7 +9,9 @@ from unittest import mock
 from dataclasses import dataclass, field
 
 import yaml
+from hotsos.core.cache import reset_persistent_cache
 from hotsos.core.config import HotSOSConfig
+from hotsos.core.host_helpers.systemd import SYSTEMD_UNIT_INDEX_CACHE
 from hotsos.core.issues import IssuesManager
 # disable for stestr otherwise output is much too verbose
 from hotsos.core.log import log, logging, LoggingManager
@@ -453,6 +455,35 @@ def create_data_root(files_to_create, copy_from_original=None):
     return create_files_inner1
 
 
+def create_path_affinity_data_roots(parent):
+    """
+    Create two data roots that each have the same ovs-vswitchd log, one where
+    it is installed from a snap and the other from a deb package. Used to
+    test that PathFinder affinity does not leak between data roots.
+
+    @param parent: directory in which to create the data roots.
+    @return: dict of layout name and data root path.
+    """
+    logdirs = {'snap': 'var/snap/openstack-hypervisor/common/log',
+               'deb': 'var/log'}
+    data_roots = {}
+    for layout, logdir in logdirs.items():
+        data_root = os.path.join(parent, layout)
+        for path in ['sos_commands/date/date', 'sos_commands/dpkg/dpkg_-l']:
+            dst = os.path.join(data_root, path)
+            os.makedirs(os.path.dirname(dst))
+            shutil.copy(os.path.join(HotSOSConfig.data_root, path), dst)
+
+        path = os.path.join(data_root, logdir, 'openvswitch/ovs-vswitchd.log')
+        os.makedirs(os.path.dirname(path))
+        with open(path, 'w', encoding='utf-8') as fd:
+            fd.write('2022-02-10T00:00:00.000Z|00001|foo|ERR|bar\n')
+
+        data_roots[layout] = data_root
+
+    return data_roots
+
+
 def global_search_context(f):
     def global_search_context_inner(inst, *args, **kwargs):
         with GlobalSearcher() as searcher:
@@ -541,6 +572,9 @@ class BaseTestCase(unittest.TestCase):
 
     def tearDown(self):
         LoggingManager().stop()
+        # The unit index includes journal info that tests typically mock.
+        SYSTEMD_UNIT_INDEX_CACHE.clear()
+        reset_persistent_cache()
         HotSOSConfig.reset()
         HotSOSConfig.set(**self.hotsos_config)
         shutil.rmtree(self.global_tmp_dir)
@@ -1,4 +1,18 @@
-from hotsos.core.ycheck.common import GlobalSearcherPreloaderBase
+import os
+import tempfile
+from unittest import mock
+
+from hotsos.core.config import HotSOSConfig
+from hotsos.core.search import SearchDef
+from hotsos.core.ycheck.common import (
+    GlobalSearcher,
+    GlobalSearcherPreloaderBase,
+    SearchRegistryError,
+)
+from hotsos.core.ycheck.engine.common import (
+    YDefsCache,
+    YDefsLoader,
+)
 
 from .. import utils
 
@@ -20,3 +34,84 @@ class TestYcheckCommon(utils.BaseTestCase):
         pf = 'a.b.*'
         p = 'a.b.c'
         self.assertFalse(GlobalSearcherPreloaderBase.skip_filtered(pf, p))
+
+    def test_global_searcher_labels_scoped_by_plugin(self):
+        with GlobalSearcher() as searcher:
+            HotSOSConfig.plugin_name = 'plugin-a'
+            searcher.set_loaded('MyPreloader')
+            self.assertTrue(searcher.is_loaded('MyPreloader'))
+            with self.assertRaises(SearchRegistryError):
+                searcher.set_loaded('MyPreloader')
+
+            HotSOSConfig.plugin_name = 'plugin-b'
+            self.assertFalse(searcher.is_loaded('MyPreloader'))
+            searcher.set_loaded('MyPreloader')
+            self.assertTrue(searcher.is_loaded('MyPreloader'))
+
+    @utils.create_data_root({'a.log': 'foo 1\nbar 2\n',
+                             'b.log': 'bar 3\nfoo 4\n'})
+    def test_global_searcher_shared_by_plugins(self):
+        """ Searches from different plugins are run in a single pass. """
+        with GlobalSearcher() as searcher:
+            path_a = os.path.join(HotSOSConfig.data_root, 'a.log')
+            path_b = os.path.join(HotSOSConfig.data_root, 'b.log')
+            searcher.add_search(SearchDef(r'foo (\d+)', tag='plugin-a.foo'),
+                                None, False, [path_a, path_b])
+            searcher.add_search(SearchDef(r'bar (\d+)', tag='plugin-b.bar'),
+                                None, False, [path_a, path_b])
+            searcher.register_plugin_searches('plugin-a')
+            searcher.register_plugin_searches('plugin-b')
+            results = searcher.results
+            self.assertEqual(sorted(r.get(1) for r in
+                                    results.find_by_tag('plugin-a.foo')),
+                             ['1', '4'])
+            self.assertEqual(sorted(r.get(1) for r in
+                                    results.find_by_tag('plugin-b.bar')),
+                             ['2', '3'])
+            self.assertEqual(searcher.searcher.stats['jobs_completed'], 2)
+            with self.assertRaises(SearchRegistryError):
+                searcher.register_plugin_searches('plugin-c')
+
+    def test_ydefs_cache_bundle(self):
+        defs = tempfile.mkdtemp(dir=self.global_tmp_dir)
+        plugin_defs = os.path.join(defs, 'scenarios', 'myplugin')
+        os.makedirs(plugin_defs)
+        path = os.path.join(plugin_defs, 'foo.yaml')
+        with open(path, 'w', encoding='utf-8') as fd:
+            fd.write('checks: {a: 1}\n')
+
+        HotSOSConfig.plugin_yaml_defs = defs
+        HotSOSConfig.plugin_name = 'myplugin'
+        self.assertEqual(YDefsLoader('scenarios').plugin_defs,
+                         {'foo': {'checks': {'a': 1}}})
+        cache = YDefsCache(defs)
+        self.assertEqual(cache.bundle, {})
+        self.assertTrue(cache.save_bundle())
+        self.assertFalse(cache.save_bundle())
+
+        # yaml is not parsed when using a bundle
+        cache = YDefsCache(defs)
+        with mock.patch('hotsos.core.ycheck.engine.common.yaml') as m_yaml:
+            self.assertEqual(cache.load(path), {'checks': {'a': 1}})
+            self.assertFalse(m_yaml.safe_load.called)
+
+        # changes to defs invalidate the bundle
+        with open(path, 'w', encoding='utf-8') as fd:
+            fd.write('checks: {a: 2}\n')
+
+        cache = YDefsCache(defs)
+        self.assertEqual(cache.bundle, {})
+        self.assertEqual(cache.load(path), {'checks': {'a': 2}})
+
+    def test_ydefs_cache_bundle_untrusted(self):
+        defs = tempfile.mkdtemp(dir=self.global_tmp_dir)
+        with open(os.path.join(defs, 'foo.yaml'), 'w',
+                  encoding='utf-8') as fd:
+            fd.write('checks: {a: 1}\n')
+
+        cache = YDefsCache(defs)
+        self.assertTrue(cache.save_bundle())
+        self.assertNotEqual(YDefsCache(defs).bundle, {})
+        os.chmod(cache.bundle_path, 0o666)
+        with self.assertLogs(logger='hotsos', level='WARNING'):
+            self.assertEqual(YDefsCache(defs).bundle, {})
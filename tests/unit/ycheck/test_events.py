@@ -93,6 +93,19 @@ myplugin:
         hint: '.+'
 """  # noqa
 
+EVENT_DEF_REQUIRES = r"""
+myplugin:
+  myeventgroup:
+    input:
+      path: {path}
+    my-met-search:
+      expr: '^hello'
+    my-not-met-search:
+      requires:
+        apt: apackagethatdoesnotexist
+      expr: '^hello'
+"""  # noqa
+
 
 class TestYamlEventsPreLoad(utils.BaseTestCase):
     """
@@ -117,6 +130,22 @@ class TestYamlEventsPreLoad(utils.BaseTestCase):
             for path in e.input.paths:
                 self.assertEqual(os.path.basename(path), 'data.txt*')
 
+    @utils.create_data_root({'data.txt': 'hello\nbrave\nworld\n',
+                             'events/myplugin/mygroup.yaml':
+                             EVENT_DEF_REQUIRES.format(path='data.txt')})
+    @utils.global_search_context
+    def test_events_search_preload_requires(self, global_searcher):
+        HotSOSConfig.plugin_yaml_defs = HotSOSConfig.data_root
+        HotSOSConfig.plugin_name = 'myplugin'
+        spl = EventsSearchPreloader(global_searcher)
+        spl.run()
+        self.assertEqual([e.name for e in spl.events], ['my-met-search'])
+        tags = list(global_searcher)
+        self.assertEqual(len(tags), 1)
+        self.assertIn('my-met-search', tags[0])
+        path = 'myplugin.myeventgroup.my-not-met-search.requires'
+        self.assertFalse(global_searcher.get_requires_result(path))
+
 
 class TestYamlEvents(utils.BaseTestCase):
     """ Tests for yaml events """
@@ -10,7 +10,10 @@ import yaml
 from hotsos.core.config import HotSOSConfig
 from hotsos.core.host_helpers.config import IniConfigBase
 from hotsos.core.issues.utils import IssuesStore
-from hotsos.core.search import ExtraSearchConstraints
+from hotsos.core.search import (
+    ExtraSearchConstraints,
+    RegexLiteralAnalyser,
+)
 from hotsos.core.ycheck import scenarios
 from hotsos.core.ycheck.engine import (
     YDefsSection,
@@ -779,3 +782,27 @@ class TestYamlProperties(utils.BaseTestCase):
                 if test[0] == test[2]:
                     self.assertEqual(len(log.output), 1)
                     self.assertIn('attempted to apply', log.output[0])
+
+
+class TestRegexLiteralAnalyser(utils.BaseTestCase):
+    """ Unit tests for search hint derivation. """
+
+    def test_hint_literals(self):
+        for pattern, expected in [
+                (r'^foo bar$', ('foo bar',)),
+                (r'([\d-]+) ([\d:]+) .+ ERROR oslo', (' ERROR oslo',)),
+                (r'(ERROR|WARNING) (\S+)', ('ERROR', 'WARNING')),
+                (r'(?:abc){2}\s+', ('abcabc',)),
+                (r'xyz(?i:ABC)', ('xyz',)),
+                ([r'^foo (\S+)', r'^barbaz'], ('foo ', 'barbaz'))]:
+            self.assertEqual(RegexLiteralAnalyser(pattern).hint_literals,
+                             expected)
+
+    def test_no_hint(self):
+        for pattern in [r'(?i)error', r'a*b', r'(foo|ba)x', r'abc|',
+                        r'\S+', r'(', [r'^foo (\S+)', r'.+']]:
+            self.assertIsNone(RegexLiteralAnalyser(pattern).hint)
+
+    def test_hint_is_escaped(self):
+        hint = RegexLiteralAnalyser(r'(\S+) foo\.bar.baz').hint
+        self.assertEqual(hint, r'\ foo\.bar')
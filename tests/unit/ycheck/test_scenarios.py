@@ -69,6 +69,31 @@ class TestYamlScenariosPreLoad(utils.BaseTestCase):
             self.assertListEqual(check_names, ['listsearch1', 'listsearch2',
                                                'listsearch3'])
 
+    @utils.init_test_scenario(test_data.SCENARIO_W_REQUIRES.
+                              format(path='data.txt'))
+    @utils.create_data_root({'data.txt': 'hello\n'})
+    @utils.global_search_context
+    def test_scenario_search_preload_requires(self, global_searcher):
+        with mock.patch.object(TestProperty, 'always_false',
+                               new_callable=mock.PropertyMock) as mock_prop:
+            mock_prop.return_value = False
+            scenarios.ScenariosSearchPreloader(global_searcher).run()
+            tags = list(global_searcher)
+            self.assertTrue(any(t.endswith('.search_met.check.search')
+                                for t in tags))
+            self.assertFalse(any('search_not_met' in t for t in tags))
+            checker = scenarios.YScenarioChecker(global_searcher)
+            checker.load()
+            # requirement result is memoised by the preloader
+            self.assertEqual(mock_prop.call_count, 1)
+
+        self.assertEqual([s.name for s in checker.scenarios],
+                         ['scenario_met'])
+        checker.run(load=False)
+        issues = list(IssuesStore().load().values())[0]
+        self.assertEqual([i['message'] for i in issues],
+                         ['requirements met'])
+
 
 class TestYamlScenarios(utils.BaseTestCase):  # noqa, pylint: disable=too-many-public-methods
     """
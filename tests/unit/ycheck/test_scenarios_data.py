@@ -180,6 +180,38 @@ conclusions:
 """  # noqa
 
 
+SCENARIO_W_REQUIRES = r"""
+scenario_met:
+  requires:
+    property: tests.unit.ycheck.test_scenarios.TestProperty.always_true
+  input:
+    path: {path}
+  checks:
+    search_met:
+      expr: 'hello'
+  conclusions:
+    search_met_worked:
+      decision: search_met
+      raises:
+        type: SystemWarning
+        message: requirements met
+scenario_not_met:
+  requires:
+    property: tests.unit.ycheck.test_scenarios.TestProperty.always_false
+  input:
+    path: {path}
+  checks:
+    search_not_met:
+      expr: 'hello'
+  conclusions:
+    search_not_met_worked:
+      decision: search_not_met
+      raises:
+        type: SystemWarning
+        message: requirements not met
+"""  # noqa
+
+
 SCENARIO_W_ERROR = r"""
 scenarioA:
   checks:
@@ -0,0 +1,175 @@
+"""
+Generate synthetic data roots of configurable size for benchmarking.
+
+A synthetic data root is created by copying an existing (small) data root
+from the unit tests and then scaling up the contents of files known to affect
+performance. Existing content is reused (cycled) rather than invented so that
+the result still looks like a real sosreport to the plugins and checks.
+Generation is deterministic so that the same parameters always produce the
+same data root and results are comparable between runs.
+"""
+import glob
+import json
+import os
+import shutil
+from dataclasses import asdict, dataclass
+
+TESTS_DIR = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.dirname(os.path.abspath(__file__)))), 'tests', 'unit')
+DEFAULT_TEMPLATE = os.path.join(TESTS_DIR, 'fake_data_root', 'openstack')
+DEFAULT_CEPH_TEMPLATE = os.path.join(TESTS_DIR, 'fake_data_root', 'storage',
+                                     'ceph-mon')
+
+# Log files (relative to the data root) that are scaled to log_lines.
+LOG_GLOBS = ['var/log/kern.log',
+             'var/log/syslog',
+             'var/log/nova/*.log',
+             'var/log/neutron/*.log',
+             'var/log/openvswitch/*.log',
+             'var/log/ovn/*.log',
+             'var/log/ceph/*.log']
+DPKG_PATH = 'sos_commands/dpkg/dpkg_-l'
+PS_PATH = 'ps'
+CEPH_JSON_DIR = 'sos_commands/ceph_mon/json_output'
+CEPH_OSD_DUMP = 'ceph_osd_dump_--format_json-pretty'
+CEPH_OSD_TREES = ['ceph_osd_df_tree_--format_json-pretty',
+                  'ceph_osd_tree_--format_json-pretty']
+CEPH_OSD_DF = 'ceph_osd_df_--format_json-pretty'
+
+
+@dataclass(frozen=True)
+class SyntheticDataRootParams:
+    """ Size parameters for a synthetic data root. """
+    # lines per log file
+    log_lines: int = 100000
+    # number of ceph osds
+    osds: int = 100
+    # number of installed packages in addition to those in the template
+    packages: int = 5000
+    # number of processes in addition to those in the template
+    processes: int = 5000
+
+    def to_dict(self):
+        return asdict(self)
+
+
+class SyntheticDataRoot():
+    """ Generates a synthetic data root. """
+
+    def __init__(self, path, params, template=DEFAULT_TEMPLATE,
+                 ceph_template=DEFAULT_CEPH_TEMPLATE):
+        """
+        @param path: path at which to create the data root. Must not exist.
+        @param params: SyntheticDataRootParams object.
+        @param template: path to data root used as the basis for the new one.
+        @param ceph_template: path to data root from which ceph command
+                              output is taken.
+        """
+        self.path = path
+        self.params = params
+        self.template = template
+        self.ceph_template = ceph_template
+
+    @staticmethod
+    def _read_lines(path):
+        with open(path, encoding='utf-8', errors='backslashreplace') as fd:
+            return fd.readlines()
+
+    @staticmethod
+    def _write_lines(path, lines):
+        with open(path, 'w', encoding='utf-8') as fd:
+            fd.writelines(lines)
+
+    def _scale_logs(self):
+        for log_glob in LOG_GLOBS:
+            for path in sorted(glob.glob(os.path.join(self.path, log_glob))):
+                lines = self._read_lines(path)
+                if not lines:
+                    continue
+
+                num = self.params.log_lines
+                self._write_lines(path, [lines[i % len(lines)]
+                                         for i in range(num)])
+
+    def _scale_packages(self):
+        path = os.path.join(self.path, DPKG_PATH)
+        lines = self._read_lines(path)
+        for i in range(self.params.packages):
+            name = f'benchpkg-{i}'
+            version = f'1.0.{i}-0ubuntu1'
+            lines.append(f"ii  {name:<36} {version:<52} {'amd64':<12} "
+                         f"synthetic benchmark package {i}\n")
+
+        self._write_lines(path, lines)
+
+    def _scale_processes(self):
+        path = os.path.join(self.path, PS_PATH)
+        lines = self._read_lines(path)
+        procs = [line for line in lines[1:]
+                 if len(line.split()) > 10 and line.split()[1].isdigit()]
+        for i in range(self.params.processes):
+            fields = procs[i % len(procs)].split(None, 10)
+            fields[1] = str(1000000 + i)
+            lines.append(' '.join(fields))
+
+        self._write_lines(path, lines)
+
+    def _load_ceph_json(self, name):
+        with open(os.path.join(self.path, CEPH_JSON_DIR, name),
+                  encoding='utf-8') as fd:
+            return json.load(fd)
+
+    def _save_ceph_json(self, name, content):
+        with open(os.path.join(self.path, CEPH_JSON_DIR, name), 'w',
+                  encoding='utf-8') as fd:
+            json.dump(content, fd, indent=4)
+
+    def _scale_ceph(self):
+        src = os.path.join(self.ceph_template, CEPH_JSON_DIR)
+        dst = os.path.join(self.path, CEPH_JSON_DIR)
+        shutil.rmtree(dst, ignore_errors=True)
+        shutil.copytree(src, dst)
+        num = self.params.osds
+
+        dump = self._load_ceph_json(CEPH_OSD_DUMP)
+        for key in ['osds', 'osd_xinfo']:
+            osds = dump[key]
+            dump[key] = [dict(osds[i % len(osds)], osd=i) for i in range(num)]
+
+        for osd in dump['osds']:
+            osd['uuid'] = f"00000000-0000-0000-0000-{osd['osd']:012d}"
+
+        dump['max_osd'] = num
+        self._save_ceph_json(CEPH_OSD_DUMP, dump)
+
+        for name in CEPH_OSD_TREES:
+            tree = self._load_ceph_json(name)
+            osds = [n for n in tree['nodes'] if n['type'] == 'osd']
+            hosts = [n for n in tree['nodes'] if n['type'] == 'host']
+            nodes = [n for n in tree['nodes'] if n['type'] not in ('osd',
+                                                                   'host')]
+            for host in hosts:
+                host['children'] = []
+
+            for i in range(num):
+                host = hosts[i % len(hosts)]
+                host['children'].append(i)
+                nodes.append(dict(osds[i % len(osds)], id=i, name=f'osd.{i}'))
+
+            tree['nodes'] = nodes + hosts
+            self._save_ceph_json(name, tree)
+
+        df = self._load_ceph_json(CEPH_OSD_DF)
+        osds = df['nodes']
+        df['nodes'] = [dict(osds[i % len(osds)], id=i, name=f'osd.{i}')
+                       for i in range(num)]
+        self._save_ceph_json(CEPH_OSD_DF, df)
+
+    def generate(self):
+        """ Create the data root. Returns its path. """
+        shutil.copytree(self.template, self.path, symlinks=True)
+        self._scale_logs()
+        self._scale_packages()
+        self._scale_processes()
+        self._scale_ceph()
+        return self.path
@@ -0,0 +1,316 @@
+"""
+HotSOS benchmark harness.
+
+Runs a set of benchmark cases against a data root (a synthetic one is
+generated by default, see datagen.py) and outputs the results as json so that
+they can be saved and compared between runs e.g.
+
+    PYTHONPATH=. python3 tools/benchmark/hotbench.py --output before.json
+    <make changes>
+    PYTHONPATH=. python3 tools/benchmark/hotbench.py --compare before.json
+
+Every repetition of every case is run in a freshly forked process so that
+cases do not benefit from state left behind by earlier ones and so that the
+peak RSS recorded is that of the case alone (plus the harness itself which is
+the same for all cases).
+"""
+import argparse
+import concurrent.futures
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+from hotsos.client import HotSOSClient
+from hotsos.core import plugintools
+from hotsos.core.config import HotSOSConfig
+from hotsos.core.host_helpers import APTPackageHelper
+from hotsos.core.log import log
+from hotsos.core.plugins.storage.ceph.cluster import CephCluster
+from hotsos.core.ycheck.common import GlobalSearcher
+from hotsos.core.ycheck.engine.common import get_ydefs_cache
+from hotsos.core.ycheck.scenarios import YScenarioChecker
+from tools.benchmark.datagen import SyntheticDataRoot, SyntheticDataRootParams
+
+HOTSOS_ROOT = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.dirname(os.path.abspath(__file__)))), 'hotsos')
+# Methods whose cumulative time is recorded for every case.
+INSTRUMENTED = {'GlobalSearcher.run': (GlobalSearcher, 'run'),
+                'YScenarioChecker.run': (YScenarioChecker, 'run')}
+
+
+@contextmanager
+def instrument(timings):
+    """
+    Record the cumulative wall time spent in INSTRUMENTED methods.
+
+    @param timings: dict to which timings are added.
+    """
+    originals = {}
+
+    def wrap(name, func):
+        def _wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                timings[name] = (timings.get(name, 0) +
+                                 time.perf_counter() - start)
+
+        return _wrapper
+
+    for name, (cls, attr) in INSTRUMENTED.items():
+        originals[name] = getattr(cls, attr)
+        setattr(cls, attr, wrap(name, originals[name]))
+
+    try:
+        yield
+    finally:
+        for name, (cls, attr) in INSTRUMENTED.items():
+            setattr(cls, attr, originals[name])
+
+
+def run_client(plugins=None):
+    HotSOSClient(plugins).run()
+
+
+def run_apt_package_helper():
+    apt = APTPackageHelper(core_pkgs=['nova', 'neutron', 'openvswitch',
+                                      'ceph', 'benchpkg'])
+    _ = apt.all
+    _ = apt.is_installed('not-installed', allow_full_search=True)
+
+
+def run_ceph_cluster():
+    cluster = CephCluster()
+    for attr in ['osds', 'health_status', 'osd_df_tree', 'osds_pgs',
+                 'laggy_pgs', 'large_omap_pgs',
+                 'pools_with_size_equal_min_size', 'ceph_versions_aligned']:
+        getattr(cluster, attr)
+
+    _ = cluster.crush_map.crushmap_equal_buckets
+
+
+def _run_case(func, args):
+    """ Run a benchmark case. This is run in a forked process. """
+    timings = {}
+    usage_start = (resource.getrusage(resource.RUSAGE_SELF),
+                   resource.getrusage(resource.RUSAGE_CHILDREN))
+    HotSOSClient.setup_global_env()
+    HotSOSClient.setup_plugin_env('hotbench')
+    try:
+        with instrument(timings):
+            start = time.perf_counter()
+            func(*args)
+            wall = time.perf_counter() - start
+    finally:
+        HotSOSClient.teardown_global_env()
+
+    usage_end = (resource.getrusage(resource.RUSAGE_SELF),
+                 resource.getrusage(resource.RUSAGE_CHILDREN))
+    cpu = sum(end.ru_utime + end.ru_stime - start.ru_utime - start.ru_stime
+              for start, end in zip(usage_start, usage_end))
+    return {'wall': wall,
+            'cpu': cpu,
+            # ru_maxrss is in kilobytes on Linux
+            'peak-rss-kb': usage_end[0].ru_maxrss,
+            'peak-rss-children-kb': usage_end[1].ru_maxrss,
+            'breakdown': timings}
+
+
+def run_case(func, args=()):
+    """ Run a benchmark case in a forked process and return its results. """
+    with concurrent.futures.ProcessPoolExecutor(
+            max_workers=1,
+            mp_context=multiprocessing.get_context('fork')) as exe:
+        return exe.submit(_run_case, func, args).result()
+
+
+def summarise(runs):
+    """ Aggregate the results of all repetitions of a case. """
+    summary = {}
+    for key in ['wall', 'cpu']:
+        values = [run[key] for run in runs]
+        summary[key] = {'min': min(values),
+                        'median': statistics.median(values),
+                        'runs': values}
+
+    for key in ['peak-rss-kb', 'peak-rss-children-kb']:
+        summary[key] = max(run[key] for run in runs)
+
+    breakdown = {}
+    for name in sorted({name for run in runs for name in run['breakdown']}):
+        breakdown[name] = statistics.median(run['breakdown'].get(name, 0)
+                                            for run in runs)
+
+    summary['breakdown-median'] = breakdown
+    return summary
+
+
+def get_cases(plugins, names=None):
+    """
+    Return dict of benchmark cases keyed by name.
+
+    @param plugins: list of plugins to benchmark. Default is all.
+    @param names: optional list of case names to return. Default is all.
+    @raises ValueError: if any name is not a valid case.
+    """
+    cases = {'client.all': (run_client, (plugins or None,))}
+    for plugin in plugins or plugintools.get_plugins_sorted():
+        cases[f'client.plugin.{plugin}'] = (run_client, ([plugin],))
+
+    cases['helper.APTPackageHelper'] = (run_apt_package_helper, ())
+    cases['helper.CephCluster'] = (run_ceph_cluster, ())
+    if not names:
+        return cases
+
+    unknown = [name for name in names if name not in cases]
+    if unknown:
+        raise ValueError(f"unknown cases: {', '.join(unknown)} (valid cases "
+                         f"are: {', '.join(cases)})")
+
+    return {name: cases[name] for name in names}
+
+
+def get_repo_info():
+    try:
+        out = subprocess.check_output(['git', '-C', HOTSOS_ROOT, 'rev-parse',
+                                       '--short', 'HEAD'],
+                                      stderr=subprocess.DEVNULL)
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+    return out.decode().strip()
+
+
+def compare(results, baseline):
+    """ Print the median wall time of each case relative to a baseline. """
+    for name, result in results['results'].items():
+        base = baseline['results'].get(name)
+        if base is None:
+            continue
+
+        before = base['wall']['median']
+        after = result['wall']['median']
+        ratio = after / before if before else 0
+        sys.stderr.write(f"{name:<40} {before:>9.3f}s {after:>9.3f}s "
+                         f"{ratio:>6.2f}x\n")
+
+
+def parse_args():
+    defaults = SyntheticDataRootParams()
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1],
+                                     formatter_class=argparse.
+                                     RawDescriptionHelpFormatter)
+    parser.add_argument('--data-root',
+                        help=('Existing data root to use. If not provided '
+                              'a synthetic one is generated.'))
+    parser.add_argument('--keep-data-root',
+                        help=('Generate the synthetic data root at this '
+                              'path and do not delete it. If it already '
+                              'exists it is reused.'))
+    parser.add_argument('--log-lines', type=int, default=defaults.log_lines,
+                        help='Number of lines in each synthetic log file.')
+    parser.add_argument('--osds', type=int, default=defaults.osds,
+                        help='Number of synthetic ceph osds.')
+    parser.add_argument('--packages', type=int, default=defaults.packages,
+                        help='Number of synthetic installed packages.')
+    parser.add_argument('--processes', type=int, default=defaults.processes,
+                        help='Number of synthetic processes.')
+    parser.add_argument('--plugins', default='',
+                        help='Comma-separated list of plugins to benchmark. '
+                             'Default is all.')
+    parser.add_argument('--cases', default='',
+                        help='Comma-separated list of cases to run. Default '
+                             'is all.')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Number of times each case is run.')
+    parser.add_argument('--max-parallel-tasks', type=int, default=8,
+                        help='See hotsos --max-parallel-tasks.')
+    parser.add_argument('--output', help='Save results to this path.')
+    parser.add_argument('--compare',
+                        help='Path to results of a previous run to compare '
+                             'against.')
+    args = parser.parse_args()
+    plugins = [p for p in args.plugins.split(',') if p]
+    unknown = [p for p in plugins if p not in plugintools.get_plugins_sorted()]
+    if unknown:
+        parser.error(f"unknown plugins: {', '.join(unknown)}")
+
+    try:
+        cases = get_cases(plugins, [c for c in args.cases.split(',') if c])
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    return args, cases
+
+
+def benchmark(args, cases, data_root, params):
+    HotSOSConfig.set(data_root=data_root,
+                     plugin_yaml_defs=os.path.join(HOTSOS_ROOT, 'defs'),
+                     templates_path=os.path.join(HOTSOS_ROOT, 'templates'),
+                     max_parallel_tasks=args.max_parallel_tasks,
+                     machine_readable=True,
+                     cache_dir='')
+    # Load defs once so that no case pays for it.
+    get_ydefs_cache(HotSOSConfig.plugin_yaml_defs).load_all()
+    results = {}
+    for name, (func, func_args) in cases.items():
+        sys.stderr.write(f"INFO: running {name} x {args.repeat}\n")
+        results[name] = summarise([run_case(func, func_args)
+                                   for _ in range(args.repeat)])
+
+    return {'repo-info': get_repo_info(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'repeat': args.repeat,
+            'max-parallel-tasks': args.max_parallel_tasks,
+            'data-root': data_root,
+            'synthetic-params': params,
+            'results': results}
+
+
+def main():
+    args, cases = parse_args()
+    log.setLevel(logging.ERROR)
+    params = None
+    with tempfile.TemporaryDirectory() as tmpdir:
+        data_root = args.data_root
+        if not data_root:
+            params = SyntheticDataRootParams(log_lines=args.log_lines,
+                                             osds=args.osds,
+                                             packages=args.packages,
+                                             processes=args.processes)
+            data_root = (args.keep_data_root or
+                         os.path.join(tmpdir, 'synthetic'))
+            if not os.path.exists(data_root):
+                sys.stderr.write(f"INFO: generating data root {data_root}\n")
+                SyntheticDataRoot(data_root, params).generate()
+
+            params = params.to_dict()
+
+        results = benchmark(args, cases, data_root, params)
+
+    out = json.dumps(results, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as fd:
+            fd.write(out + '\n')
+    else:
+        print(out)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as fd:
+            compare(results, json.load(fd))
+
+
+if __name__ == '__main__':
+    main()
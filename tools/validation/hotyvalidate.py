@@ -6,6 +6,7 @@ import logging
 import sys
 
 import yaml
+from hotsos.core.search import RegexLiteralAnalyser
 from tests.unit import utils
 
 
@@ -160,6 +161,61 @@ class HotYValidate(TestCase):
         logging.info("processed [%d] scenarios and [%d] tests, all OK!",
                      len(scenario_files), len(all_tests))
 
+    @staticmethod
+    def _find_search_patterns(content, path=None):
+        """
+        Yield (path, pattern) for each search expression in content that does
+        not have an explicit hint.
+        """
+        path = path or []
+        if isinstance(content, list):
+            for item in content:
+                yield from HotYValidate._find_search_patterns(item, path)
+
+            return
+
+        if not isinstance(content, dict):
+            return
+
+        for key, value in content.items():
+            if key in ('search', 'expr', 'start', 'body', 'end'):
+                if isinstance(value, (str, list)):
+                    if 'hint' not in content:
+                        yield '.'.join(path + [key]), value
+
+                    continue
+
+            yield from HotYValidate._find_search_patterns(value,
+                                                          path + [key])
+
+    def search_patterns_check_hints(self):
+        """Warn about search patterns that have no hint and from which one
+        cannot be derived. Every line searched has to run the full expression
+        for these so they can be slow on large files.
+        """
+        defs_files = glob.glob(os.path.join(utils.DEFS_DIR, '**/*.yaml'),
+                               recursive=True)
+        slow_patterns = []
+        for defs_file in defs_files:
+            with open(defs_file, encoding='utf-8') as fd:
+                content = yaml.safe_load(fd)
+
+            for path, pattern in self._find_search_patterns(content):
+                patterns = pattern if isinstance(pattern, list) else [pattern]
+                # variables and imports cannot be resolved here
+                if any(not isinstance(p, str) or p.startswith(('$', '@'))
+                       for p in patterns):
+                    continue
+
+                if RegexLiteralAnalyser(patterns).hint is None:
+                    slow_patterns.append(f"{defs_file}:{path}")
+                    logging.warning("lint:no_hint [%s] pattern %s has no "
+                                    "required literal to use as a hint",
+                                    f"{defs_file}:{path}", pattern)
+
+        logging.info("processed [%d] defs files, found [%d] patterns without "
+                     "a hint", len(defs_files), len(slow_patterns))
+
 
 if __name__ == "__main__":
     lvl = os.environ["HOTSOS_VALIDATE_YSCENARIOS_LOGLEVEL"] \
@@ -167,3 +223,4 @@ if __name__ == "__main__":
 
     logging.basicConfig(level=lvl, stream=sys.stdout)
     HotYValidate().scenarios_check_mappings()
+    HotYValidate().search_patterns_check_hints()